@@ -0,0 +1,305 @@
+"""
+Daily Cube - Agregados por día y dimensiones con sumas acumuladas
+Se construye una vez por snapshot; cualquier rango de fechas se responde
+restando sumas acumuladas por grupo, sin recorrer las filas originales.
+Las sumas se acumulan en enteros (diezmilésimas) para que restar acumulados no
+agregue error de redondeo a los montos: se dividen una sola vez al responder.
+Si el snapshot trae el delta de filas respecto al anterior, el cubo anterior se
+actualiza con él; si no, y el libro nuevo solo agrega días, el cubo se extiende.
+"""
+
+import hashlib
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+# Intentar import relativo (para Render) o directo (local)
+try:
+    from backend import profiling
+except ImportError:
+    import profiling
+
+# Cubos por tabla del snapshot: (tabla, dimensiones, {medida: (columna, 'sum' | 'count')})
+# Todas las medidas incluyen además 'n_rows' (número de filas)
+CUBE_SPECS: Dict[str, Tuple[str, List[str], Dict[str, Tuple[str, str]]]] = {
+    'ventas': (
+        'ventas',
+        ['tipo', 'segmento', 'producto', 'cliente', 'operador'],
+        {'total': ('total_venta', 'sum'), 'kg': ('kg_netos', 'sum'),
+         'cajas': ('cajas', 'sum'), 'n_id': ('ID', 'count')},
+    ),
+    'compras': (
+        'compras',
+        ['producto', 'proveedor'],
+        {'total': ('total', 'sum'), 'kg': ('kg_netos', 'sum'), 'n_id': ('ID', 'count')},
+    ),
+    'egresos': (
+        'egresos',
+        ['tipo_egreso', 'centro_costos'],
+        {'importe': ('importe', 'sum')},
+    ),
+}
+
+DATE_COL = 'fecha'
+_SLOT = '_slot'
+# Medidas 'sum' en enteros: centavos y gramos caben con margen (hasta ~9e14 por grupo)
+SCALE = 10_000
+
+# Último cubo construido por nombre, con la versión de su snapshot (base para delta o extensión)
+_latest: Dict[str, Tuple[str, 'DailyCube']] = {}
+_cube_stats = {'builds': 0, 'extends': 0, 'deltas': 0}
+
+
+def _slots(fechas: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Posición de cada fila en el eje de fechas: (ns desde epoch, máscara de filas con fecha)
+
+    Las filas con hora distinta de medianoche van 1 ns después de su día: así
+    'fecha <= fin' (fin a medianoche) las excluye igual que filter_by_date.
+    """
+    fechas = pd.to_datetime(fechas, errors='coerce')
+    dated = fechas.notna().to_numpy()
+    days = fechas.dt.normalize()
+    slots = days.to_numpy(dtype='datetime64[ns]').astype('int64') + (fechas != days).to_numpy(dtype='int64')
+    return slots, dated
+
+
+def _digest(frame: pd.DataFrame) -> str:
+    """Huella del contenido de un conjunto de filas (en su orden)"""
+    hashed = pd.util.hash_pandas_object(frame, index=False)
+    return hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()
+
+
+def _group_cumsum(values: np.ndarray, row_group: np.ndarray) -> np.ndarray:
+    """Suma acumulada por filas que se reinicia en cada grupo (filas ordenadas por grupo)"""
+    if not len(values):
+        return values
+    cum = np.cumsum(values, axis=0)
+    starts = np.r_[0, np.flatnonzero(np.diff(row_group)) + 1]
+    offsets = np.vstack([np.zeros((1, values.shape[1]), dtype=values.dtype), cum[starts[1:] - 1]])
+    return cum - np.repeat(offsets, np.diff(np.r_[starts, len(values)]), axis=0)
+
+
+class DailyCube:
+    """Medidas por (grupo de dimensiones, día) con sumas acumuladas por grupo"""
+
+    def __init__(self, dims: List[str], measures: Dict[str, Tuple[str, str]],
+                 daily: pd.DataFrame, undated: pd.DataFrame, last_slot: int, digest: Optional[str]):
+        self.dims = dims
+        self.measures = measures
+        self.names = list(measures) + ['n_rows']
+        self.sums = [name for name, (_, how) in measures.items() if how == 'sum']
+        # Agregados por (dimensiones, slot) y de filas sin fecha: base para extender
+        self.daily = daily
+        self.undated = undated
+        self.last_slot = last_slot
+        self.digest = digest
+
+        # Grupos únicos (en orden de aparición) y código de grupo de cada agregado
+        keys = pd.concat([daily[dims], undated[dims]], ignore_index=True)
+        codes = np.zeros(0, dtype='int64')
+        if len(keys):
+            codes = keys.groupby(dims, dropna=False, sort=False, observed=True).ngroup().to_numpy(dtype='int64')
+        self.groups = keys.drop_duplicates(ignore_index=True)
+        daily_codes, undated_codes = codes[:len(daily)], codes[len(daily):]
+
+        # Orden (grupo, slot) y sumas acumuladas dentro de cada grupo
+        slots = daily[_SLOT].to_numpy(dtype='int64')
+        self.slot_values = np.unique(slots)
+        self._n_slots = max(len(self.slot_values), 1)
+        row_keys = daily_codes * self._n_slots + np.searchsorted(self.slot_values, slots)
+        order = np.argsort(row_keys, kind='stable')
+        self._keys = row_keys[order]
+        self._row_group = daily_codes[order]
+        self._cum = _group_cumsum(daily[self.names].to_numpy(dtype='int64')[order], self._row_group)
+
+        # Filas sin fecha por grupo (solo cuentan cuando no hay filtro de fechas)
+        self._undated = np.zeros((len(self.groups), len(self.names)), dtype='int64')
+        np.add.at(self._undated, undated_codes, undated[self.names].to_numpy(dtype='int64'))
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, dims: List[str], measures: Dict[str, Tuple[str, str]]) -> 'DailyCube':
+        """Construye el cubo completo a partir de una tabla del snapshot"""
+        slots, dated = _slots(df[DATE_COL])
+        daily, undated = _aggregate(df, slots, dated, dims, measures)
+        last_slot = int(slots[dated].max()) if dated.any() else np.iinfo('int64').min
+        return cls(dims, measures, daily, undated, last_slot, _digest(_source(df, dims, measures)))
+
+    def extend(self, df: pd.DataFrame) -> Optional['DailyCube']:
+        """
+        Cubo para una versión nueva de la tabla si solo se agregaron días posteriores
+
+        Returns:
+            El cubo extendido, o None si cambiaron filas de días ya agregados
+        """
+        if self.digest is None:
+            return None
+        slots, dated = _slots(df[DATE_COL])
+        old = ~dated | (slots <= self.last_slot)
+        if _digest(_source(df[old], self.dims, self.measures)) != self.digest:
+            return None
+
+        new = ~old
+        new_daily, _ = _aggregate(df[new], slots[new], dated[new], self.dims, self.measures)
+        daily = pd.concat([self.daily, new_daily], ignore_index=True)
+        last_slot = int(slots[new].max()) if new.any() else self.last_slot
+        # La huella cubre todas las filas ya agregadas (viejas y nuevas, en su orden)
+        return DailyCube(self.dims, self.measures, daily, self.undated, last_slot,
+                         _digest(_source(df, self.dims, self.measures)))
+
+    def apply(self, changes: List[Tuple[pd.DataFrame, int]]) -> 'DailyCube':
+        """
+        Cubo para la versión siguiente de la tabla a partir de su delta
+
+        Las filas agregadas (+1) y quitadas (-1) se agregan por (grupo, día) y se
+        suman a los agregados diarios: el costo depende del tamaño del delta y del
+        número de agregados diarios, no de las filas de la tabla.
+
+        Args:
+            changes: Lista de (filas, signo), ver DatasetSnapshot.changes
+        """
+        if not changes:
+            return self
+        daily, undated = [self.daily], [self.undated]
+        for frame, sign in changes:
+            slots, dated = _slots(frame[DATE_COL])
+            frame_daily, frame_undated = _aggregate(frame, slots, dated, self.dims, self.measures)
+            frame_daily[self.names] *= sign
+            frame_undated[self.names] *= sign
+            daily.append(frame_daily)
+            undated.append(frame_undated)
+
+        daily = _regroup(daily, self.dims + [_SLOT], self.names, self.daily)
+        undated = _regroup(undated, self.dims, self.names, self.undated)
+        last_slot = int(daily[_SLOT].max()) if len(daily) else np.iinfo('int64').min
+        # Sin huella de filas: la siguiente versión sin delta se reconstruye completa
+        return DailyCube(self.dims, self.measures, daily, undated, last_slot, None)
+
+    def _upto(self, slot_idx: int) -> np.ndarray:
+        """Acumulado de cada grupo hasta la posición de slot indicada (inclusive)"""
+        values = np.zeros((len(self.groups), len(self.names)), dtype='int64')
+        if slot_idx < 0 or not len(self._keys):
+            return values
+        groups = np.arange(len(self.groups))
+        pos = np.searchsorted(self._keys, groups * self._n_slots + slot_idx, side='right') - 1
+        valid = (pos >= 0) & (self._row_group[np.maximum(pos, 0)] == groups)
+        values[valid] = self._cum[pos[valid]]
+        return values
+
+    def query_scaled(self, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+        """
+        Medidas por grupo para un rango de fechas (mismo criterio que filter_by_date)
+
+        Returns:
+            DataFrame con dimensiones y medidas enteras (las sumas multiplicadas por
+            SCALE) de los grupos con filas en el rango; ver decode
+        """
+        lo = 0
+        hi = len(self.slot_values) - 1
+        if start:
+            lo = int(np.searchsorted(self.slot_values, pd.Timestamp(start).value, side='left'))
+        if end:
+            hi = int(np.searchsorted(self.slot_values, pd.Timestamp(end).value, side='right')) - 1
+
+        if hi >= lo:
+            values = self._upto(hi) - self._upto(lo - 1)
+        else:
+            values = np.zeros((len(self.groups), len(self.names)), dtype='int64')
+        if not start and not end:
+            values = values + self._undated
+
+        result = self.groups.copy()
+        for i, name in enumerate(self.names):
+            result[name] = values[:, i]
+        return result[result['n_rows'] > 0].reset_index(drop=True)
+
+    def decode(self, scaled):
+        """Sumas en unidades originales (una sola división) de un resultado de query_scaled o de su suma"""
+        if isinstance(scaled, pd.Series):
+            scaled = scaled.astype('float64')
+        else:
+            scaled = scaled.copy()
+        for name in self.sums:
+            scaled[name] = scaled[name] / SCALE
+        return scaled
+
+    def query(self, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+        """Medidas por grupo para un rango de fechas, con las sumas en unidades originales"""
+        return self.decode(self.query_scaled(start, end))
+
+
+def _source(df: pd.DataFrame, dims: List[str], measures: Dict[str, Tuple[str, str]]) -> pd.DataFrame:
+    """Columnas de la tabla que alimentan el cubo"""
+    columns = [DATE_COL] + dims + [col for col, _ in measures.values()]
+    return df[list(dict.fromkeys(columns))]
+
+
+def _aggregate(df: pd.DataFrame, slots: np.ndarray, dated: np.ndarray, dims: List[str],
+               measures: Dict[str, Tuple[str, str]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Agrega filas por (dimensiones, slot): (filas con fecha, filas sin fecha)"""
+    frame = df[dims].reset_index(drop=True)
+    for name, (col, how) in measures.items():
+        if how == 'count':
+            frame[name] = df[col].notna().to_numpy(dtype='int64')
+        else:
+            values = pd.to_numeric(df[col], errors='coerce').fillna(0.0).to_numpy(dtype='float64')
+            frame[name] = np.round(values * SCALE).astype('int64')
+    frame['n_rows'] = 1
+    frame[_SLOT] = slots
+
+    names = list(measures) + ['n_rows']
+    daily = frame[dated].groupby(dims + [_SLOT], dropna=False, sort=False, observed=True)[names].sum().reset_index()
+    undated = frame[~dated].groupby(dims, dropna=False, sort=False, observed=True)[names].sum().reset_index()
+    return daily, undated
+
+
+def _regroup(parts: List[pd.DataFrame], keys: List[str], names: List[str], like: pd.DataFrame) -> pd.DataFrame:
+    """Suma agregados por llave y descarta los grupos que se quedaron sin filas"""
+    frame = pd.concat([part for part in parts if len(part)] or parts[:1], ignore_index=True)
+    grouped = frame.groupby(keys, dropna=False, sort=False, observed=True)[names].sum().reset_index()
+    grouped = grouped[grouped['n_rows'] > 0].reset_index(drop=True)
+    # Juntar categóricas con categorías distintas da object: se recuperan los tipos originales
+    for col in keys:
+        if isinstance(like[col].dtype, pd.CategoricalDtype):
+            grouped[col] = grouped[col].astype('category')
+    return grouped
+
+
+def build_cube(snap, name: str) -> DailyCube:
+    """
+    Cubo de una tabla del snapshot: aplica el delta al cubo del snapshot anterior,
+    o extiende el anterior si solo hay días nuevos, o lo construye completo
+    """
+    table, dims, measures = CUBE_SPECS[name]
+    df = getattr(snap, table)
+
+    previous = _latest.get(name)
+    with profiling.span('cube'):
+        cube = None
+        if previous is not None:
+            base_version, base = previous
+            changes = snap.changes(table, base_version)
+            if changes is not None:
+                cube = base.apply(changes)
+                _cube_stats['deltas'] += 1
+            else:
+                cube = base.extend(df)
+                if cube is not None:
+                    _cube_stats['extends'] += 1
+        if cube is None:
+            cube = DailyCube.build(df, dims, measures)
+            _cube_stats['builds'] += 1
+
+    _latest[name] = (snap.version, cube)
+    return cube
+
+
+def get_cube(snap, name: str) -> DailyCube:
+    """Cubo de una tabla, construido una sola vez por snapshot"""
+    return snap.derive(f'cube:{name}', lambda s: build_cube(s, name))
+
+
+def get_cube_stats() -> dict:
+    """Estadísticas de construcción de cubos (completas vs extendidas)"""
+    return dict(_cube_stats)
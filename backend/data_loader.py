@@ -4,9 +4,17 @@ Permite cambiar entre fuentes de datos sin modificar el código principal
 """
 
 import os
+import io
+import time
+import asyncio
+import hashlib
+import numpy as np
 import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from pandas.io.parsers import TextParser
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, Any, Callable, Iterable, List
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
@@ -19,20 +27,576 @@ if USE_ONEDRIVE:
     try:
         # Intentar import relativo (para Render) o directo (local)
         try:
-            from backend.graph_client import read_ventas_sheet, read_almacen_sheet, GraphAPIError
+            from backend.graph_client import (
+                read_ventas_sheet, read_almacen_sheet, download_excel_file, get_file_hash,
+                download_excel_file_async, watch_files, get_token_stats, read_sheet_values, get_item_version,
+                EXCEL_VENTAS_ITEM_ID, EXCEL_ALMACEN_ITEM_ID, POLL_INTERVAL_SECONDS, GraphAPIError
+            )
         except ImportError:
-            from graph_client import read_ventas_sheet, read_almacen_sheet, GraphAPIError
+            from graph_client import (
+                read_ventas_sheet, read_almacen_sheet, download_excel_file, get_file_hash,
+                download_excel_file_async, watch_files, get_token_stats, read_sheet_values, get_item_version,
+                EXCEL_VENTAS_ITEM_ID, EXCEL_ALMACEN_ITEM_ID, POLL_INTERVAL_SECONDS, GraphAPIError
+            )
         print("[OK] Modo OneDrive activado - usando Microsoft Graph API")
     except ImportError as e:
         print(f"[WARNING] Error importando graph_client: {e}")
         print("[WARNING] Cayendo a modo local")
         USE_ONEDRIVE = False
 
+# Intentar import relativo (para Render) o directo (local)
+try:
+    from backend.singleflight import SingleFlight
+    from backend import sheet_store, workers, profiling, metrics
+    from backend.xlsx_parts import WorkbookParts
+except ImportError:
+    from singleflight import SingleFlight
+    import sheet_store
+    import workers
+    import profiling
+    import metrics
+    from xlsx_parts import WorkbookParts
+
 # Rutas a archivos locales (fallback)
 BASE_DIR = Path(__file__).resolve().parent.parent
 VENTAS_FILE = BASE_DIR / "CONTROL DE VENTAS OVA 2026 -.xlsx"
 ALMACEN_FILE = BASE_DIR / "CONTROL DE ALMACÉN OVA 2026 -.xlsx"
 
+# Hojas registradas por archivo: se parsean todas juntas en una sola apertura del libro
+SHEET_SPECS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    'ventas': {
+        'VENTAS AL CONTADO': {
+            'header': 7,
+            'usecols': ['SEGMENTO DE NEGOCIO', 'TIPO DE VENTA', 'TIPO/PRODUCTO', 'CLIENTE ADMON',
+                        'KG NETOS', 'CAJAS/BULTOS', 'PRECIO', 'TOTAL VENTA', 'FORMA DE PAGO',
+                        'OPERADOR', 'FECHA', 'NOTA', 'ID'],
+            # Las filas posteriores al último ID son plantilla vacía (fórmulas sin venta)
+            'stop_at': 'ID',
+        },
+        'VENTAS A CRÉDITO': {
+            'header': 7,
+            'usecols': ['SEGMENTO DE NEGOCIO', 'TIPO DE VENTA', 'TIPO/PRODUCTO', 'CLIENTE ADMON',
+                        'KG NETOS', 'CAJAS O BULTOS', 'PRECIO UNITARIO', 'TOTAL VENTA',
+                        'OPERADOR', 'FECHA', 'SALDO', 'NOTA (SI APLICA)', 'ID', 'COBROS EFECTUADOS'],
+        },
+        'EGRESOS EN EFECTIVO': {
+            'header': 8,
+            'usecols': ['ID', 'FECHA', 'TIPO DE EGRESO', 'CENTRO DE COSTOS', 'CONCEPTO',
+                        'IMPORTE', 'OPERADOR', 'CLASIFICACIÓN COSTO/GASTO'],
+        },
+        'CAJAS': {
+            'header': 4,
+            'usecols': ['SEMANA', 'FECHA', 'CONCEPTO', 'EMILIO', 'RICHARD', 'BODEGA 55',
+                        'DIEGO', 'OTRAS ENTRADAS DE EFECTIVO (+)',
+                        'OTRAS SALIDAS DE EFECTIVO (-)', 'SALDO FINAL DE EFECTIVO', 'NOTA'],
+        },
+        'PAGOS_GENERALES': {
+            'header': 5,
+            'usecols': ['ID', 'FECHA DE COBRO', 'CLIENTE ADMON', 'MONTO PAGADO', 'TIPO DE MOVIMIENTO'],
+        },
+    },
+    'almacen': {
+        'COMPRAS (C)': {
+            'header': 9,
+            'usecols': ['FECHA', 'PROVEEDOR DE CEBOLLA', 'COSTALES', 'KG NETOS', 'PRECIO X KG',
+                        'TOTAL', 'ESTATUS', 'ID'],
+        },
+        'COMPRAS (H)': {
+            'header': 9,
+            'usecols': ['FECHA', 'PROVEEDOR DE HUEVO', 'CAJAS', 'KG NETOS', 'PRECIO x KG',
+                        'TOTAL', 'ESTATUS', 'MARCA DE HUEVO', 'ID'],
+        },
+        # Solo la existencia (last_stock_*): por rangos de Graph no se trae el resto de columnas
+        'CONTROL DE ALMACÉN (C)': {'header': 9, 'usecols': ['EXISTENCIA']},
+        'CONTROL DE ALMACÉN (H)': {'header': 9, 'usecols': ['EXISTENCIA']},
+    },
+}
+
+# Lector de hojas: 'streaming' (openpyxl fila por fila, solo columnas usadas) o 'pandas'
+EXCEL_READER = os.getenv('EXCEL_READER', 'streaming').lower()
+
+# Hojas que en modo OneDrive se leen con la API de libros de Graph (solo sus valores y
+# columnas) en lugar de descargar el archivo completo, p.ej. "CONTROL DE ALMACÉN (C),CONTROL DE ALMACÉN (H)"
+GRAPH_RANGE_SHEETS = {name.strip() for name in os.getenv('GRAPH_RANGE_SHEETS', '').split(',') if name.strip()}
+
+# Reparsear solo las hojas cuya parte del zip cambió (las demás conservan su DataFrame)
+SHEET_PART_REUSE = os.getenv('SHEET_PART_REUSE', 'true').lower() == 'true'
+
+# Caché de libros completos: file_type -> (versión, {hoja: DataFrame})
+_workbook_cache = {}
+# Huellas de las partes del último libro leído: file_type -> (WorkbookParts, {hoja: DataFrame})
+_workbook_parts = {}
+# Caché de hojas no registradas en modo local, invalidado por versión del archivo
+_sheet_cache = {}
+_cache_stats = {
+    'hits': 0, 'misses': 0, 'workbook_parses': 0,
+    'disk_hits': 0, 'disk_writes': 0, 'fallbacks': 0,
+    'sheet_parses': 0, 'sheet_reuses': 0, 'range_fetches': 0
+}
+# Si la descarga asíncrona falló hace poco, no reintentar en síncrono (ir directo al respaldo)
+SOURCE_RETRY_SECONDS = 30
+_source_unavailable_until: Dict[str, float] = {}
+# Parseos concurrentes de la misma versión de un libro/hoja se hacen una sola vez
+_parses = SingleFlight()
+
+
+def _file_version(file_path: Path) -> tuple:
+    """Versión de un archivo local: cambia cada vez que se guarda el Excel"""
+    stat = file_path.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _local_path(file_type: str) -> Path:
+    """Ruta del archivo local para un tipo de archivo"""
+    if file_type == 'ventas':
+        file_path = VENTAS_FILE
+    elif file_type == 'almacen':
+        file_path = ALMACEN_FILE
+    else:
+        raise ValueError(f"Tipo de archivo desconocido: {file_type}")
+
+    if not file_path.exists():
+        raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
+    return file_path
+
+
+def _item_id(file_type: str) -> str:
+    """ID de OneDrive para un tipo de archivo"""
+    if file_type == 'ventas':
+        item_id = EXCEL_VENTAS_ITEM_ID
+    elif file_type == 'almacen':
+        item_id = EXCEL_ALMACEN_ITEM_ID
+    else:
+        raise ValueError(f"Tipo de archivo desconocido: {file_type}")
+
+    if not item_id:
+        raise GraphAPIError(f"ID de OneDrive no configurado para '{file_type}'")
+    return item_id
+
+
+def _workbook_source(file_type: str) -> tuple:
+    """Retorna (fuente para pd.ExcelFile, versión) del libro actual"""
+    if USE_ONEDRIVE:
+        if time.monotonic() < _source_unavailable_until.get(file_type, 0):
+            raise GraphAPIError(f"OneDrive no disponible para '{file_type}'")
+        item_id = _item_id(file_type)
+        if _range_only(file_type):
+            # Todas las hojas se leen por rangos: basta la versión de los metadatos
+            return None, get_item_version(item_id)
+        content = download_excel_file(item_id)
+        return io.BytesIO(content), get_file_hash(item_id)
+
+    file_path = _local_path(file_type)
+    return file_path, _file_version(file_path)
+
+
+def _range_sheets(file_type: str) -> List[str]:
+    """Hojas registradas de un libro que se leen por rangos de Graph (solo modo OneDrive)"""
+    if not USE_ONEDRIVE:
+        return []
+    return [name for name in SHEET_SPECS[file_type] if name in GRAPH_RANGE_SHEETS]
+
+
+def _range_only(file_type: str) -> bool:
+    """True si ninguna hoja del libro necesita el archivo descargado"""
+    return len(_range_sheets(file_type)) == len(SHEET_SPECS[file_type])
+
+
+def _read_range_sheet(file_type: str, sheet_name: str) -> pd.DataFrame:
+    """Hoja registrada leída por rangos de Graph (mismo DataFrame que al parsear el archivo)"""
+    spec = SHEET_SPECS[file_type][sheet_name]
+    rows = read_sheet_values(_item_id(file_type), sheet_name, spec['header'], spec.get('usecols'))
+    return frame_from_rows(rows, sheet_name, spec['header'], spec.get('usecols'), spec.get('stop_at'))
+
+
+def _parse_workbook(source, specs: Dict[str, Dict[str, Any]]) -> Dict[str, pd.DataFrame]:
+    """Abre el libro una sola vez y extrae todas las hojas registradas"""
+    return _parse_workbook_timed(source, specs)[0]
+
+
+def _parse_workbook_timed(source, specs: Dict[str, Dict[str, Any]]) -> tuple:
+    """
+    Como _parse_workbook, y además los segundos que tomó cada hoja
+
+    Los tiempos se retornan (no se registran aquí) porque el parseo puede correr
+    en otro proceso; quien llama los registra en las métricas del servidor.
+    """
+    sheets, timings = {}, {}
+    if EXCEL_READER == 'pandas':
+        with pd.ExcelFile(source) as xls:
+            for sheet_name, spec in specs.items():
+                start = time.perf_counter()
+                df = xls.parse(sheet_name, header=spec['header'], usecols=spec.get('usecols'))
+                if spec.get('stop_at') is not None:
+                    df = _cut_after_last(df, spec['stop_at'])
+                sheets[sheet_name] = df
+                timings[sheet_name] = time.perf_counter() - start
+        return sheets, timings
+
+    workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        for sheet_name, spec in specs.items():
+            start = time.perf_counter()
+            sheets[sheet_name] = read_sheet_streaming(
+                workbook, sheet_name, spec['header'],
+                usecols=spec.get('usecols'), stop_at=spec.get('stop_at')
+            )
+            timings[sheet_name] = time.perf_counter() - start
+        return sheets, timings
+    finally:
+        workbook.close()
+
+
+def _cut_after_last(df: pd.DataFrame, stop_at: str) -> pd.DataFrame:
+    """
+    Recorta las filas posteriores a la última con valor en 'stop_at' (lector pandas)
+
+    Mismo corte que hace frame_from_rows, pero después de inferir los tipos: una
+    columna puede quedar float por celdas vacías de las filas plantilla recortadas.
+    """
+    values = df[stop_at]
+    filled = (values.notna() & (values != "")).to_numpy().nonzero()[0]
+    return df.iloc[:filled[-1] + 1 if len(filled) else 0]
+
+
+def _convert_value(value):
+    """Mismo valor que pd.read_excel (motor openpyxl) produce para una celda"""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        # Enteros guardados como float (3.0) se leen como int
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and value in ERROR_CODES:
+        # Con values_only las celdas de error llegan como texto ('#N/A', '#REF!', ...)
+        return np.nan
+    return value
+
+
+def read_sheet_streaming(
+    workbook,
+    sheet_name: str,
+    header: int,
+    usecols: Optional[list] = None,
+    stop_at: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Lee una hoja recorriendo sus filas una sola vez (openpyxl read_only, solo valores)
+
+    Produce el mismo DataFrame que xls.parse(sheet_name, header=header, usecols=usecols),
+    pero solo convierte las celdas de las columnas pedidas.
+
+    Args:
+        workbook: Libro abierto con load_workbook(read_only=True, data_only=True)
+        sheet_name: Nombre de la hoja
+        header: Fila (base 0) con los nombres de columna
+        usecols: Columnas a conservar (None = todas)
+        stop_at: Columna cuya última celda con valor marca el fin de los datos
+    """
+    sheet = workbook[sheet_name]
+    # Como pandas: ignorar la dimensión declarada y usar el largo real de cada fila
+    sheet.reset_dimensions()
+    return frame_from_rows(sheet.iter_rows(values_only=True), sheet_name, header, usecols, stop_at)
+
+
+def frame_from_rows(
+    sheet_rows: Iterable[tuple],
+    sheet_name: str,
+    header: int,
+    usecols: Optional[list] = None,
+    stop_at: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    DataFrame de una hoja a partir de sus filas de valores (desde la fila 1 de la hoja)
+
+    Mismas reglas que read_sheet_streaming, para filas que vienen de openpyxl o
+    de la API de libros de Graph (celdas vacías como None).
+    """
+    rows = []
+    width = 0
+    last_row_with_data = -1
+    for row_number, values in enumerate(sheet_rows):
+        length = len(values)
+        while length and values[length - 1] in (None, ""):
+            length -= 1
+        if length:
+            last_row_with_data = row_number
+            width = max(width, length)
+        if row_number >= header:
+            rows.append(values)
+
+    # Descartar filas vacías al final (pandas también las recorta)
+    rows = rows[:last_row_with_data + 1 - header]
+    if not rows:
+        return pd.DataFrame()
+
+    names = [_convert_value(rows[0][i]) if i < len(rows[0]) else "" for i in range(width)]
+    if usecols is None:
+        keep = list(range(width))
+    else:
+        missing = [col for col in usecols if col not in names]
+        if missing:
+            raise ValueError(
+                f"Usecols do not match columns, columns expected but not found: {missing} "
+                f"(sheet: {sheet_name})"
+            )
+        # Primera aparición de cada columna, en el orden del archivo
+        keep = sorted({names.index(col) for col in usecols})
+
+    if stop_at is not None:
+        col = names.index(stop_at)
+        end = 1
+        for i in range(len(rows) - 1, 0, -1):
+            row = rows[i]
+            if col < len(row) and row[col] not in (None, ""):
+                end = i + 1
+                break
+        rows = rows[:end]
+
+    data = [
+        [_convert_value(row[i]) if i < len(row) else "" for i in keep]
+        for row in rows
+    ]
+    # Mismos parámetros que usa pandas al leer Excel (GH 39808: no saltar filas vacías)
+    return TextParser(data, header=0, skip_blank_lines=False).read()
+
+
+def load_workbook_sheets(file_type: str) -> Dict[str, pd.DataFrame]:
+    """
+    Carga todas las hojas registradas de un libro, parseándolo una vez por versión
+
+    Args:
+        file_type: 'ventas' o 'almacen'
+
+    Returns:
+        Diccionario {hoja: DataFrame} compartido por todos los loaders (no mutar)
+    """
+    if file_type not in SHEET_SPECS:
+        raise ValueError(f"Tipo de archivo desconocido: {file_type}")
+
+    try:
+        source, version = _workbook_source(file_type)
+    except Exception as e:
+        if not USE_ONEDRIVE:
+            raise
+        return _last_known_good(file_type, e)
+
+    if file_type in _workbook_cache:
+        cached_version, sheets = _workbook_cache[file_type]
+        if cached_version == version:
+            _cache_stats['hits'] += 1
+            return sheets
+
+    _cache_stats['misses'] += 1
+    try:
+        return _parses.do((file_type, version), _build_workbook, file_type, source, version)
+    except Exception as e:
+        # Solo si la lectura de Graph falló (rangos); un error de parseo se propaga
+        if not USE_ONEDRIVE or time.monotonic() >= _source_unavailable_until.get(file_type, 0):
+            raise
+        return _last_known_good(file_type, e)
+
+
+def _build_workbook(file_type: str, source, version) -> Dict[str, pd.DataFrame]:
+    """Parsea un libro y lo guarda en caché (ejecutado por una sola llamada a la vez)"""
+    # Otra llamada pudo terminar el parseo justo antes de entrar aquí
+    if file_type in _workbook_cache and _workbook_cache[file_type][0] == version:
+        return _workbook_cache[file_type][1]
+
+    # Caché en disco por hash de contenido: evita el parseo tras un arranque en frío
+    content_hash = version if USE_ONEDRIVE else _content_hash(source)
+    specs = SHEET_SPECS[file_type]
+    signature = sheet_store.specs_signature(specs)
+    with profiling.span('disk_cache'):
+        sheets = sheet_store.load(file_type, content_hash, signature)
+    previous_parts, previous_sheets = _workbook_parts.get(file_type, (None, {}))
+    parts = _read_parts(file_type, source, previous_parts) if source is not None else None
+    if sheets is not None:
+        _cache_stats['disk_hits'] += 1
+    else:
+        _cache_stats['workbook_parses'] += 1
+        range_names = _range_sheets(file_type)
+        file_names = [name for name in specs if name not in range_names]
+        # Solo las hojas cuya parte del zip (o los textos/estilos que usan) cambió
+        changed = parts.changed_sheets(previous_parts, file_names) if parts is not None else file_names
+        try:
+            # Parseo intensivo en CPU: en un proceso aparte si PARSE_PROCESSES > 0
+            with profiling.span('parse'):
+                parsed, timings = workers.run_parse(
+                    _parse_workbook_timed, source, {name: specs[name] for name in specs if name in changed}
+                ) if changed else ({}, {})
+            # Hojas por rangos: solo sus valores, directo de Graph
+            with profiling.span('download'):
+                try:
+                    parsed.update((name, _read_range_sheet(file_type, name)) for name in range_names)
+                except GraphAPIError:
+                    # Como una descarga fallida: no reintentar en un rato, usar el último libro bueno
+                    _source_unavailable_until[file_type] = time.monotonic() + SOURCE_RETRY_SECONDS
+                    raise
+        except Exception as e:
+            if USE_ONEDRIVE:
+                raise GraphAPIError(f"Error leyendo libro '{file_type}': {str(e)}")
+            raise
+        for sheet_name, seconds in timings.items():
+            metrics.sheet_parse_seconds.observe(seconds, file=file_type, sheet=sheet_name)
+        # Las hojas sin cambios conservan el mismo DataFrame (la ingesta por delta ni las compara)
+        sheets = {name: parsed[name] if name in parsed else previous_sheets[name] for name in specs}
+        _cache_stats['sheet_parses'] += len(timings)
+        _cache_stats['range_fetches'] += len(range_names)
+        _cache_stats['sheet_reuses'] += len(specs) - len(parsed)
+        sheet_store.save(file_type, content_hash, signature, sheets)
+        _cache_stats['disk_writes'] += 1
+
+    if parts is not None:
+        _workbook_parts[file_type] = (parts, sheets)
+    else:
+        _workbook_parts.pop(file_type, None)
+    _workbook_cache[file_type] = (version, sheets)
+    return sheets
+
+
+def _read_parts(file_type: str, source, previous: Optional[WorkbookParts]) -> Optional[WorkbookParts]:
+    """Huellas por hoja del libro (None si no se pueden leer: se parsea todo)"""
+    if not SHEET_PART_REUSE:
+        return None
+    try:
+        return WorkbookParts.read(source, previous)
+    except Exception as e:
+        print(f"[WARNING] No se pudieron leer las partes de '{file_type}': {e}")
+        return None
+
+
+def _content_hash(file_path: Path) -> str:
+    """SHA-1 del contenido de un archivo local"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _last_known_good(file_type: str, error: Exception) -> Dict[str, pd.DataFrame]:
+    """Último libro bueno (memoria o disco) cuando OneDrive no responde"""
+    _cache_stats['fallbacks'] += 1
+    if file_type in _workbook_cache:
+        print(f"[WARNING] Usando última versión en memoria de '{file_type}': {error}")
+        return _workbook_cache[file_type][1]
+
+    stored = sheet_store.load_latest(file_type, sheet_store.specs_signature(SHEET_SPECS[file_type]))
+    if stored is None:
+        raise error
+
+    content_hash, sheets = stored
+    print(f"[WARNING] Usando última versión en disco de '{file_type}' ({content_hash[:8]}): {error}")
+    _workbook_cache[file_type] = (content_hash, sheets)
+    return sheets
+
+
+def get_workbook_version(file_type: str):
+    """Versión del libro cargado en caché (None si aún no se ha parseado)"""
+    if file_type in _workbook_cache:
+        return _workbook_cache[file_type][0]
+    return None
+
+
+async def prefetch_workbooks():
+    """
+    Asegura en caché el contenido vigente de ambos libros sin bloquear el event loop
+
+    En modo OneDrive descarga (en paralelo y con el cliente asíncrono) los libros
+    cuyo caché expiró; en modo local no hace nada.
+    """
+    if not USE_ONEDRIVE:
+        return
+
+    # Los libros que se leen solo por rangos no se descargan
+    file_types = [file_type for file_type in ('ventas', 'almacen') if not _range_only(file_type)]
+    results = await asyncio.gather(
+        *(download_excel_file_async(_item_id(file_type)) for file_type in file_types),
+        return_exceptions=True
+    )
+    for file_type, result in zip(file_types, results):
+        if isinstance(result, Exception):
+            # La carga usará el último libro bueno en lugar de reintentar bloqueando
+            print(f"[WARNING] No se pudo descargar '{file_type}': {result}")
+            _source_unavailable_until[file_type] = time.monotonic() + SOURCE_RETRY_SECONDS
+        else:
+            _source_unavailable_until.pop(file_type, None)
+
+
+async def watch_workbooks(on_change: Callable[[], Any]):
+    """
+    Vigila en segundo plano los libros de OneDrive (solo modo OneDrive)
+
+    Corre como tarea de fondo sin nadie que espere su resultado: los errores se
+    registran aquí, y si falta configuración (p.ej. el ID de un libro) se
+    reintenta en cada intervalo en lugar de terminar la tarea en silencio.
+
+    Args:
+        on_change: Función a ejecutar tras descargar una versión nueva de algún libro
+    """
+    if not USE_ONEDRIVE:
+        print("[ERROR] watch_workbooks solo aplica en modo OneDrive; sondeo no iniciado")
+        return
+    while True:
+        try:
+            item_ids = [_item_id('ventas'), _item_id('almacen')]
+            range_only = [_item_id(file_type) for file_type in ('ventas', 'almacen') if _range_only(file_type)]
+        except Exception as e:
+            print(f"[ERROR] No se pudo iniciar el sondeo de OneDrive: {e}")
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+            continue
+        await watch_files(item_ids, on_change, metadata_only=range_only)
+        return
+
+
+def _is_registered(file_type: str, sheet_name: str, header: int, kwargs: dict) -> bool:
+    """True si la lectura pedida coincide exactamente con una hoja registrada"""
+    spec = SHEET_SPECS.get(file_type, {}).get(sheet_name)
+    if spec is None or spec['header'] != header:
+        return False
+    options = ('usecols', 'stop_at')
+    return set(kwargs) <= set(options) and all(kwargs.get(key) == spec.get(key) for key in options)
+
+
+def _read_local_sheet(file_path: Path, sheet_name: str, header: int, **kwargs) -> pd.DataFrame:
+    """Lee una hoja local parseando el archivo solo una vez por versión"""
+    cache_key = f"{file_path}|{sheet_name}|{header}|{str(kwargs)}"
+    version = _file_version(file_path)
+
+    if cache_key in _sheet_cache:
+        cached_version, df = _sheet_cache[cache_key]
+        if cached_version == version:
+            _cache_stats['hits'] += 1
+            # Retornamos una copia para evitar mutaciones accidentales en el cache
+            return df.copy()
+
+    _cache_stats['misses'] += 1
+
+    def parse_sheet() -> pd.DataFrame:
+        df = pd.read_excel(file_path, sheet_name=sheet_name, header=header, **kwargs)
+        _sheet_cache[cache_key] = (version, df)
+        return df
+
+    return _parses.do((cache_key, version), parse_sheet).copy()
+
+
+def get_cache_stats() -> dict:
+    """Contadores de aciertos/fallos del caché de hojas"""
+    return {
+        **_cache_stats,
+        "entries": len(_sheet_cache) + sum(len(sheets) for _, sheets in _workbook_cache.values())
+    }
+
+
+def clear_cache():
+    """Limpia el caché de libros y hojas y reinicia los contadores"""
+    _workbook_cache.clear()
+    _workbook_parts.clear()
+    _sheet_cache.clear()
+    _source_unavailable_until.clear()
+    for key in _cache_stats:
+        _cache_stats[key] = 0
+
 
 def load_excel_sheet(
     file_type: str,
@@ -52,6 +616,10 @@ def load_excel_sheet(
     Returns:
         DataFrame con los datos
     """
+    # Hojas registradas: salen del parseo único del libro completo
+    if _is_registered(file_type, sheet_name, header, kwargs):
+        return load_workbook_sheets(file_type)[sheet_name].copy()
+
     if USE_ONEDRIVE:
         # Modo OneDrive - sin fallback
         if file_type == 'ventas':
@@ -62,79 +630,58 @@ def load_excel_sheet(
             raise ValueError(f"Tipo de archivo desconocido: {file_type}")
     
     # Modo local
-    if file_type == 'ventas':
-        file_path = VENTAS_FILE
-    elif file_type == 'almacen':
-        file_path = ALMACEN_FILE
-    else:
-        raise ValueError(f"Tipo de archivo desconocido: {file_type}")
-    
-    if not file_path.exists():
-        raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
-    
-    return pd.read_excel(file_path, sheet_name=sheet_name, header=header, **kwargs)
+    return _read_local_sheet(_local_path(file_type), sheet_name, header, **kwargs)
 
 
 # Funciones de conveniencia
+def _load_registered(file_type: str, sheet_name: str) -> pd.DataFrame:
+    """Carga una hoja registrada en SHEET_SPECS"""
+    return load_excel_sheet(file_type, sheet_name, **SHEET_SPECS[file_type][sheet_name])
+
+
 def load_ventas_contado() -> pd.DataFrame:
     """Carga ventas al contado"""
-    cols = ['SEGMENTO DE NEGOCIO', 'TIPO DE VENTA', 'TIPO/PRODUCTO', 'CLIENTE ADMON',
-            'KG NETOS', 'CAJAS/BULTOS', 'PRECIO', 'TOTAL VENTA', 'FORMA DE PAGO',
-            'OPERADOR', 'FECHA', 'NOTA', 'ID']
-    return load_excel_sheet('ventas', 'VENTAS AL CONTADO', header=7, usecols=cols)
+    return _load_registered('ventas', 'VENTAS AL CONTADO')
 
 
 def load_ventas_credito() -> pd.DataFrame:
     """Carga ventas a crédito"""
-    cols = ['SEGMENTO DE NEGOCIO', 'TIPO DE VENTA', 'TIPO/PRODUCTO', 'CLIENTE ADMON',
-            'KG NETOS', 'CAJAS O BULTOS', 'PRECIO UNITARIO', 'TOTAL VENTA',
-            'OPERADOR', 'FECHA', 'SALDO', 'NOTA (SI APLICA)', 'ID', 'COBROS EFECTUADOS']
-    return load_excel_sheet('ventas', 'VENTAS A CRÉDITO', header=7, usecols=cols)
+    return _load_registered('ventas', 'VENTAS A CRÉDITO')
 
 
 def load_compras_cebolla() -> pd.DataFrame:
     """Carga compras de cebolla"""
-    cols = ['FECHA', 'PROVEEDOR DE CEBOLLA', 'COSTALES', 'KG NETOS', 'PRECIO X KG', 
-            'TOTAL', 'ESTATUS', 'ID']
-    return load_excel_sheet('almacen', 'COMPRAS (C)', header=9, usecols=cols)
+    return _load_registered('almacen', 'COMPRAS (C)')
 
 
 def load_compras_huevo() -> pd.DataFrame:
     """Carga compras de huevo"""
-    cols = ['FECHA', 'PROVEEDOR DE HUEVO', 'CAJAS', 'KG NETOS', 'PRECIO x KG', 
-            'TOTAL', 'ESTATUS', 'MARCA DE HUEVO', 'ID']
-    return load_excel_sheet('almacen', 'COMPRAS (H)', header=9, usecols=cols)
+    return _load_registered('almacen', 'COMPRAS (H)')
 
 
 def load_egresos() -> pd.DataFrame:
     """Carga egresos/gastos"""
-    cols = ['ID', 'FECHA', 'TIPO DE EGRESO', 'CENTRO DE COSTOS', 'CONCEPTO', 
-            'IMPORTE', 'OPERADOR', 'CLASIFICACIÓN COSTO/GASTO']
-    return load_excel_sheet('ventas', 'EGRESOS EN EFECTIVO', header=8, usecols=cols)
+    return _load_registered('ventas', 'EGRESOS EN EFECTIVO')
 
 
 def load_stock_almacen_cebolla() -> pd.DataFrame:
     """Carga control de almacén de cebolla"""
-    return load_excel_sheet('almacen', 'CONTROL DE ALMACÉN (C)', header=9)
+    return _load_registered('almacen', 'CONTROL DE ALMACÉN (C)')
 
 
 def load_stock_almacen_huevo() -> pd.DataFrame:
     """Carga control de almacén de huevo"""
-    return load_excel_sheet('almacen', 'CONTROL DE ALMACÉN (H)', header=9)
+    return _load_registered('almacen', 'CONTROL DE ALMACÉN (H)')
 
 
 def load_cajas() -> pd.DataFrame:
     """Carga la hoja de control de cajas por operador"""
-    cols = ['SEMANA', 'FECHA', 'CONCEPTO', 'EMILIO', 'RICHARD', 'BODEGA 55',
-            'DIEGO', 'OTRAS ENTRADAS DE EFECTIVO (+)',
-            'OTRAS SALIDAS DE EFECTIVO (-)', 'SALDO FINAL DE EFECTIVO', 'NOTA']
-    return load_excel_sheet('ventas', 'CAJAS', header=4, usecols=cols)
+    return _load_registered('ventas', 'CAJAS')
 
 
 def load_pagos_generales() -> pd.DataFrame:
     """Carga la hoja de pagos generales (cobros por cliente)"""
-    cols = ['ID', 'FECHA DE COBRO', 'CLIENTE ADMON', 'MONTO PAGADO', 'TIPO DE MOVIMIENTO']
-    return load_excel_sheet('ventas', 'PAGOS_GENERALES', header=5, usecols=cols)
+    return _load_registered('ventas', 'PAGOS_GENERALES')
 
 
 def get_data_source_info() -> dict:
@@ -145,5 +692,7 @@ def get_data_source_info() -> dict:
         "local_files_exist": {
             "ventas": VENTAS_FILE.exists(),
             "almacen": ALMACEN_FILE.exists()
-        }
+        },
+        "cache": get_cache_stats(),
+        "token": get_token_stats() if USE_ONEDRIVE else None
     }
@@ -0,0 +1,214 @@
+"""
+Servidor falso de Microsoft Graph para pruebas locales
+Sirve archivos locales como si fueran items de OneDrive:
+
+    GET /me/drive/items/{item_id}           -> metadatos (eTag, cTag, lastModifiedDateTime)
+    GET /me/drive/items/{item_id}/content   -> contenido del archivo
+    GET /me/drive/items/{item_id}/workbook/worksheets/{hoja}/usedRange(valuesOnly=true)
+    GET /me/drive/items/{item_id}/workbook/worksheets/{hoja}/range(address='A1:C9')
+                                            -> valores y formatos numéricos (con $select)
+
+Uso:
+    python fake_graph_server.py --port 8765 ventas=../ventas.xlsx almacen=../almacen.xlsx
+    GRAPH_BASE_URL=http://127.0.0.1:8765 MICROSOFT_ACCESS_TOKEN=fake uvicorn main:app
+"""
+
+import re
+import sys
+import json
+import time
+import hashlib
+import threading
+from collections import Counter
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter, range_boundaries
+from openpyxl.utils.datetime import to_excel
+
+
+class FakeGraphServer(ThreadingHTTPServer):
+    """Servidor HTTP con el mapa item_id -> archivo y contadores de peticiones"""
+    daemon_threads = True
+
+    def __init__(self, address, files: Dict[str, Path]):
+        super().__init__(address, _Handler)
+        self.files = {item_id: Path(path) for item_id, path in files.items()}
+        self.requests = Counter()
+        # Segundos de espera antes de servir /content (simula descargas lentas)
+        self.content_delay = 0.0
+        # Estados HTTP con que responder las próximas peticiones /workbook (p.ej. [401])
+        self.workbook_errors = []
+        # Conexiones TCP aceptadas (las peticiones keep-alive reutilizan la misma)
+        self.connections = 0
+        self._lock = threading.Lock()
+        # Libros abiertos con openpyxl por (ruta, mtime) para las rutas /workbook
+        self._books = {}
+
+    def count(self, kind: str, item_id: str):
+        with self._lock:
+            self.requests[(kind, item_id)] += 1
+
+    def workbook(self, file_path: Path):
+        """Libro abierto (solo valores) de la versión actual del archivo"""
+        key = (file_path, file_path.stat().st_mtime_ns)
+        with self._lock:
+            if key not in self._books:
+                self._books = {key: load_workbook(file_path, data_only=True)}
+            return self._books[key]
+
+    def handle_error(self, request, client_address):
+        # Un cliente keep-alive que cierra su conexión no es un error del servidor
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeGraphServer
+    # Keep-alive: todas las respuestas llevan Content-Length
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = 'application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str):
+        self._send(status, json.dumps({"error": {"code": str(status), "message": message}}).encode())
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        # me/drive/items/{id}[/content]
+        if len(parts) < 4 or parts[:3] != ['me', 'drive', 'items']:
+            return self._error(404, f"Ruta no soportada: {self.path}")
+
+        item_id = parts[3]
+        file_path = self.server.files.get(item_id)
+        if file_path is None or not file_path.exists():
+            return self._error(404, f"Item no encontrado: {item_id}")
+
+        content = file_path.read_bytes()
+        if len(parts) == 4:
+            self.server.count('info', item_id)
+            return self._send(200, json.dumps(_metadata(item_id, file_path, content)).encode())
+        if len(parts) == 5 and parts[4] == 'content':
+            self.server.count('content', item_id)
+            time.sleep(self.server.content_delay)
+            return self._send(200, content, 'application/octet-stream')
+        if len(parts) == 8 and parts[4:6] == ['workbook', 'worksheets']:
+            with self.server._lock:
+                status = self.server.workbook_errors.pop(0) if self.server.workbook_errors else None
+            if status is not None:
+                return self._error(status, f"Error simulado: {status}")
+            return self._range(item_id, file_path, parts[6], parts[7], parse_qs(url.query))
+        return self._error(404, f"Ruta no soportada: {self.path}")
+
+    def _range(self, item_id: str, file_path: Path, sheet_name: str, function: str, query: dict):
+        """usedRange(valuesOnly=true) o range(address='...') de una hoja, como workbookRange"""
+        workbook = self.server.workbook(file_path)
+        if sheet_name not in workbook.sheetnames:
+            return self._error(404, f"Hoja no encontrada: {sheet_name}")
+        sheet = workbook[sheet_name]
+
+        if function.startswith('usedRange'):
+            self.server.count('used_range', item_id)
+            address = _used_address(sheet)
+        else:
+            match = re.fullmatch(r"range\(address='([A-Z]+[0-9]+(?::[A-Z]+[0-9]+)?)'\)", function)
+            if match is None:
+                return self._error(400, f"Función no soportada: {function}")
+            self.server.count('range', item_id)
+            address = match.group(1)
+
+        min_col, min_row, max_col, max_row = range_boundaries(address)
+        cells = [
+            [sheet.cell(row=row, column=col) for col in range(min_col, max_col + 1)]
+            for row in range(min_row, max_row + 1)
+        ]
+        body = {
+            "address": f"'{sheet_name}'!{address}",
+            "values": [[_graph_value(cell.value) for cell in row] for row in cells],
+            "numberFormat": [[cell.number_format for cell in row] for row in cells],
+        }
+        select = query.get('$select')
+        if select:
+            body = {key: value for key, value in body.items() if key in select[0].split(',')}
+        return self._send(200, json.dumps(body).encode())
+
+
+def _used_address(sheet) -> str:
+    """Dirección del rango con valores de una hoja (A1 si está vacía)"""
+    rows, cols = [], []
+    for row in sheet.iter_rows():
+        for cell in row:
+            if cell.value is not None and cell.value != "":
+                rows.append(cell.row)
+                cols.append(cell.column)
+    if not rows:
+        return 'A1'
+    return f"{get_column_letter(min(cols))}{min(rows)}:{get_column_letter(max(cols))}{max(rows)}"
+
+
+def _graph_value(value):
+    """Valor de celda como lo entrega Graph: fechas como número de serie y celdas vacías como texto vacío"""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date, dt_time, timedelta)):
+        return to_excel(value)
+    return value
+
+
+def _metadata(item_id: str, file_path: Path, content: bytes) -> dict:
+    """Metadatos estilo driveItem: las etiquetas cambian con el contenido"""
+    digest = hashlib.sha1(content).hexdigest()
+    modified = datetime.fromtimestamp(file_path.stat().st_mtime, tz=timezone.utc)
+    return {
+        "id": item_id,
+        "name": file_path.name,
+        "size": len(content),
+        "eTag": f'"{{{digest}}},1"',
+        "cTag": f'"c:{{{digest}}},1"',
+        "lastModifiedDateTime": modified.strftime('%Y-%m-%dT%H:%M:%SZ')
+    }
+
+
+def start_fake_graph(files: Dict[str, Path], port: int = 0) -> Tuple[FakeGraphServer, threading.Thread]:
+    """Arranca el servidor en un hilo de fondo (port=0 elige un puerto libre)"""
+    server = FakeGraphServer(('127.0.0.1', port), files)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor falso de Microsoft Graph")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('files', nargs='+', help="Pares item_id=ruta_al_archivo")
+    args = parser.parse_args()
+
+    files = dict(pair.split('=', 1) for pair in args.files)
+    server = FakeGraphServer(('127.0.0.1', args.port), files)
+    print(f"Fake Graph escuchando en {server.base_url}")
+    server.serve_forever()
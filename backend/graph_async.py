@@ -0,0 +1,105 @@
+"""
+Cliente HTTP asíncrono para Microsoft Graph
+Un solo httpx.AsyncClient compartido por proceso: conexiones keep-alive
+reutilizadas, HTTP/2 si el paquete h2 está instalado y timeouts configurables.
+Las lecturas que corren en hilos de trabajo usan su par síncrono con la misma
+configuración (un httpx.Client compartido, seguro entre hilos).
+"""
+
+import os
+import asyncio
+import threading
+import httpx
+from typing import Optional, Dict, Any
+
+# Timeouts y tamaño del pool (configurables por variables de entorno)
+GRAPH_TIMEOUT_SECONDS = float(os.getenv('GRAPH_TIMEOUT_SECONDS', '60'))
+GRAPH_CONNECT_TIMEOUT_SECONDS = float(os.getenv('GRAPH_CONNECT_TIMEOUT_SECONDS', '10'))
+GRAPH_MAX_CONNECTIONS = int(os.getenv('GRAPH_MAX_CONNECTIONS', '10'))
+
+# HTTP/2 solo si está disponible (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+USE_HTTP2 = HTTP2_AVAILABLE and os.getenv('GRAPH_HTTP2', 'true').lower() == 'true'
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+
+
+def _client_options() -> Dict[str, Any]:
+    return dict(
+        http2=USE_HTTP2,
+        timeout=httpx.Timeout(GRAPH_TIMEOUT_SECONDS, connect=GRAPH_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=GRAPH_MAX_CONNECTIONS,
+            max_keepalive_connections=GRAPH_MAX_CONNECTIONS
+        ),
+        follow_redirects=True
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """Retorna el cliente compartido, creándolo en el event loop actual si hace falta"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    # Un AsyncClient queda ligado al loop donde abrió sus conexiones
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(**_client_options())
+        _client_loop = loop
+    return _client
+
+
+def get_sync_client() -> httpx.Client:
+    """Cliente síncrono compartido, para peticiones desde hilos de trabajo (keep-alive entre llamadas)"""
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(**_client_options())
+        return _sync_client
+
+
+async def close_client():
+    """Cierra los clientes compartidos (al apagar la aplicación)"""
+    global _client, _client_loop, _sync_client
+    # Un cliente de otro loop (ya cerrado) no puede cerrar sus conexiones: solo se descarta
+    if _client is not None and not _client.is_closed and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+    with _sync_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+        _sync_client = None
+
+
+async def get_json(url: str, token: str) -> Dict[str, Any]:
+    """GET autenticado que retorna JSON (lanza httpx.HTTPError si falla)"""
+    response = await get_client().get(url, headers={'Authorization': f'Bearer {token}'})
+    response.raise_for_status()
+    return response.json()
+
+
+async def get_bytes(url: str, token: str) -> bytes:
+    """GET autenticado que retorna el cuerpo en bytes (lanza httpx.HTTPError si falla)"""
+    response = await get_client().get(url, headers={'Authorization': f'Bearer {token}'})
+    response.raise_for_status()
+    return response.content
+
+
+def get_json_sync(url: str, token: str) -> Dict[str, Any]:
+    """Versión síncrona de get_json (cliente síncrono compartido, para hilos de trabajo)"""
+    response = get_sync_client().get(url, headers={'Authorization': f'Bearer {token}'})
+    response.raise_for_status()
+    return response.json()
+
+
+def get_bytes_sync(url: str, token: str) -> bytes:
+    """Versión síncrona de get_bytes (cliente síncrono compartido, para hilos de trabajo)"""
+    response = get_sync_client().get(url, headers={'Authorization': f'Bearer {token}'})
+    response.raise_for_status()
+    return response.content
@@ -5,13 +5,32 @@ Para cuentas personales de Microsoft (Outlook, Hotmail)
 
 import os
 import io
+import re
+import time
+import asyncio
+import hashlib
+import threading
 import httpx
 import msal
 import pandas as pd
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple
 from datetime import datetime, timedelta
+from urllib.parse import quote
+from openpyxl.styles.numbers import is_date_format, is_timedelta_format
+from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.utils.datetime import from_excel
 from dotenv import load_dotenv
 
+# Intentar import relativo (para Render) o directo (local)
+try:
+    from backend.singleflight import SingleFlight
+    from backend import graph_async, profiling, metrics
+except ImportError:
+    from singleflight import SingleFlight
+    import graph_async
+    import profiling
+    import metrics
+
 # Cargar variables de entorno
 load_dotenv()
 
@@ -24,8 +43,16 @@ TENANT_ID = os.getenv('MICROSOFT_TENANT_ID', 'consumers')  # Usar 'consumers' o
 EXCEL_VENTAS_ITEM_ID = os.getenv('EXCEL_VENTAS_ITEM_ID')
 EXCEL_ALMACEN_ITEM_ID = os.getenv('EXCEL_ALMACEN_ITEM_ID')
 
-# URLs de Microsoft Graph
-GRAPH_BASE_URL = 'https://graph.microsoft.com/v1.0'
+# URLs de Microsoft Graph (configurable para pruebas con un servidor falso local)
+GRAPH_BASE_URL = os.getenv('GRAPH_BASE_URL', 'https://graph.microsoft.com/v1.0')
+
+# Filas por petición al leer una hoja por rangos (Graph limita el tamaño de cada respuesta)
+GRAPH_RANGE_ROWS = int(os.getenv('GRAPH_RANGE_ROWS', '5000'))
+
+# Intervalo del sondeo de cambios en segundo plano
+POLL_INTERVAL_SECONDS = float(os.getenv('GRAPH_POLL_SECONDS', '30'))
+# Intervalos sin un sondeo exitoso tras los cuales el caché vuelve a expirar por TTL
+POLL_STALE_INTERVALS = 3
 
 # Token de acceso manual (temporal)
 # Este token debe generarse manualmente desde Graph Explorer
@@ -34,6 +61,20 @@ ACCESS_TOKEN = os.getenv('MICROSOFT_ACCESS_TOKEN', '')
 # Caché de archivos
 _file_cache = {}
 _df_cache = {}
+# Hash del contenido descargado por item_id (versión del libro)
+_file_hashes = {}
+# Huella remota (cTag/eTag + lastModifiedDateTime) del contenido en caché por item_id
+_file_fingerprints = {}
+# Versión según metadatos de los archivos que se leen por rangos: item_id -> (versión, hora)
+_item_versions = {}
+# Último sondeo exitoso (time.monotonic) e intervalo del sondeo en curso:
+# mientras el sondeo esté al día, el caché de archivos no expira por TTL
+_last_poll_ok: Optional[float] = None
+_poll_interval = POLL_INTERVAL_SECONDS
+
+# Descargas y parseos concurrentes del mismo archivo/hoja se hacen una sola vez
+_downloads = SingleFlight()
+_parses = SingleFlight()
 
 
 class GraphAPIError(Exception):
@@ -67,22 +108,20 @@ def get_msal_app():
     )
     return app, save_cache
 
-def get_access_token() -> str:
+def _acquire_token(app, save_cache) -> tuple:
     """
-    Obtiene un token de acceso válido.
+    Obtiene un token de acceso válido y sus segundos de vigencia.
     1. Intenta silenciosamente via caché local (dev).
     2. Intenta usar REFRESH TOKEN via variable de entorno (prod/render).
     3. Intenta usar token estático (emergencia).
     """
-    app, save_cache = get_msal_app()
-    
     # 1. Intentar obtener token del caché silenciosamente
     accounts = app.get_accounts()
     if accounts:
         result = app.acquire_token_silent(SCOPES, account=accounts[0])
         if result and 'access_token' in result:
             save_cache()
-            return result['access_token']
+            return result['access_token'], int(result.get('expires_in', 3600))
     
     # 2. Estrategia Producción (Render): Usar Refresh Token inyectado
     refresh_token = os.getenv('MICROSOFT_REFRESH_TOKEN')
@@ -90,14 +129,12 @@ def get_access_token() -> str:
         # Intentar canjear refresh token por uno nuevo de acceso
         result = app.acquire_token_by_refresh_token(refresh_token, scopes=SCOPES)
         if result and 'access_token' in result:
-            # Opcional: imprimir algo en logs para debug
-            # print("Token refrescado exitosamente usando env var")
-            return result['access_token']
+            return result['access_token'], int(result.get('expires_in', 3600))
     
-    # 3. Fallback: Token manual estático
+    # 3. Fallback: Token manual estático (vigencia desconocida: se relee cada pocos minutos)
     token = os.getenv('MICROSOFT_ACCESS_TOKEN', '')
     if token:
-        return token
+        return token, STATIC_TOKEN_TTL_SECONDS
 
     raise GraphAPIError(
         "No se pudo autenticar. En Render, asegura configurar MICROSOFT_REFRESH_TOKEN. "
@@ -105,6 +142,140 @@ def get_access_token() -> str:
     )
 
 
+# Renovar el token este número de segundos antes de que expire
+TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv('TOKEN_REFRESH_MARGIN_SECONDS', '300'))
+STATIC_TOKEN_TTL_SECONDS = 600
+
+
+class TokenManager:
+    """
+    Token de acceso en memoria compartido por todo el proceso
+
+    - Mientras el token sea vigente, get_token() no hace I/O.
+    - Dentro del margen de renovación retorna el token actual y lo renueva en
+      un hilo de fondo.
+    - Las renovaciones se serializan: nunca hay dos canjes simultáneos.
+    """
+
+    def __init__(self, refresh_margin: int = TOKEN_REFRESH_MARGIN_SECONDS):
+        self.refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        self._msal = None
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._background = False
+        # Solo protege _background: el lock principal puede estar tomado durante un canje
+        self._background_lock = threading.Lock()
+        self.stats = {
+            'acquisitions': 0,
+            'cache_hits': 0,
+            'background_refreshes': 0,
+            'refresh_failures': 0,
+            'last_refresh_seconds': 0.0,
+            'total_refresh_seconds': 0.0
+        }
+
+    def get_token(self) -> str:
+        """Token vigente; solo bloquea si no hay token o ya expiró"""
+        now = time.monotonic()
+        token = self._token
+        if token and now < self._expires_at:
+            self.stats['cache_hits'] += 1
+            if now >= self._expires_at - self.refresh_margin:
+                self._refresh_in_background()
+            return token
+
+        with self._lock:
+            # Otro hilo pudo renovarlo mientras esperábamos el lock
+            if self._token and time.monotonic() < self._expires_at:
+                self.stats['cache_hits'] += 1
+                return self._token
+            return self._refresh()
+
+    def _refresh(self) -> str:
+        """Canjea un token nuevo (llamar con el lock tomado)"""
+        started = time.perf_counter()
+        try:
+            if self._msal is None:
+                self._msal = get_msal_app()
+            token, expires_in = _acquire_token(*self._msal)
+        except Exception:
+            self.stats['refresh_failures'] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stats['last_refresh_seconds'] = elapsed
+            self.stats['total_refresh_seconds'] += elapsed
+
+        self.stats['acquisitions'] += 1
+        self._token = token
+        self._expires_at = time.monotonic() + expires_in
+        return token
+
+    def _refresh_in_background(self):
+        """Lanza una renovación anticipada si no hay otra en curso (sin esperar al canje en curso)"""
+        with self._background_lock:
+            if self._background:
+                return
+            self._background = True
+
+        def run():
+            try:
+                with self._lock:
+                    if time.monotonic() < self._expires_at - self.refresh_margin:
+                        return
+                    self._refresh()
+                    self.stats['background_refreshes'] += 1
+            except Exception as e:
+                # El token actual sigue siendo válido hasta expirar; se reintenta después
+                print(f"[WARNING] Error renovando token de Graph: {e}")
+            finally:
+                self._background = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def invalidate(self):
+        """Descarta el token en memoria (p.ej. tras un 401)"""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+
+
+_token_manager = TokenManager()
+
+
+def get_access_token() -> str:
+    """Obtiene un token de acceso válido (en memoria, renovado antes de expirar)"""
+    return _token_manager.get_token()
+
+
+def _check_unauthorized(error: httpx.HTTPError):
+    """Si Graph rechazó el token (401), descartarlo para canjear uno nuevo"""
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 401:
+        _token_manager.invalidate()
+
+
+def get_token_stats() -> dict:
+    """Métricas de adquisición y renovación de tokens"""
+    return dict(_token_manager.stats)
+
+
+def _token_samples():
+    stats = _token_manager.stats
+    for event in ('acquisitions', 'cache_hits', 'background_refreshes', 'refresh_failures'):
+        yield 'ova_graph_token_events_total', {'event': event}, stats[event]
+
+
+metrics.register_collector(
+    'ova_graph_token_events_total', 'counter',
+    'Adquisiciones, aciertos en memoria, renovaciones de fondo y fallos del token de Graph', _token_samples
+)
+metrics.register_collector(
+    'ova_graph_token_refresh_seconds_total', 'counter', 'Tiempo total dedicado a canjear tokens',
+    lambda: [('ova_graph_token_refresh_seconds_total', {}, _token_manager.stats['total_refresh_seconds'])]
+)
+
+
 def download_excel_file(item_id: str, cache_minutes: int = 2) -> bytes:
     """
     Descarga un archivo Excel desde OneDrive personal
@@ -117,31 +288,102 @@ def download_excel_file(item_id: str, cache_minutes: int = 2) -> bytes:
         Contenido del archivo en bytes
     """
     # Verificar caché
+    cached_data = _cached_file(item_id, cache_minutes)
+    if cached_data is not None:
+        return cached_data
+    
+    with profiling.span('download'):
+        return _downloads.do(item_id, _download, item_id)
+
+
+async def download_excel_file_async(item_id: str, cache_minutes: int = 2) -> bytes:
+    """
+    Versión asíncrona de download_excel_file (no bloquea el event loop)
+    
+    Args:
+        item_id: ID del archivo en OneDrive
+        cache_minutes: Minutos para cachear el archivo
+    
+    Returns:
+        Contenido del archivo en bytes
+    """
+    cached_data = _cached_file(item_id, cache_minutes)
+    if cached_data is not None:
+        return cached_data
+    
+    with profiling.span('download'):
+        return await _downloads.do_async(item_id, _download_async, item_id)
+
+
+def _cached_file(item_id: str, cache_minutes: int) -> Optional[bytes]:
+    """Contenido en caché si sigue vigente, o None"""
     cache_key = f"file_{item_id}"
     if cache_key in _file_cache:
         cached_data, cached_time = _file_cache[cache_key]
-        if datetime.now() - cached_time < timedelta(minutes=cache_minutes):
+        # Con el sondeo al día, el caché se renueva solo cuando el archivo cambia
+        if _watcher_fresh() or datetime.now() - cached_time < timedelta(minutes=cache_minutes):
+            metrics.graph_cache_total.inc(cache='file', result='hit')
             return cached_data
+        # Entrada vencida por TTL: la siguiente descarga la reemplaza
+        metrics.graph_cache_total.inc(cache='file', result='eviction')
+    metrics.graph_cache_total.inc(cache='file', result='miss')
+    return None
+
+
+def _store_file(item_id: str, file_content: bytes):
+    """Guarda un contenido descargado en caché junto con su hash"""
+    _file_cache[f"file_{item_id}"] = (file_content, datetime.now())
+    _file_hashes[item_id] = hashlib.sha1(file_content).hexdigest()
+
+
+def _record_download(mode: str, started: float, size: Optional[int]):
+    """Cuenta una descarga (ok/error) con su duración y tamaño en bytes"""
+    outcome = 'ok' if size is not None else 'error'
+    metrics.graph_downloads_total.inc(mode=mode, outcome=outcome)
+    metrics.graph_download_seconds.observe(time.perf_counter() - started, mode=mode)
+    if size is not None:
+        metrics.graph_download_bytes.observe(size, mode=mode)
+
+
+async def _download_async(item_id: str) -> bytes:
+    """Descarga asíncrona con el cliente compartido y actualiza el caché"""
+    token = await asyncio.to_thread(get_access_token)
+    download_url = f'{GRAPH_BASE_URL}/me/drive/items/{item_id}/content'
+    
+    started = time.perf_counter()
+    try:
+        file_content = await graph_async.get_bytes(download_url, token)
+    except httpx.HTTPError as e:
+        _record_download('async', started, None)
+        _check_unauthorized(e)
+        raise GraphAPIError(f"Error descargando archivo {item_id}: {str(e)}")
     
-    # Descargar archivo
+    _record_download('async', started, len(file_content))
+    _store_file(item_id, file_content)
+    return file_content
+
+
+def _download(item_id: str) -> bytes:
+    """Descarga el contenido de un archivo y actualiza el caché"""
     token = get_access_token()
-    headers = {'Authorization': f'Bearer {token}'}
     
     # Usar /me/drive para cuentas personales
     download_url = f'{GRAPH_BASE_URL}/me/drive/items/{item_id}/content'
     
+    started = time.perf_counter()
     try:
-        response = httpx.get(download_url, headers=headers, timeout=60.0, follow_redirects=True)
-        response.raise_for_status()
-        
-        file_content = response.content
+        # Cliente síncrono compartido: reutiliza la conexión TLS entre llamadas
+        file_content = graph_async.get_bytes_sync(download_url, token)
+        _record_download('sync', started, len(file_content))
         
         # Guardar en caché
-        _file_cache[cache_key] = (file_content, datetime.now())
+        _store_file(item_id, file_content)
         
         return file_content
     
     except httpx.HTTPError as e:
+        _record_download('sync', started, None)
+        _check_unauthorized(e)
         raise GraphAPIError(f"Error descargando archivo {item_id}: {str(e)}")
 
 
@@ -165,10 +407,13 @@ def read_excel_sheet(item_id: str, sheet_name: str, header: int = 0, **kwargs) -
     if cache_key in _df_cache:
         df, cached_time = _df_cache[cache_key]
         if datetime.now() - cached_time < timedelta(minutes=2):
+            metrics.graph_cache_total.inc(cache='dataframe', result='hit')
             # Retornamos una copia para evitar mutaciones accidentales en el cache
             return df.copy()
+        metrics.graph_cache_total.inc(cache='dataframe', result='eviction')
+    metrics.graph_cache_total.inc(cache='dataframe', result='miss')
             
-    try:
+    def parse_sheet() -> pd.DataFrame:
         file_content = download_excel_file(item_id)
         
         # Leer Excel desde bytes
@@ -177,18 +422,32 @@ def read_excel_sheet(item_id: str, sheet_name: str, header: int = 0, **kwargs) -
         
         # Guardar en caché de DFs
         _df_cache[cache_key] = (df, datetime.now())
-        
+        return df
+    
+    try:
+        # Llamadas simultáneas a la misma hoja comparten un solo parseo
+        df = _parses.do(cache_key, parse_sheet)
         return df.copy()
     
     except Exception as e:
         raise GraphAPIError(f"Error leyendo hoja '{sheet_name}' del archivo {item_id}: {str(e)}")
 
 
+def get_file_hash(item_id: str) -> Optional[str]:
+    """Hash (SHA-1) del último contenido descargado de un archivo"""
+    return _file_hashes.get(item_id)
+
+
 def clear_cache():
     """Limpia el caché de archivos y dataframes"""
-    global _file_cache, _df_cache
+    global _file_cache, _df_cache, _file_hashes, _file_fingerprints, _item_versions
+    metrics.graph_cache_total.inc(len(_file_cache), cache='file', result='eviction')
+    metrics.graph_cache_total.inc(len(_df_cache), cache='dataframe', result='eviction')
     _file_cache = {}
     _df_cache = {}
+    _file_hashes = {}
+    _file_fingerprints = {}
+    _item_versions = {}
 
 
 def get_file_info(item_id: str) -> Dict[str, Any]:
@@ -202,16 +461,25 @@ def get_file_info(item_id: str) -> Dict[str, Any]:
         Diccionario con información del archivo
     """
     token = get_access_token()
-    headers = {'Authorization': f'Bearer {token}'}
-    
     url = f'{GRAPH_BASE_URL}/me/drive/items/{item_id}'
     
     try:
-        response = httpx.get(url, headers=headers, timeout=30.0)
-        response.raise_for_status()
-        return response.json()
+        return graph_async.get_json_sync(url, token)
+    
+    except httpx.HTTPError as e:
+        _check_unauthorized(e)
+        raise GraphAPIError(f"Error obteniendo info del archivo {item_id}: {str(e)}")
+
+
+async def get_file_info_async(item_id: str) -> Dict[str, Any]:
+    """Versión asíncrona de get_file_info (cliente compartido con keep-alive)"""
+    token = await asyncio.to_thread(get_access_token)
+    url = f'{GRAPH_BASE_URL}/me/drive/items/{item_id}'
     
+    try:
+        return await graph_async.get_json(url, token)
     except httpx.HTTPError as e:
+        _check_unauthorized(e)
         raise GraphAPIError(f"Error obteniendo info del archivo {item_id}: {str(e)}")
 
 
@@ -228,3 +496,227 @@ def read_almacen_sheet(sheet_name: str, header: int = 9, **kwargs) -> pd.DataFra
     if not EXCEL_ALMACEN_ITEM_ID:
         raise GraphAPIError("EXCEL_ALMACEN_ITEM_ID no configurado en variables de entorno")
     return read_excel_sheet(EXCEL_ALMACEN_ITEM_ID, sheet_name, header, **kwargs)
+
+
+# ==================== LECTURA POR RANGOS ====================
+
+# Esquina inferior derecha de una dirección como 'CAJAS'!A1:K215 (o una sola celda)
+_ADDRESS_END = re.compile(r'\$?([A-Z]+)\$?(\d+)$')
+
+
+def _range_end(address: str) -> Tuple[int, int]:
+    """(última fila, última columna), en base 1, de una dirección de Graph"""
+    match = _ADDRESS_END.search(address.rsplit('!', 1)[-1])
+    if match is None:
+        raise GraphAPIError(f"Dirección de rango no reconocida: {address}")
+    return int(match.group(2)), column_index_from_string(match.group(1))
+
+
+def _column_runs(columns: List[int]) -> List[Tuple[int, int]]:
+    """Columnas (base 1, ordenadas) agrupadas en tramos contiguos [inicio, fin]"""
+    runs = []
+    for col in columns:
+        if runs and runs[-1][1] == col - 1:
+            runs[-1][1] = col
+        else:
+            runs.append([col, col])
+    return [tuple(run) for run in runs]
+
+
+def _cell_value(value, number_format: Optional[str]):
+    """Valor de una celda de Graph tal como lo entrega openpyxl con data_only"""
+    if value == "":
+        return None
+    # Graph entrega las fechas como número de serie; el formato dice si es fecha u hora
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and number_format \
+            and is_date_format(number_format):
+        return from_excel(value, timedelta=is_timedelta_format(number_format))
+    return value
+
+
+def read_sheet_values(item_id: str, sheet_name: str, header: int, usecols: Optional[list] = None) -> List[list]:
+    """
+    Lee los valores de una hoja con la API de libros de Graph, sin descargar el archivo
+
+    Pide el rango usado de la hoja y luego solo las columnas de 'usecols' (por su
+    nombre en la fila de encabezado), en bloques de GRAPH_RANGE_ROWS filas. Si
+    alguna no está en el encabezado lanza ValueError, como al parsear el archivo.
+    Las fechas se asumen con el sistema de 1900 (el de Excel en Windows).
+
+    Args:
+        item_id: ID del archivo en OneDrive
+        sheet_name: Nombre de la hoja
+        header: Fila (base 0) con los nombres de columna
+        usecols: Columnas a traer (None = todas)
+
+    Returns:
+        Filas de valores desde la fila 1 de la hoja (None en celdas vacías o no pedidas)
+    """
+    token = get_access_token()
+    sheet_url = f'{GRAPH_BASE_URL}/me/drive/items/{item_id}/workbook/worksheets/{quote(sheet_name, safe="")}'
+    # Cliente compartido: todas las peticiones (y hojas) reutilizan las conexiones abiertas
+    client = graph_async.get_sync_client()
+    received = 0
+
+    def get(path: str) -> Dict[str, Any]:
+        nonlocal received, token
+        url = f'{sheet_url}/{path}'
+        response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 401:
+                raise
+            # Token rechazado a media lectura: se descarta y se reintenta una vez con uno nuevo
+            _check_unauthorized(e)
+            token = get_access_token()
+            response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+            response.raise_for_status()
+        received += len(response.content)
+        return response.json()
+
+    def fetch(rows: List[list], first_col: int, last_col: int, first_row: int, last_row: int):
+        for start in range(first_row, last_row + 1, GRAPH_RANGE_ROWS):
+            end = min(start + GRAPH_RANGE_ROWS - 1, last_row)
+            address = f'{get_column_letter(first_col)}{start}:{get_column_letter(last_col)}{end}'
+            block = get(f"range(address='{address}')?$select=values,numberFormat")
+            for offset, (values, formats) in enumerate(zip(block['values'], block['numberFormat'])):
+                rows[start - 1 + offset][first_col - 1:last_col] = [
+                    _cell_value(value, fmt) for value, fmt in zip(values, formats)
+                ]
+
+    started = time.perf_counter()
+    try:
+        used = get('usedRange(valuesOnly=true)?$select=address')
+        n_rows, n_cols = _range_end(used['address'])
+        rows = [[None] * n_cols for _ in range(n_rows)]
+        if usecols is None:
+            fetch(rows, 1, n_cols, 1, n_rows)
+        elif header < n_rows:
+            # Encabezado completo (para ubicar las columnas), luego solo las columnas pedidas
+            fetch(rows, 1, n_cols, header + 1, header + 1)
+            names = rows[header]
+            missing = [col for col in usecols if col not in names]
+            if missing:
+                # Columna renombrada en el Excel: mismo error que al parsear el archivo
+                raise ValueError(
+                    f"Usecols do not match columns, columns expected but not found: {missing} "
+                    f"(sheet: {sheet_name})"
+                )
+            wanted = sorted({names.index(col) + 1 for col in usecols})
+            # Última fila usada completa: las filas con datos solo en otras columnas
+            # también cuentan para el largo de la hoja (como al parsear el archivo)
+            if n_rows > header + 1:
+                fetch(rows, 1, n_cols, n_rows, n_rows)
+            for first_col, last_col in _column_runs(wanted):
+                if header + 2 <= n_rows:
+                    fetch(rows, first_col, last_col, header + 2, n_rows)
+    except httpx.HTTPError as e:
+        _record_download('range', started, None)
+        _check_unauthorized(e)
+        raise GraphAPIError(f"Error leyendo rangos de '{sheet_name}' del archivo {item_id}: {str(e)}")
+
+    _record_download('range', started, received)
+    return rows
+
+
+def _metadata_version(info: Dict[str, Any]) -> str:
+    """Versión de un archivo según sus metadatos de Graph (apta para nombres de archivo)"""
+    return hashlib.sha1(_fingerprint(info).encode()).hexdigest()
+
+
+def get_item_version(item_id: str, cache_minutes: int = 2) -> str:
+    """
+    Versión de un archivo sin descargarlo (para libros que se leen solo por rangos)
+
+    Consulta los metadatos como mucho cada 'cache_minutes'; con el sondeo al día
+    la versión se actualiza solo cuando el sondeo detecta un cambio.
+    """
+    cached = _item_versions.get(item_id)
+    if cached is not None and (_watcher_fresh() or datetime.now() - cached[1] < timedelta(minutes=cache_minutes)):
+        return cached[0]
+    version = _metadata_version(get_file_info(item_id))
+    _item_versions[item_id] = (version, datetime.now())
+    return version
+
+
+# ==================== SONDEO DE CAMBIOS ====================
+
+def _watcher_fresh() -> bool:
+    """True si el sondeo de fondo tuvo éxito hace poco (si falla, los cachés vuelven a su TTL)"""
+    return (
+        _last_poll_ok is not None
+        and time.monotonic() - _last_poll_ok < _poll_interval * POLL_STALE_INTERVALS
+    )
+
+
+def _fingerprint(info: Dict[str, Any]) -> str:
+    """Huella de versión de un archivo a partir de sus metadatos de Graph"""
+    # cTag solo cambia con el contenido; eTag también con metadatos (nombre, etc.)
+    tag = info.get('cTag') or info.get('eTag') or ''
+    return f"{tag}|{info.get('lastModifiedDateTime', '')}"
+
+
+async def sync_file(item_id: str, download: bool = True) -> bool:
+    """
+    Descarga un archivo solo si cambió desde la última descarga
+
+    Args:
+        item_id: ID del archivo en OneDrive
+        download: False para libros que se leen por rangos: solo se actualiza su versión
+
+    Returns:
+        True si se descargó (o se detectó, sin descargar) una versión nueva
+    """
+    info = await get_file_info_async(item_id)
+    fingerprint = _fingerprint(info)
+    if not download:
+        _item_versions[item_id] = (_metadata_version(info), datetime.now())
+        changed = _file_fingerprints.get(item_id) != fingerprint
+        _file_fingerprints[item_id] = fingerprint
+        return changed
+
+    if _file_fingerprints.get(item_id) == fingerprint and f"file_{item_id}" in _file_cache:
+        return False
+
+    await _downloads.do_async(item_id, _download_async, item_id)
+    _file_fingerprints[item_id] = fingerprint
+    return True
+
+
+async def watch_files(
+    item_ids: List[str],
+    on_change: Callable[[], Any],
+    interval: Optional[float] = None,
+    metadata_only: Iterable[str] = ()
+):
+    """
+    Sondea los metadatos de los archivos y refresca el caché cuando cambian
+
+    Pensado para correr como tarea de fondo: las peticiones de usuario leen
+    siempre el último contenido descargado sin esperar a Graph.
+
+    Args:
+        item_ids: IDs de los archivos a vigilar
+        on_change: Función (síncrona) a ejecutar tras descargar una versión nueva
+        interval: Segundos entre sondeos (por defecto GRAPH_POLL_SECONDS)
+        metadata_only: IDs que se leen por rangos: se vigila su versión sin descargarlos
+    """
+    global _last_poll_ok, _poll_interval
+    interval = POLL_INTERVAL_SECONDS if interval is None else interval
+    _poll_interval = interval
+    try:
+        while True:
+            try:
+                changed = False
+                for item_id in item_ids:
+                    changed = await sync_file(item_id, item_id not in metadata_only) or changed
+                if changed:
+                    await asyncio.to_thread(on_change)
+                _last_poll_ok = time.monotonic()
+            except Exception as e:
+                # Se conserva el último contenido bueno; se reintenta en el siguiente ciclo
+                print(f"[WARNING] Error sondeando cambios en OneDrive: {e}")
+            await asyncio.sleep(interval)
+    finally:
+        _last_poll_ok = None
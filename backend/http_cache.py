@@ -0,0 +1,66 @@
+"""
+HTTP Cache - ETag / If-None-Match para las respuestas de la API
+El ETag se deriva de la versión del snapshot, la ruta y los parámetros
+normalizados: si los Excel no cambiaron, el navegador recibe un 304 sin
+que el endpoint se ejecute ni se vuelva a enviar el JSON
+"""
+
+import hashlib
+from datetime import date
+from typing import Iterable, Optional, Tuple
+
+# Revalidar siempre con el servidor (los datos cambian cuando alguien edita el Excel)
+CACHE_CONTROL = 'no-cache'
+
+# Rutas con ETag y excepciones (diagnóstico: su contenido no depende solo de los datos)
+ETAG_PREFIX = '/api/'
+ETAG_EXCLUDED_PREFIXES = ('/api/health', '/api/debug')
+
+_etag_stats = {'tagged': 0, 'not_modified': 0}
+
+
+def etag_applies(method: str, path: str) -> bool:
+    """Si una petición (por su método y la plantilla de su ruta) participa del caché condicional"""
+    return (
+        method == 'GET'
+        and path.startswith(ETAG_PREFIX)
+        and not path.startswith(ETAG_EXCLUDED_PREFIXES)
+    )
+
+
+def normalize_query(params: Iterable[Tuple[str, str]]) -> str:
+    """Parámetros ordenados y sin valores vacíos (?a=1&b= equivale a ?a=1)"""
+    return '&'.join(f'{key}={value}' for key, value in sorted(params) if value != '')
+
+
+def make_etag(version: str, path: str, params: Iterable[Tuple[str, str]], today: Optional[date] = None) -> str:
+    """
+    ETag débil de una respuesta
+
+    Incluye la fecha del día porque algunos paneles dependen de hoy
+    (días vencidos, comparativo mensual).
+    """
+    today = today or date.today()
+    raw = f"{version}|{path}|{normalize_query(params)}|{today.isoformat()}"
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Si el encabezado If-None-Match del cliente incluye el ETag (comparación débil)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    candidates = (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+    return opaque in candidates
+
+
+def record(result: str):
+    """Cuenta una respuesta del caché condicional: 'tagged' (200 con ETag) o 'not_modified' (304)"""
+    _etag_stats[result] += 1
+
+
+def get_etag_stats() -> dict:
+    """Respuestas con ETag y respuestas 304 servidas"""
+    return dict(_etag_stats)
@@ -0,0 +1,156 @@
+"""
+Ingesta por delta - Limpieza incremental de las hojas de movimientos
+Las hojas de ventas, compras, egresos y pagos casi solo crecen al final. Cada fila
+cruda se identifica por una huella de su contenido (que incluye el ID); al llegar
+una versión nueva del libro solo se limpian las filas cuya huella no existía, y las
+filas limpias de la versión anterior se conservan si su fila cruda sigue igual.
+Las filas agregadas y quitadas quedan como delta para actualizar cubos e índices.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def row_keys(raw: pd.DataFrame) -> np.ndarray:
+    """
+    Huella (uint64) de cada fila cruda: ID y resto de celdas, más el número de aparición
+
+    Dos filas idénticas reciben huellas distintas (1a, 2a aparición...), así las
+    filas repetidas también se cuentan como agregadas o quitadas una por una.
+    La primera aparición conserva la huella del contenido.
+    """
+    keys = pd.util.hash_pandas_object(raw, index=False).to_numpy()
+    repeated = pd.Series(keys).duplicated().to_numpy()
+    if repeated.any():
+        occurrence = pd.Series(keys).groupby(keys, sort=False).cumcount().to_numpy()
+        keyed = pd.DataFrame({'content': keys[repeated], 'occurrence': occurrence[repeated]})
+        keys = keys.copy()
+        keys[repeated] = pd.util.hash_pandas_object(keyed, index=False).to_numpy()
+    return keys
+
+
+def _isin(values: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """np.isin para huellas (tabla hash en lugar de ordenar)"""
+    return pd.Index(values).isin(other)
+
+
+class SheetChanges:
+    """Filas limpias agregadas y quitadas de una hoja respecto a la versión anterior"""
+
+    def __init__(self, added: pd.DataFrame, removed: pd.DataFrame, id_col: Optional[str]):
+        self.added = added
+        self.removed = removed
+        # Un ID presente en ambos lados es una fila modificada (no una alta y una baja)
+        self.modified = 0
+        if id_col and id_col in added.columns and id_col in removed.columns:
+            self.modified = len(set(added[id_col].dropna()) & set(removed[id_col].dropna()))
+
+    def summary(self) -> dict:
+        return {"added": len(self.added), "removed": len(self.removed), "modified": self.modified}
+
+
+class IncrementalSheet:
+    """Filas limpias de una hoja junto con las huellas de sus filas crudas"""
+
+    def __init__(self, raw: pd.DataFrame, keys: np.ndarray, cleaned: pd.DataFrame, cleaned_keys: np.ndarray):
+        # La hoja cruda misma: si el libro nuevo trae el mismo objeto (hoja sin cambios), no se compara
+        self.raw = raw
+        self.columns = list(raw.columns)
+        self.dtypes = raw.dtypes
+        self.keys = keys
+        self.cleaned = cleaned
+        # Huella de la fila cruda de origen de cada fila limpia
+        self.cleaned_keys = cleaned_keys
+
+    def compatible(self, raw: pd.DataFrame) -> bool:
+        """Mismas columnas y tipos crudos: las filas limpias anteriores siguen sirviendo"""
+        return list(raw.columns) == self.columns and raw.dtypes.equals(self.dtypes)
+
+
+def clean_sheet(
+    raw: pd.DataFrame,
+    clean: Callable[[pd.DataFrame], pd.DataFrame],
+    previous: Optional[IncrementalSheet] = None,
+    normalize: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    id_col: Optional[str] = 'ID'
+) -> Tuple[IncrementalSheet, Optional[SheetChanges]]:
+    """
+    Limpia una hoja cruda reutilizando las filas limpias de la versión anterior
+
+    'clean' debe tratar cada fila por separado (filtrar y convertir, sin depender
+    de otras filas) y conservar el índice de la hoja cruda: así limpiar solo las
+    filas nuevas y juntarlas con las anteriores da lo mismo que limpiar la hoja entera.
+
+    Args:
+        raw: Hoja cruda (índice único)
+        clean: Función de limpieza de la hoja
+        previous: Resultado para la versión anterior de la hoja (None = limpiar todo)
+        normalize: Se aplica al juntar filas anteriores y nuevas (p.ej. recuperar categóricas)
+        id_col: Columna de ID de las filas limpias (para contar modificaciones)
+
+    Returns:
+        (hoja limpia, cambios respecto a 'previous' o None si no había versión anterior)
+    """
+    if previous is not None and raw is previous.raw:
+        unchanged = previous.cleaned.iloc[:0]
+        return previous, SheetChanges(unchanged, unchanged, id_col)
+
+    keys = row_keys(raw)
+    if previous is None or not previous.compatible(raw):
+        cleaned = clean(raw)
+        sheet = IncrementalSheet(raw, keys, cleaned, keys[raw.index.get_indexer(cleaned.index)])
+        if previous is None:
+            return sheet, None
+        # Cambió la estructura de la hoja: se limpió completa, pero el delta se puede calcular
+        return sheet, SheetChanges(
+            cleaned[~_isin(sheet.cleaned_keys, previous.keys)],
+            previous.cleaned[~_isin(previous.cleaned_keys, keys)],
+            id_col
+        )
+
+    added = clean(raw[~_isin(keys, previous.keys)])
+    kept = _isin(previous.cleaned_keys, keys)
+    removed = previous.cleaned[~kept]
+    changes = SheetChanges(added, removed, id_col)
+    kept_pos = pd.Index(keys).get_indexer(previous.cleaned_keys[kept])
+
+    if not len(added) and not len(removed) and (np.diff(kept_pos) > 0).all():
+        # Mismas filas en el mismo orden: se reutilizan tal cual (con el índice de la hoja nueva)
+        cleaned = previous.cleaned
+        index = raw.index[kept_pos]
+        if not cleaned.index.equals(index):
+            cleaned = cleaned.set_axis(index)
+        return IncrementalSheet(raw, keys, cleaned, previous.cleaned_keys), changes
+
+    # Filas conservadas y nuevas, en el orden de la hoja nueva (como al limpiarla entera)
+    added_pos = raw.index.get_indexer(added.index)
+    positions = np.concatenate([kept_pos, added_pos])
+    order = np.argsort(positions, kind='stable')
+    parts = [part for part in (previous.cleaned[kept], added) if len(part)] or [added]
+    cleaned = pd.concat(parts).iloc[order].set_axis(raw.index[positions[order]])
+    if normalize is not None:
+        cleaned = normalize(cleaned)
+    return IncrementalSheet(raw, keys, cleaned, keys[positions[order]]), changes
+
+
+class SnapshotDelta:
+    """Cambios por hoja de un snapshot respecto al snapshot de 'base_version'"""
+
+    def __init__(self, base_version: str, sheets: Dict[str, SheetChanges]):
+        self.base_version = base_version
+        self.sheets = sheets
+
+    def changes(self, sheet_names: List[str]) -> List[Tuple[pd.DataFrame, int]]:
+        """Filas agregadas (+1) y quitadas (-1) de las hojas indicadas (sin partes vacías)"""
+        result = []
+        for name in sheet_names:
+            sheet = self.sheets[name]
+            result += [(frame, sign) for frame, sign in ((sheet.added, 1), (sheet.removed, -1)) if len(frame)]
+        return result
+
+    def summary(self) -> dict:
+        return {
+            "base_version": self.base_version,
+            "sheets": {name: changes.summary() for name, changes in self.sheets.items()}
+        }
@@ -0,0 +1,197 @@
+"""
+Estado de cuenta por cliente - Ventas a crédito + pagos de PAGOS_GENERALES
+Todas las notas y abonos de los clientes con saldo pendiente se juntan en una
+sola tabla de movimientos, se ordena una vez y se parte por cliente
+(lineal en filas, en lugar de filtrar credito y pagos por cada cliente).
+El índice por snapshot sirve la lista de clientes y el estado de cuenta de uno solo;
+con el delta del snapshot solo se recalculan los clientes con movimientos cambiados.
+"""
+
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+# Intentar import relativo (para Render) o directo (local)
+try:
+    from backend.serialization import dates, optional_floats, records
+except ImportError:
+    from serialization import dates, optional_floats, records
+
+# Orden de los movimientos de un mismo día: primero las notas, luego los abonos
+_NOTA, _ABONO = 0, 1
+
+
+def pending_clients(credito: pd.DataFrame) -> list:
+    """Clientes con alguna venta a crédito con saldo pendiente (en orden de aparición)"""
+    clientes = credito.loc[credito['saldo'] > 0, 'cliente'].dropna().unique()
+    return [c for c in clientes if str(c) not in ('nan', 'None', '')]
+
+
+def ledger_movements(credito: pd.DataFrame, pagos: pd.DataFrame, clientes: list) -> pd.DataFrame:
+    """
+    Notas y abonos de 'clientes' en una sola tabla, ordenada por cliente y fecha
+
+    Cada venta a crédito del cliente es una nota; cada pago cuyo CLIENTE ADMON
+    (ya en mayúsculas) coincide con el nombre del cliente en mayúsculas es un abono.
+
+    Returns:
+        DataFrame con 'orden' (posición del cliente en 'clientes'), 'fecha' (YYYY-MM-DD o ''),
+        'nota' y 'abono' (NaN en el otro tipo de movimiento)
+    """
+    orden = {cliente: i for i, cliente in enumerate(clientes)}
+
+    ventas = credito[credito['cliente'].isin(list(orden))]
+    notas = pd.DataFrame({
+        'orden': ventas['cliente'].map(orden).astype('int64'),
+        'ts': ventas['fecha'],
+        'nota': pd.to_numeric(ventas['total_venta'], errors='coerce').fillna(0.0),
+        'abono': float('nan'),
+        'tipo': _NOTA,
+    })
+
+    claves = pd.DataFrame({'orden': list(orden.values()), 'clave': [str(c).upper() for c in orden]})
+    cobros = claves.merge(pagos, left_on='clave', right_on='CLIENTE ADMON', sort=False)
+    abonos = pd.DataFrame({
+        'orden': cobros['orden'],
+        'ts': cobros['FECHA DE COBRO'],
+        'nota': float('nan'),
+        'abono': cobros['MONTO PAGADO'].astype('float64'),
+        'tipo': _ABONO,
+    })
+
+    movimientos = pd.concat([notas, abonos], ignore_index=True)
+    movimientos['fecha'] = dates(movimientos['ts'])
+    # Por día (las filas sin fecha primero); en el mismo día notas antes que abonos y
+    # cada tipo por fecha completa, conservando el orden de la hoja en empates
+    return movimientos.sort_values(['orden', 'fecha', 'tipo', 'ts'], kind='stable', na_position='last')
+
+
+def build_ledger(
+    credito: pd.DataFrame,
+    pagos: pd.DataFrame,
+    reuse: Optional[Dict[str, dict]] = None
+) -> List[dict]:
+    """
+    Estado de cuenta de cada cliente con saldo pendiente, de mayor a menor saldo
+
+    Args:
+        reuse: Estados de cuenta ya calculados por nombre de cliente (sus movimientos
+            no cambiaron); solo se calculan los clientes pendientes que no estén aquí
+    """
+    clientes = pending_clients(credito)
+    if not clientes:
+        return []
+
+    reuse = reuse or {}
+    nuevos = [c for c in clientes if str(c) not in reuse]
+    calculados = {}
+    if nuevos:
+        movimientos = ledger_movements(credito, pagos, nuevos)
+        filas = records(
+            fecha=movimientos['fecha'].tolist(),
+            nota=optional_floats(movimientos['nota']),
+            abono=optional_floats(movimientos['abono'])
+        )
+
+        inicio = 0
+        for orden, n in movimientos['orden'].value_counts(sort=False).sort_index().items():
+            movs = filas[inicio:inicio + n]
+            inicio += n
+
+            total_venta = sum(m['nota'] for m in movs if m['nota'])
+            total_cobrado = sum(m['abono'] for m in movs if m['abono'])
+            calculados[str(nuevos[orden])] = {
+                "cliente": str(nuevos[orden]),
+                "total_venta": total_venta,
+                "total_cobrado": total_cobrado,
+                "saldo_pendiente": total_venta - total_cobrado,
+                "movimientos": movs
+            }
+
+    # En el orden de los clientes pendientes, como si se hubieran calculado todos
+    resultado = [reuse.get(str(c)) or calculados.get(str(c)) for c in clientes]
+    resultado = [entry for entry in resultado if entry is not None]
+    resultado.sort(key=lambda x: x['saldo_pendiente'], reverse=True)
+    return resultado
+
+
+def client_key(cliente) -> str:
+    """Clave normalizada de un cliente (mismo criterio que CLIENTE ADMON en pagos)"""
+    return str(cliente).strip().upper()
+
+
+class LedgerIndex:
+    """Estados de cuenta de un snapshot indexados por clave de cliente"""
+
+    def __init__(self, ledger: List[dict]):
+        self.ledger = ledger
+        # Lista para el selector: totales sin movimientos, de mayor a menor saldo
+        self.clients = [
+            {key: entry[key] for key in ('cliente', 'total_venta', 'total_cobrado', 'saldo_pendiente')}
+            for entry in ledger
+        ]
+        self._by_key: Dict[str, List[dict]] = {}
+        for entry in ledger:
+            self._by_key.setdefault(client_key(entry['cliente']), []).append(entry)
+
+    @classmethod
+    def build(cls, credito: pd.DataFrame, pagos: pd.DataFrame) -> 'LedgerIndex':
+        return cls(build_ledger(credito, pagos))
+
+    def unchanged(self, changed_keys: set) -> Dict[str, dict]:
+        """Estados de cuenta de los clientes sin movimientos agregados ni quitados"""
+        return {
+            entry['cliente']: entry for entry in self.ledger
+            if entry['cliente'].upper() not in changed_keys
+        }
+
+    def lookup(self, cliente: str) -> Optional[dict]:
+        """
+        Estado de cuenta de un cliente por nombre (sin distinguir mayúsculas ni espacios)
+
+        Si varios nombres de la hoja comparten clave, se prefiere el escrito igual;
+        si no, el de mayor saldo.
+        """
+        entries = self._by_key.get(client_key(cliente), [])
+        for entry in entries:
+            if entry['cliente'] == cliente:
+                return entry
+        return entries[0] if entries else None
+
+
+# Último índice construido, con la versión de su snapshot (base para aplicar el delta)
+_latest: Optional[Tuple[str, LedgerIndex]] = None
+
+
+def changed_clients(credito_changes: list, pagos_changes: list) -> set:
+    """
+    Claves (nombre en mayúsculas) de los clientes con notas o abonos agregados o quitados
+
+    Mismo criterio que ledger_movements: las notas por nombre del cliente y los
+    abonos por CLIENTE ADMON (ya en mayúsculas).
+    """
+    keys = set()
+    for frame, _ in credito_changes:
+        keys.update(str(c).upper() for c in frame['cliente'].dropna().unique())
+    for frame, _ in pagos_changes:
+        keys.update(frame['CLIENTE ADMON'].unique())
+    return keys
+
+
+def _build_index(snap) -> LedgerIndex:
+    """Índice del snapshot: recalcula solo los clientes cambiados si hay delta del índice anterior"""
+    global _latest
+    reuse = None
+    if _latest is not None:
+        version, previous = _latest
+        credito_changes, pagos_changes = snap.changes('credito', version), snap.changes('pagos', version)
+        if credito_changes is not None and pagos_changes is not None:
+            reuse = previous.unchanged(changed_clients(credito_changes, pagos_changes))
+
+    index = LedgerIndex(build_ledger(snap.credito, snap.pagos, reuse))
+    _latest = (snap.version, index)
+    return index
+
+
+def get_ledger_index(snap) -> LedgerIndex:
+    """Índice de estados de cuenta, construido una sola vez por snapshot"""
+    return snap.derive('ledger', _build_index)
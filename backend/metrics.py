@@ -0,0 +1,162 @@
+"""
+Metrics - Contadores, medidores e histogramas en formato de texto de Prometheus
+Registro mínimo sin dependencias: los módulos declaran sus métricas aquí y las
+actualizan en el momento; los contadores que ya existen como diccionarios de
+estadísticas se exportan con colectores que se leen al servir /metrics.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Labels = Tuple[Tuple[str, str], ...]
+# (nombre, etiquetas, valor) producidos por un colector al momento del scrape
+Sample = Tuple[str, Dict[str, str], float]
+
+# Buckets por defecto (segundos): desde lecturas en caché hasta parseos de libros grandes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: List['_Metric'] = []
+_collectors: List[Tuple[str, str, str, Callable[[], Iterable[Sample]]]] = []
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    """Valor que solo crece (por combinación de etiquetas)"""
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_labels(labels), 0.0)
+
+    def lines(self) -> List[str]:
+        return [f'{self.name}{_format_labels(k)} {_format_value(v)}' for k, v in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """Valor que sube y baja"""
+    kind = 'gauge'
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+
+class Histogram(_Metric):
+    """Distribución de observaciones en buckets acumulados, con suma y conteo"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(_labels(labels))
+        return series[2] if series else 0
+
+    def sum(self, **labels) -> float:
+        series = self._series.get(_labels(labels))
+        return series[1] if series else 0.0
+
+    def lines(self) -> List[str]:
+        out = []
+        for key, (counts, total, n) in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, counts):
+                out.append(f'{self.name}_bucket{_format_labels(key + (("le", _format_value(bound)),))} {count}')
+            out.append(f'{self.name}_sum{_format_labels(key)} {_format_value(total)}')
+            out.append(f'{self.name}_count{_format_labels(key)} {n}')
+        return out
+
+
+# ==================== MÉTRICAS DEL SERVIDOR ====================
+
+# Cachés en memoria de graph_client: cache=file|dataframe, result=hit|miss|eviction
+graph_cache_total = Counter('ova_graph_cache_total', 'Consultas a los cachés de archivos y DataFrames de Graph')
+graph_downloads_total = Counter('ova_graph_downloads_total', 'Descargas de archivos desde Graph por modo y resultado')
+graph_download_bytes = Histogram(
+    'ova_graph_download_bytes', 'Tamaño de los archivos descargados de Graph',
+    buckets=(64e3, 256e3, 1e6, 4e6, 16e6, 64e6, 256e6)
+)
+graph_download_seconds = Histogram('ova_graph_download_seconds', 'Duración de las descargas de Graph')
+sheet_parse_seconds = Histogram('ova_sheet_parse_seconds', 'Duración del parseo de cada hoja registrada')
+requests_in_flight = Gauge('ova_http_requests_in_flight', 'Peticiones HTTP en curso')
+requests_in_flight.set(0)
+requests_total = Counter('ova_http_requests_total', 'Peticiones HTTP atendidas por método, ruta y código')
+
+
+def register_collector(name: str, kind: str, help_text: str, collect: Callable[[], Iterable[Sample]]):
+    """Métrica calculada al servir /metrics (p.ej. a partir de un diccionario de estadísticas)"""
+    _collectors.append((name, kind, help_text, collect))
+
+
+def render() -> str:
+    """Todas las métricas en formato de exposición de texto de Prometheus (0.0.4)"""
+    lines = []
+    for metric in _registry:
+        lines += metric.header() + metric.lines()
+    for name, kind, help_text, collect in _collectors:
+        try:
+            samples = list(collect())
+        except Exception as e:
+            # Un colector roto no debe tumbar el resto del scrape
+            print(f"[WARNING] Error en colector de métricas '{name}': {e}")
+            continue
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        lines += [f'{sample}{_format_labels(_labels(labels))} {_format_value(value)}'
+                  for sample, labels, value in samples]
+    return '\n'.join(lines) + '\n'
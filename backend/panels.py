@@ -0,0 +1,568 @@
+"""
+Paneles del dashboard - Cálculo de cada KPI/gráfico sobre un snapshot
+Cada panel recibe una vista filtrada por fechas y retorna el JSON de su endpoint;
+/api/dashboard calcula varios paneles sobre la misma vista en una sola petición
+"""
+
+import pandas as pd
+from datetime import datetime, date
+from functools import cached_property
+from typing import Callable, Dict, Optional
+
+# Intentar import relativo (para Render) o directo (local)
+try:
+    from backend.snapshot import DatasetSnapshot
+    from backend.cube import get_cube
+    from backend.ledger import get_ledger_index
+    from backend import profiling
+    from backend.serialization import floats, ints, strings, dates, records
+except ImportError:
+    from snapshot import DatasetSnapshot
+    from cube import get_cube
+    from ledger import get_ledger_index
+    import profiling
+    from serialization import floats, ints, strings, dates, records
+
+
+def filter_by_date(df: pd.DataFrame, start_date: Optional[date], end_date: Optional[date], date_col: str = 'fecha') -> pd.DataFrame:
+    """Filtra DataFrame por rango de fechas (para tablas del snapshot usar DatasetSnapshot.between)"""
+    if date_col not in df.columns:
+        return df
+
+    with profiling.span('filter'):
+        # Fechas ya parseadas: filtrar sin copiar ni volver a convertir la columna
+        if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+            df = df.copy()
+            df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+
+        if start_date:
+            df = df[df[date_col] >= pd.Timestamp(start_date)]
+        if end_date:
+            df = df[df[date_col] <= pd.Timestamp(end_date)]
+
+        return df
+
+
+class FilteredView:
+    """Snapshot más un rango de fechas; cada tabla se filtra una sola vez por vista"""
+
+    def __init__(self, snap: DatasetSnapshot, start: Optional[date] = None, end: Optional[date] = None):
+        self.snap = snap
+        self.start = start
+        self.end = end
+        self._cube_queries: Dict[str, pd.DataFrame] = {}
+
+    def cube_query(self, name: str) -> pd.DataFrame:
+        """Medidas por grupo del cubo diario 'name' en el rango de la vista (sumas enteras, ver DailyCube.decode)"""
+        if name not in self._cube_queries:
+            self._cube_queries[name] = get_cube(self.snap, name).query_scaled(self.start, self.end)
+        return self._cube_queries[name]
+
+    def rollup(self, name: str, by: list) -> pd.DataFrame:
+        """Medidas del rango agrupadas por dimensiones del cubo (equivale a tabla.groupby(by))"""
+        cube = get_cube(self.snap, name)
+        # Se suman los enteros y se divide al final: mismo monto que sumar las filas
+        return cube.decode(self.cube_query(name).groupby(by, observed=True)[cube.names].sum().reset_index())
+
+    def totals(self, name: str) -> pd.Series:
+        """Medidas totales del rango para el cubo 'name'"""
+        cube = get_cube(self.snap, name)
+        return cube.decode(self.cube_query(name)[cube.names].sum())
+
+    @cached_property
+    def ventas(self) -> pd.DataFrame:
+        return self.snap.between('ventas', self.start, self.end)
+
+    @cached_property
+    def compras(self) -> pd.DataFrame:
+        return self.snap.between('compras', self.start, self.end)
+
+    @cached_property
+    def egresos(self) -> pd.DataFrame:
+        return self.snap.between('egresos', self.start, self.end)
+
+
+# ==================== PANELES ====================
+# Los paneles comparten las tablas de la vista: no deben mutarlas
+
+def summary(view: FilteredView) -> dict:
+    """Resumen general de KPIs"""
+    por_tipo = view.rollup('ventas', ['tipo'])
+    compras = view.totals('compras')
+    egresos = view.totals('egresos')
+
+    # Calcular totales
+    ventas_contado = por_tipo.loc[por_tipo['tipo'] == 'CONTADO', 'total'].sum()
+    ventas_credito = por_tipo.loc[por_tipo['tipo'] == 'CREDITO', 'total'].sum()
+    ventas_total = ventas_contado + ventas_credito
+
+    compras_total = compras['total']
+    gastos_total = egresos['importe']
+
+    # Conteo de transacciones
+    num_ventas = view.totals('ventas')['n_rows']
+    num_compras = compras['n_rows']
+    num_gastos = egresos['n_rows']
+
+    # Utilidad real = Ventas - Compras - Gastos
+    utilidad_real = ventas_total - compras_total - gastos_total
+
+    return {
+        "ventas_total": float(ventas_total) if pd.notna(ventas_total) else 0,
+        "ventas_contado": float(ventas_contado) if pd.notna(ventas_contado) else 0,
+        "ventas_credito": float(ventas_credito) if pd.notna(ventas_credito) else 0,
+        "compras_total": float(compras_total) if pd.notna(compras_total) else 0,
+        "gastos_total": float(gastos_total) if pd.notna(gastos_total) else 0,
+        "num_ventas": int(num_ventas),
+        "num_compras": int(num_compras),
+        "num_gastos": int(num_gastos),
+        "utilidad_estimada": float(utilidad_real) if pd.notna(utilidad_real) else 0
+    }
+
+
+def sales_by_type(view: FilteredView) -> dict:
+    """Ventas desglosadas por tipo (contado/crédito)"""
+    result = view.rollup('ventas', ['tipo'])
+
+    return {
+        "data": records(
+            tipo=result['tipo'].tolist(),
+            total=floats(result['total']),
+            cantidad=ints(result['n_id'])
+        )
+    }
+
+
+def sales_by_product(view: FilteredView) -> dict:
+    """Ventas desglosadas por producto (segmento de negocio)"""
+    # Agrupar por segmento
+    result = view.rollup('ventas', ['segmento'])
+
+    result = result.sort_values('total', ascending=False)
+
+    return {
+        "data": records(
+            producto=result['segmento'].tolist(),
+            total=floats(result['total']),
+            kg_netos=floats(result['kg']),
+            cantidad=ints(result['n_id'])
+        )
+    }
+
+
+def top_products(view: FilteredView, limit: int = 5) -> dict:
+    """Top productos más vendidos (excluyendo COVA)"""
+    ventas = view.ventas
+
+    # Nombre "SEGMENTO (PRODUCTO)" y marca de COVA ya calculados en el snapshot
+    ventas = ventas[~ventas['es_cova']]
+
+    # Agrupar por nombre final
+    result = ventas.groupby('nombre_producto', observed=True).agg({
+        'total_venta': 'sum',
+        'kg_netos': 'sum',
+        'cajas': 'sum',
+        'ID': 'count'
+    }).reset_index()
+
+    result['nombre_producto'] = result['nombre_producto'].astype(str)
+    result = result.sort_values(['total_venta', 'nombre_producto'], ascending=[False, True]).head(limit)
+
+    return {
+        "data": records(
+            producto=result['nombre_producto'].tolist(),
+            total=floats(result['total_venta']),
+            kg_netos=floats(result['kg_netos']),
+            cajas=floats(result['cajas']),
+            cantidad_ventas=ints(result['ID'])
+        )
+    }
+
+
+def ticket_distribution(view: FilteredView) -> dict:
+    """Distribución de ventas por valor del ticket"""
+    ventas = view.ventas
+
+    # Definir rangos
+    bins = [0, 500, 2000, 5000, float('inf')]
+    labels = ['Micro ($0-500)', 'Pequeño ($501-2k)', 'Mediano ($2k-5k)', 'Grande (>$5k)']
+
+    # Rango de cada venta (sin agregar columnas a la tabla compartida)
+    rango = pd.cut(ventas['total_venta'], bins=bins, labels=labels, right=False).rename('rango')
+
+    result = ventas.groupby(rango, observed=False).agg({
+        'total_venta': 'sum',
+        'ID': 'count'
+    }).reset_index()
+
+    return {
+        "data": records(
+            rango=strings(result['rango']),
+            total=floats(result['total_venta']),
+            cantidad=ints(result['ID'])
+        )
+    }
+
+
+def sales_trend(view: FilteredView) -> dict:
+    """Tendencia de ventas por día"""
+    ventas = view.ventas
+    fecha_str = ventas['fecha'].dt.strftime('%Y-%m-%d').rename('fecha_str')
+
+    result = ventas.groupby(fecha_str).agg({
+        'total_venta': 'sum',
+        'ID': 'count'
+    }).reset_index()
+
+    result = result.sort_values('fecha_str')
+
+    return {
+        "labels": result['fecha_str'].tolist(),
+        "values": floats(result['total_venta']),
+        "counts": ints(result['ID'])
+    }
+
+
+def purchases(view: FilteredView) -> dict:
+    """Resumen de compras"""
+    result = view.rollup('compras', ['producto'])
+
+    return {
+        "data": records(
+            producto=result['producto'].tolist(),
+            total=floats(result['total']),
+            kg_netos=floats(result['kg']),
+            cantidad=ints(result['n_id'])
+        ),
+        "total": float(view.totals('compras')['total'])
+    }
+
+
+def top_clients(view: FilteredView, limit: int = 10) -> dict:
+    """Top clientes por volumen de compra"""
+    result = view.ventas.groupby('cliente', observed=True).agg({
+        'total_venta': 'sum',
+        'ID': 'count'
+    }).reset_index()
+
+    result = result.sort_values('total_venta', ascending=False).head(limit)
+
+    return {
+        "data": records(
+            cliente=strings(result['cliente'], 'Sin nombre'),
+            total=floats(result['total_venta']),
+            compras=ints(result['ID'])
+        )
+    }
+
+
+def receivables(view: FilteredView) -> dict:
+    """Cuentas por cobrar (ventas a crédito con saldo pendiente)"""
+    credito = view.snap.credito
+    today = datetime.now().date()
+
+    if 'saldo' in credito.columns:
+        pendientes = credito[credito['saldo'] > 0].copy()
+        total_pendiente = pendientes['saldo'].sum()
+
+        # Calcular días vencidos
+        pendientes['dias_vencidos'] = (pd.Timestamp(today) - pendientes['fecha']).dt.days
+        detalle = pendientes.head(30)
+
+        return {
+            "total_pendiente": float(total_pendiente) if pd.notna(total_pendiente) else 0,
+            "num_cuentas": len(pendientes),
+            "detalle": records(
+                cliente=strings(detalle['cliente'], 'Sin nombre'),
+                saldo=floats(detalle['saldo']),
+                fecha=dates(detalle['fecha']),
+                dias_vencidos=ints(detalle['dias_vencidos'])
+            )
+        }
+
+    return {"total_pendiente": 0, "num_cuentas": 0, "detalle": []}
+
+
+def client_ledger(view: FilteredView) -> list:
+    """Estado de cuenta por cliente: ventas a crédito + pagos de PAGOS_GENERALES"""
+    try:
+        return get_ledger_index(view.snap).ledger
+    except Exception as e:
+        print(f"Error en /api/client-ledger: {e}")
+        import traceback
+        traceback.print_exc()
+        return []
+
+
+def clients(view: FilteredView) -> list:
+    """Clientes con saldo pendiente y sus totales (sin movimientos), de mayor a menor saldo"""
+    return get_ledger_index(view.snap).clients
+
+
+def client_account(view: FilteredView, cliente: str) -> Optional[dict]:
+    """Estado de cuenta de un solo cliente (None si no tiene saldo pendiente)"""
+    return get_ledger_index(view.snap).lookup(cliente)
+
+
+def expenses(view: FilteredView) -> dict:
+    """Gastos operativos del período"""
+    totals = view.totals('egresos')
+
+    # Agrupar por TIPO DE EGRESO
+    by_tipo = view.rollup('egresos', ['tipo_egreso'])
+    by_tipo = by_tipo.sort_values('importe', ascending=False)
+
+    return {
+        "total": float(totals['importe']) if pd.notna(totals['importe']) else 0,
+        "num_gastos": int(totals['n_rows']),
+        "por_tipo": records(
+            tipo=strings(by_tipo['tipo_egreso'], 'Otros'),
+            total=floats(by_tipo['importe'])
+        )
+    }
+
+
+def stock(view: FilteredView) -> dict:
+    """Stock actual de productos"""
+    stock_cebolla = view.snap.stock_cebolla
+    stock_huevo = view.snap.stock_huevo
+
+    return {
+        "cebolla": {
+            "kg": stock_cebolla,
+            "producto": "CEBOLLA"
+        },
+        "huevo": {
+            "cajas": stock_huevo,
+            "producto": "HUEVO"
+        },
+        "total_kg": stock_cebolla
+    }
+
+
+def cash_status(view: FilteredView) -> dict:
+    """Estado de cajas - saldos por operador y movimientos del día"""
+    try:
+        # FECHA ya viene como datetime desde el snapshot
+        df = view.snap.cajas
+
+        # Aplicar filtro de fechas si se proporcionan
+        end = view.end
+        if end:
+            # Filtrar hasta la fecha final (inclusive)
+            df = df[df['FECHA'].dt.date <= end].copy()
+
+        # Obtener última fecha con datos (FIN DEL DÍA o SALDO INICIAL más reciente)
+        df_fin_dia = df[df['CONCEPTO'].isin(['FIN DEL DÍA', 'SALDO INICIAL'])].copy()
+        df_fin_dia = df_fin_dia.sort_values('FECHA', ascending=False)
+
+        if len(df_fin_dia) == 0:
+            return {
+                "operadores": [],
+                "movimientos_dia": {},
+                "saldo_total": 0,
+                "fecha": None
+            }
+
+        # Obtener saldos de cada operador (última fila con FIN DEL DÍA)
+        ultima_fila = df_fin_dia.iloc[0]
+        operadores = []
+
+        for op_name in ['EMILIO', 'RICHARD', 'BODEGA 55', 'DIEGO']:
+            saldo = pd.to_numeric(ultima_fila[op_name], errors='coerce')
+            if pd.isna(saldo):
+                saldo = 0
+
+            operadores.append({
+                "nombre": op_name,
+                "saldo": float(saldo)
+            })
+
+        # Obtener movimientos del día actual
+        fecha_actual = ultima_fila['FECHA'].date()
+        df_dia = df[df['FECHA'].dt.date == fecha_actual].copy()
+
+        # Calcular totales por concepto
+        movimientos = {}
+        for concepto in ['COBRANZA VENTAS AL CONTADO', 'COBRANZA VENTAS A CRÉDITO',
+                        'GASTOS EFECTUADOS', 'MOVIMIENTO ENTRE CAJAS']:
+            df_concepto = df_dia[df_dia['CONCEPTO'] == concepto]
+            if len(df_concepto) > 0:
+                # Sumar todos los operadores
+                total = 0
+                for op in ['EMILIO', 'RICHARD', 'BODEGA 55', 'DIEGO']:
+                    val = pd.to_numeric(df_concepto[op].iloc[0], errors='coerce')
+                    if pd.notna(val):
+                        total += val
+                movimientos[concepto] = float(total)
+            else:
+                movimientos[concepto] = 0.0
+
+        # Saldo total de efectivo
+        saldo_total = pd.to_numeric(ultima_fila['SALDO FINAL DE EFECTIVO'], errors='coerce')
+        if pd.isna(saldo_total):
+            saldo_total = 0
+
+        return {
+            "operadores": operadores,
+            "movimientos_dia": movimientos,
+            "saldo_total": float(saldo_total),
+            "fecha": fecha_actual.isoformat()
+        }
+
+    except Exception as e:
+        print(f"Error en /api/cash-status: {e}")
+        import traceback
+        traceback.print_exc()
+        return {
+            "operadores": [],
+            "movimientos_dia": {},
+            "saldo_total": 0,
+            "fecha": None,
+            "error": str(e)
+        }
+
+
+def ticket_promedio(view: FilteredView) -> dict:
+    """Ticket promedio de venta"""
+    ventas = view.ventas
+
+    total_ventas = ventas['total_venta'].sum()
+    num_transacciones = len(ventas)
+
+    ticket_promedio = total_ventas / num_transacciones if num_transacciones > 0 else 0
+
+    # Por tipo de venta
+    contado = ventas[ventas['tipo'] == 'CONTADO']
+    credito = ventas[ventas['tipo'] == 'CREDITO']
+
+    return {
+        "ticket_promedio": float(ticket_promedio) if pd.notna(ticket_promedio) else 0,
+        "contado": float(contado['total_venta'].sum() / len(contado)) if len(contado) > 0 else 0,
+        "credito": float(credito['total_venta'].sum() / len(credito)) if len(credito) > 0 else 0,
+        "num_transacciones": num_transacciones
+    }
+
+
+def tasa_cobranza(view: FilteredView) -> dict:
+    """Tasa de cobranza - % de créditos cobrados vs pendientes"""
+    credito = view.snap.credito
+
+    if 'saldo' not in credito.columns or 'total_venta' not in credito.columns:
+        return {"tasa": 0, "cobrado": 0, "pendiente": 0, "total_creditos": 0}
+
+    total_creditos = credito['total_venta'].sum()
+    total_pendiente = credito[credito['saldo'] > 0]['saldo'].sum()
+    total_cobrado = total_creditos - total_pendiente
+
+    tasa = (total_cobrado / total_creditos * 100) if total_creditos > 0 else 0
+
+    return {
+        "tasa": float(tasa) if pd.notna(tasa) else 0,
+        "cobrado": float(total_cobrado) if pd.notna(total_cobrado) else 0,
+        "pendiente": float(total_pendiente) if pd.notna(total_pendiente) else 0,
+        "total_creditos": float(total_creditos) if pd.notna(total_creditos) else 0
+    }
+
+
+def sales_by_weekday(view: FilteredView) -> dict:
+    """Ventas por día de la semana"""
+    ventas = view.ventas
+    dia_semana = ventas['fecha'].dt.dayofweek.rename('dia_semana')
+
+    # Nombres en español
+    dias = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+    result = ventas.groupby(dia_semana).agg({
+        'total_venta': 'sum',
+        'ID': 'count'
+    }).reset_index()
+
+    result['dia_nombre'] = result['dia_semana'].map(dict(enumerate(dias))).fillna('N/A')
+    result = result.sort_values('dia_semana')
+
+    return {
+        "labels": result['dia_nombre'].tolist(),
+        "values": floats(result['total_venta']),
+        "counts": ints(result['ID'])
+    }
+
+
+def monthly_comparison(view: FilteredView) -> dict:
+    """Comparativo del mes actual vs mes anterior"""
+    today = datetime.now().date()
+
+    # Mes actual
+    first_day_current = date(today.year, today.month, 1)
+
+    # Mes anterior
+    if today.month == 1:
+        first_day_prev = date(today.year - 1, 12, 1)
+    else:
+        first_day_prev = date(today.year, today.month - 1, 1)
+
+    # Ventas mes actual
+    ventas_actual = view.snap.between('ventas', first_day_current, None)
+    total_actual = ventas_actual['total_venta'].sum()
+
+    # Ventas mes anterior (mismo período del mes)
+    ventas_anterior = view.snap.between('ventas', first_day_prev, first_day_current, inclusive_end=False)
+    total_anterior = ventas_anterior['total_venta'].sum()
+
+    # Calcular crecimiento
+    if total_anterior > 0:
+        crecimiento = ((total_actual - total_anterior) / total_anterior) * 100
+    else:
+        crecimiento = 100 if total_actual > 0 else 0
+
+    return {
+        "mes_actual": {
+            "total": float(total_actual) if pd.notna(total_actual) else 0,
+            "transacciones": len(ventas_actual)
+        },
+        "mes_anterior": {
+            "total": float(total_anterior) if pd.notna(total_anterior) else 0,
+            "transacciones": len(ventas_anterior)
+        },
+        "crecimiento_porcentaje": float(crecimiento) if pd.notna(crecimiento) else 0
+    }
+
+
+# Paneles disponibles en /api/dashboard (nombre -> función)
+PANELS: Dict[str, Callable[[FilteredView], object]] = {
+    'summary': summary,
+    'sales_by_type': sales_by_type,
+    'sales_by_product': sales_by_product,
+    'top_products': top_products,
+    'ticket_distribution': ticket_distribution,
+    'sales_trend': sales_trend,
+    'sales_by_weekday': sales_by_weekday,
+    'purchases': purchases,
+    'top_clients': top_clients,
+    'expenses': expenses,
+    'receivables': receivables,
+    'client_ledger': client_ledger,
+    'clients': clients,
+    'stock': stock,
+    'cash_status': cash_status,
+    'ticket_promedio': ticket_promedio,
+    'tasa_cobranza': tasa_cobranza,
+    'monthly_comparison': monthly_comparison,
+}
+
+
+def compute_panels(view: FilteredView, names) -> Dict[str, object]:
+    """
+    Calcula varios paneles sobre la misma vista
+
+    Un panel que falla se reporta como None (y se registra) sin tumbar a los demás.
+    """
+    result = {}
+    for name in names:
+        try:
+            with profiling.span('aggregate'):
+                result[name] = PANELS[name](view)
+        except Exception as e:
+            print(f"[WARNING] Error calculando panel '{name}': {e}")
+            result[name] = None
+    return result
@@ -0,0 +1,133 @@
+"""
+Profiling - Tiempos por etapa de cada petición (opt-in con PROFILING=true)
+Cada petición lleva un perfil en una variable de contexto (pasa a los hilos de
+asyncio.to_thread); las etapas instrumentadas suman su duración con span(nombre).
+El middleware emite Server-Timing y guarda los perfiles recientes en un búfer circular.
+
+Las etapas pueden anidarse (p.ej. 'aggregate' incluye 'filter' y 'cube'); cada
+una reporta su tiempo total dentro de la petición.
+"""
+
+import os
+import time
+import threading
+import statistics
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional
+
+PROFILING_ENABLED = os.getenv('PROFILING', 'false').lower() == 'true'
+# Perfiles recientes que se conservan para /api/debug/profile
+PROFILE_BUFFER_SIZE = int(os.getenv('PROFILE_BUFFER_SIZE', '500'))
+
+
+class RequestProfile:
+    """Duración acumulada (ms) y número de veces de cada etapa dentro de una petición"""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.route = path
+        self.started_at = datetime.now()
+        self.status: Optional[int] = None
+        self.total_ms = 0.0
+        self.spans: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, ms: float):
+        # Los paneles de /api/dashboard pueden registrar etapas desde varios hilos
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + ms
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def server_timing(self) -> str:
+        """Valor del encabezado Server-Timing (una métrica por etapa más 'total')"""
+        metrics = [f"{name};dur={ms:.2f}" for name, ms in self.spans.items()]
+        metrics.append(f"total;dur={self.total_ms:.2f}")
+        return ", ".join(metrics)
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(timespec='milliseconds'),
+            "total_ms": round(self.total_ms, 3),
+            "spans": {name: round(ms, 3) for name, ms in self.spans.items()},
+            "counts": dict(self.counts)
+        }
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar('request_profile', default=None)
+_recent: deque = deque(maxlen=PROFILE_BUFFER_SIZE)
+
+
+@contextmanager
+def span(name: str):
+    """Suma la duración del bloque a la etapa 'name' del perfil de la petición en curso"""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, (time.perf_counter() - start) * 1000)
+
+
+def start(method: str, path: str) -> RequestProfile:
+    """Abre el perfil de una petición en el contexto actual"""
+    profile = RequestProfile(method, path)
+    _current.set(profile)
+    return profile
+
+
+def finish(profile: RequestProfile, total_ms: float, status: int, route: Optional[str] = None):
+    """Cierra un perfil y lo guarda en el búfer de perfiles recientes"""
+    profile.total_ms = total_ms
+    profile.status = status
+    profile.route = route or profile.path
+    _recent.append(profile)
+
+
+def _percentiles(values: list) -> dict:
+    if len(values) == 1:
+        p50 = p95 = p99 = values[0]
+    else:
+        cuts = statistics.quantiles(values, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    return {"p50_ms": round(p50, 3), "p95_ms": round(p95, 3), "p99_ms": round(p99, 3)}
+
+
+def get_profile_report(recent: int = 20) -> dict:
+    """Percentiles por ruta (total y por etapa) y los últimos perfiles"""
+    profiles = list(_recent)
+    by_route: Dict[str, list] = {}
+    for profile in profiles:
+        by_route.setdefault(f"{profile.method} {profile.route}", []).append(profile)
+
+    routes = {}
+    for key, items in sorted(by_route.items()):
+        names = sorted({name for p in items for name in p.spans})
+        routes[key] = {
+            "count": len(items),
+            **_percentiles([p.total_ms for p in items]),
+            "spans": {name: _percentiles([p.spans.get(name, 0.0) for p in items]) for name in names}
+        }
+
+    return {
+        "enabled": PROFILING_ENABLED,
+        "buffer": {"size": len(profiles), "capacity": _recent.maxlen},
+        "routes": routes,
+        "recent": [p.to_dict() for p in profiles[-recent:]] if recent else []
+    }
+
+
+def clear():
+    """Vacía el búfer de perfiles"""
+    _recent.clear()
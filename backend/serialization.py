@@ -0,0 +1,68 @@
+"""
+Serialización - DataFrames agregados a JSON por columnas
+Cada columna se convierte de una sola vez (NaN -> 0/None, numpy -> tipos de Python)
+en lugar de recorrer filas con iterrows; las respuestas se renderizan con orjson
+si está instalado.
+"""
+
+from typing import Any, List, Optional
+
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+# Intentar import relativo (para Render) o directo (local)
+try:
+    from backend import profiling
+except ImportError:
+    import profiling
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def floats(series: pd.Series, default: float = 0.0) -> List[float]:
+    """Columna numérica como floats de Python (NaN -> default)"""
+    return pd.to_numeric(series, errors='coerce').astype('float64').fillna(default).tolist()
+
+
+def optional_floats(series: pd.Series) -> List[Optional[float]]:
+    """Columna numérica como floats de Python (NaN -> None)"""
+    values = pd.to_numeric(series, errors='coerce').astype('float64')
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def ints(series: pd.Series, default: int = 0) -> List[int]:
+    """Columna numérica como ints de Python (NaN -> default)"""
+    return pd.to_numeric(series, errors='coerce').fillna(default).astype('int64').tolist()
+
+
+def strings(series: pd.Series, default: str = '') -> List[str]:
+    """Columna como str de Python (nulos -> default)"""
+    return series.astype(object).where(series.notna(), default).astype(str).tolist()
+
+
+def dates(series: pd.Series, default: str = '') -> List[str]:
+    """Columna de fechas como 'YYYY-MM-DD' (NaT -> default)"""
+    return pd.to_datetime(series, errors='coerce').dt.strftime('%Y-%m-%d').fillna(default).tolist()
+
+
+def records(**columns: List[Any]) -> List[dict]:
+    """Lista de dicts a partir de columnas ya convertidas: records(a=[1, 2], b=[3, 4])"""
+    keys = list(columns)
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
+def json_response(content: Any) -> Response:
+    """
+    Respuesta JSON sin pasar por jsonable_encoder
+
+    Los paneles ya entregan tipos de Python; sin orjson se conserva el
+    codificador de FastAPI por si queda algún escalar de numpy.
+    """
+    with profiling.span('serialize'):
+        if orjson is None:
+            return JSONResponse(jsonable_encoder(content))
+        return Response(orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY), media_type='application/json')
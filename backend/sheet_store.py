@@ -0,0 +1,95 @@
+"""
+Sheet Store - Caché en disco de las hojas ya parseadas
+Guarda los DataFrames de cada libro en un archivo binario por versión
+(hash del contenido del Excel), para que una instancia recién arrancada no
+vuelva a parsear con openpyxl, y como último respaldo bueno si OneDrive falla.
+
+Formato: pickle de pandas (bloques por columna con dtypes exactos). Parquet
+o Feather requieren pyarrow y no aceptan las columnas de tipo mixto que
+produce Excel (texto y números en la misma columna).
+"""
+
+import os
+import json
+import hashlib
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Directorio del caché (en Cloud Run montar un volumen para que sobreviva reinicios)
+SHEET_CACHE_DIR = Path(os.getenv(
+    'SHEET_CACHE_DIR',
+    str(Path(__file__).resolve().parent.parent / '.sheet_cache')
+))
+SHEET_CACHE_ENABLED = os.getenv('SHEET_CACHE_ENABLED', 'true').lower() == 'true'
+# Versiones por libro que se conservan en disco
+SHEET_CACHE_KEEP = int(os.getenv('SHEET_CACHE_KEEP', '2'))
+
+_PICKLE_PROTOCOL = 5
+
+
+def specs_signature(specs: dict) -> str:
+    """Huella de la configuración de hojas: si cambia, el caché previo no aplica"""
+    raw = json.dumps(specs, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode()).hexdigest()[:8]
+
+
+def _path(file_type: str, content_hash: str, signature: str) -> Path:
+    return SHEET_CACHE_DIR / f"{file_type}-{signature}-{content_hash}.pkl"
+
+
+def load(file_type: str, content_hash: str, signature: str) -> Optional[Dict[str, pd.DataFrame]]:
+    """Hojas guardadas para una versión exacta del libro (None si no existen)"""
+    if not SHEET_CACHE_ENABLED:
+        return None
+    path = _path(file_type, content_hash, signature)
+    if not path.exists():
+        return None
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        print(f"[WARNING] Caché en disco ilegible ({path.name}): {e}")
+        return None
+
+
+def save(file_type: str, content_hash: str, signature: str, sheets: Dict[str, pd.DataFrame]):
+    """Guarda las hojas de una versión (escritura atómica) y purga versiones viejas"""
+    if not SHEET_CACHE_ENABLED:
+        return
+    path = _path(file_type, content_hash, signature)
+    tmp_path = path.with_suffix('.tmp')
+    try:
+        SHEET_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        pd.to_pickle(sheets, tmp_path, protocol=_PICKLE_PROTOCOL)
+        os.replace(tmp_path, path)
+        _prune(file_type, signature)
+    except Exception as e:
+        # El caché en disco es una optimización: nunca debe tumbar la carga
+        print(f"[WARNING] No se pudo guardar caché en disco ({path.name}): {e}")
+
+
+def load_latest(file_type: str, signature: str) -> Optional[Tuple[str, Dict[str, pd.DataFrame]]]:
+    """Última versión guardada de un libro: (hash, hojas), o None"""
+    if not SHEET_CACHE_ENABLED:
+        return None
+    for path in _versions(file_type, signature):
+        try:
+            content_hash = path.stem.rsplit('-', 1)[-1]
+            return content_hash, pd.read_pickle(path)
+        except Exception as e:
+            print(f"[WARNING] Caché en disco ilegible ({path.name}): {e}")
+    return None
+
+
+def _versions(file_type: str, signature: str) -> list:
+    """Archivos de un libro, del más reciente al más viejo"""
+    if not SHEET_CACHE_DIR.exists():
+        return []
+    paths = SHEET_CACHE_DIR.glob(f"{file_type}-{signature}-*.pkl")
+    return sorted(paths, key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+def _prune(file_type: str, signature: str):
+    """Conserva solo las SHEET_CACHE_KEEP versiones más recientes"""
+    for old_path in _versions(file_type, signature)[SHEET_CACHE_KEEP:]:
+        old_path.unlink(missing_ok=True)
@@ -0,0 +1,99 @@
+"""
+Single-flight - Coalescencia de llamadas concurrentes
+Si varias peticiones piden el mismo trabajo (misma llave) al mismo tiempo,
+solo una lo ejecuta y las demás esperan y reciben su resultado
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """Trabajo en curso para una llave"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Grupo de llamadas deduplicadas por llave (seguro entre hilos)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {'executed': 0, 'shared': 0}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Ejecuta fn(*args, **kwargs) una sola vez por llave entre llamadas simultáneas
+
+        Args:
+            key: Llave que identifica el trabajo (p.ej. item_id)
+            fn: Función a ejecutar por la primera llamada
+
+        Returns:
+            El resultado de fn (compartido por todas las llamadas en espera)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.stats['executed'] += 1
+            else:
+                self.stats['shared'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Versión asíncrona de do(): await fn(*args, **kwargs) una sola vez por llave
+
+        Las llamadas en espera no bloquean el event loop mientras la primera trabaja.
+        El trabajo corre en su propia tarea: cancelar a cualquier llamada (también a
+        la primera, p.ej. si su cliente se desconecta) no lo cancela para las demás.
+        """
+        with self._lock:
+            task = self._futures.get(key)
+            if task is None:
+                task = asyncio.ensure_future(fn(*args, **kwargs))
+                self._futures[key] = task
+                task.add_done_callback(lambda done: self._finish_async(key, done))
+                self.stats['executed'] += 1
+            else:
+                self.stats['shared'] += 1
+
+        return await asyncio.shield(task)
+
+    def _finish_async(self, key: Hashable, task: asyncio.Future):
+        with self._lock:
+            if self._futures.get(key) is task:
+                del self._futures[key]
+        # Marcar la excepción como recuperada aunque nadie siga esperando
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        """Número de llaves con trabajo en curso"""
+        with self._lock:
+            return len(self._calls) + len(self._futures)
@@ -0,0 +1,547 @@
+"""
+Dataset Snapshot - Datos limpios compartidos por todos los endpoints
+Se construye una sola vez por versión de los libros de Excel; los endpoints
+solo filtran y agregan sobre estos DataFrames (no deben mutarlos)
+"""
+
+import os
+import asyncio
+import hashlib
+import numpy as np
+import pandas as pd
+from datetime import date
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+# Intentar import relativo (para Render) o directo (local)
+try:
+    from backend.data_loader import load_workbook_sheets, get_workbook_version, prefetch_workbooks
+    from backend.singleflight import SingleFlight
+    from backend import profiling, ingest
+except ImportError:
+    from data_loader import load_workbook_sheets, get_workbook_version, prefetch_workbooks
+    from singleflight import SingleFlight
+    import profiling
+    import ingest
+
+# Limpiar solo las filas nuevas o modificadas respecto al snapshot anterior ('false' = limpiar todo)
+DELTA_INGEST = os.getenv('DELTA_INGEST', 'true').lower() == 'true'
+
+
+# ==================== LIMPIEZA ====================
+
+def clean_ventas_contado(df: pd.DataFrame) -> pd.DataFrame:
+    """Limpia la hoja de ventas al contado"""
+    # Limpiar columnas
+    df = df.rename(columns={
+        'SEGMENTO DE NEGOCIO': 'segmento',
+        'TIPO DE VENTA': 'tipo_venta',
+        'TIPO/PRODUCTO': 'producto',
+        'CLIENTE ADMON': 'cliente',
+        'KG NETOS': 'kg_netos',
+        'CAJAS/BULTOS': 'cajas',
+        'PRECIO': 'precio',
+        'TOTAL VENTA': 'total_venta',
+        'FORMA DE PAGO': 'forma_pago',
+        'OPERADOR': 'operador',
+        'FECHA': 'fecha',
+        'NOTA': 'nota'
+    })
+    # Filtrar filas válidas (que tengan ID)
+    df = df[df['ID'].notna() & df['ID'].astype(str).str.startswith('VC')]
+    # Filtrar ventas anuladas (excluir registros con "ANULADO" en nota)
+    if 'nota' in df.columns:
+        df = df[~df['nota'].astype(str).str.contains('ANULADO', case=False, na=False)]
+    df = df.copy()
+    df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
+    df['tipo'] = 'CONTADO'
+    return df
+
+
+def clean_ventas_credito(df: pd.DataFrame) -> pd.DataFrame:
+    """Limpia la hoja de ventas a crédito"""
+    df = df.rename(columns={
+        'SEGMENTO DE NEGOCIO': 'segmento',
+        'TIPO DE VENTA': 'tipo_venta',
+        'TIPO/PRODUCTO': 'producto',
+        'CLIENTE ADMON': 'cliente',
+        'KG NETOS': 'kg_netos',
+        'CAJAS O BULTOS': 'cajas',
+        'PRECIO UNITARIO': 'precio',
+        'TOTAL VENTA': 'total_venta',
+        'OPERADOR': 'operador',
+        'FECHA': 'fecha',
+        'SALDO': 'saldo',
+        'NOTA (SI APLICA)': 'nota',
+        'COBROS EFECTUADOS': 'cobros'
+    })
+    df = df[
+        df['ID'].astype(str).str.startswith('VCR') |
+        (df['ID'].isna() & df['cliente'].notna())
+    ]
+    # Filtrar ventas anuladas (excluir registros con "ANULADO" en nota)
+    if 'nota' in df.columns:
+        df = df[~df['nota'].astype(str).str.contains('ANULADO', case=False, na=False)]
+    df = df.copy()
+    df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
+    df['saldo'] = pd.to_numeric(df['saldo'], errors='coerce').fillna(0)
+    df['cobros'] = pd.to_numeric(df['cobros'], errors='coerce').fillna(0)
+    df['tipo'] = 'CREDITO'
+    df['forma_pago'] = 'CREDITO'
+    return df
+
+
+def combine_ventas(contado: pd.DataFrame, credito: pd.DataFrame) -> pd.DataFrame:
+    """Combina ventas al contado y a crédito"""
+    # Seleccionar columnas comunes
+    cols = ['ID', 'fecha', 'segmento', 'tipo_venta', 'producto', 'cliente',
+            'kg_netos', 'cajas', 'precio', 'total_venta', 'operador', 'tipo', 'forma_pago']
+    contado_clean = contado[[c for c in cols if c in contado.columns]]
+    credito_clean = credito[[c for c in cols if c in credito.columns]]
+    return pd.concat([contado_clean, credito_clean], ignore_index=True)
+
+
+def clean_format_name(row) -> str:
+    """Nombre de producto para el top: "SEGMENTO (PRODUCTO)" normalizado"""
+    # 1. Obtener segmento y producto
+    seg = str(row.get('segmento', '')).strip().upper()
+    prod = str(row.get('producto', '')).strip().upper()
+
+    # Manejar 'NAN' strings de pandas
+    if seg == 'NAN': seg = ''
+    if prod == 'NAN': prod = ''
+
+    # 2. Limpiar HUEVO_CENTRAL -> HUEVO
+    if 'HUEVO_CENTRAL' in seg:
+        seg = seg.replace('HUEVO_CENTRAL', 'HUEVO')
+
+    # 3. Formatear como "PRODUCTO (TIPO)"
+    if seg and prod:
+        if seg == prod: return seg # Evitar "HUEVO (HUEVO)"
+        return f"{seg} ({prod})"
+    return seg or prod or "SIN NOMBRE"
+
+
+def label_productos(ventas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega 'nombre_producto' (categórica, ver clean_format_name) y 'es_cova' a las ventas
+
+    Se calculan sobre los pares únicos (segmento, producto), que son pocos,
+    y se asignan a cada fila por su código de par.
+    """
+    ventas = ventas.copy()
+    # Como object: la numeración de pares no depende de si llegan como categóricas
+    pares = ventas[['segmento', 'producto']].astype(object)
+    codes = pares.groupby(['segmento', 'producto'], dropna=False, sort=False, observed=True).ngroup().to_numpy()
+    _, first = np.unique(codes, return_index=True)
+    unicos = pares.iloc[first]
+
+    nombres = [clean_format_name(row) for _, row in unicos.iterrows()]
+    name_codes, categories = pd.factorize(pd.Series(nombres, dtype=object))
+    ventas['nombre_producto'] = pd.Categorical.from_codes(name_codes[codes], categories=categories)
+
+    es_cova = unicos['producto'].astype(str).str.contains('COVA', case=False, na=False).to_numpy()
+    ventas['es_cova'] = es_cova[codes]
+    return ventas
+
+
+def clean_compras_cebolla(df: pd.DataFrame) -> pd.DataFrame:
+    """Limpia compras de cebolla"""
+    df = df.rename(columns={
+        'FECHA': 'fecha',
+        'PROVEEDOR DE CEBOLLA': 'proveedor',
+        'COSTALES': 'cantidad',
+        'KG NETOS': 'kg_netos',
+        'PRECIO X KG': 'precio',
+        'TOTAL': 'total',
+        'ESTATUS': 'estatus'
+    })
+    # Filtrar filas con ID válido (formato CMP-##) o con total válido
+    df = df[df['ID'].notna() | (df['total'].notna() & (df['total'] > 0))].copy()
+    df['producto'] = 'CEBOLLA'
+    return df
+
+
+def clean_compras_huevo(df: pd.DataFrame) -> pd.DataFrame:
+    """Limpia compras de huevo"""
+    df = df.rename(columns={
+        'FECHA': 'fecha',
+        'PROVEEDOR DE HUEVO': 'proveedor',
+        'CAJAS': 'cantidad',
+        'KG NETOS': 'kg_netos',
+        'PRECIO x KG': 'precio',
+        'TOTAL': 'total',
+        'ESTATUS': 'estatus',
+        'MARCA DE HUEVO': 'marca'
+    })
+    # Filtrar filas con total válido (IDs pueden estar vacíos en esta hoja)
+    df = df[df['total'].notna() & (df['total'] > 0)].copy()
+    df['producto'] = 'HUEVO'
+    return df
+
+
+def combine_compras(cebolla: pd.DataFrame, huevo: pd.DataFrame) -> pd.DataFrame:
+    """Combina compras de cebolla y huevo"""
+    cols = ['ID', 'fecha', 'proveedor', 'cantidad', 'kg_netos', 'precio', 'total', 'producto']
+    cebolla_clean = cebolla[[c for c in cols if c in cebolla.columns]]
+    huevo_clean = huevo[[c for c in cols if c in huevo.columns]]
+    compras = pd.concat([cebolla_clean, huevo_clean], ignore_index=True)
+    compras['fecha'] = pd.to_datetime(compras['fecha'], errors='coerce')
+    return compras
+
+
+def clean_egresos(df: pd.DataFrame) -> pd.DataFrame:
+    """Limpia egresos/gastos operativos"""
+    df = df.rename(columns={
+        'ID': 'id',
+        'FECHA': 'fecha',
+        'TIPO DE EGRESO': 'tipo_egreso',
+        'CENTRO DE COSTOS': 'centro_costos',
+        'CONCEPTO': 'concepto',
+        'IMPORTE': 'importe',
+        'OPERADOR': 'operador',
+        'CLASIFICACIÓN COSTO/GASTO': 'clasificacion'
+    })
+    # Filtrar filas válidas: que tengan IMPORTE > 0 (algunos registros no tienen ID)
+    df = df[df['importe'].notna() & (df['importe'] > 0)].copy()
+    df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
+    return df
+
+
+def clean_cajas(df: pd.DataFrame) -> pd.DataFrame:
+    """Limpia la hoja de control de cajas (FECHA como datetime)"""
+    df = df.copy()
+    df['FECHA'] = pd.to_datetime(df['FECHA'], errors='coerce')
+    return df
+
+
+def clean_pagos(df: pd.DataFrame) -> pd.DataFrame:
+    """Limpia pagos generales: filas con cliente y monto > 0 (incluye filas sin ID)"""
+    pagos = df[
+        df['CLIENTE ADMON'].notna() &
+        (pd.to_numeric(df['MONTO PAGADO'], errors='coerce') > 0)
+    ].copy()
+    pagos['FECHA DE COBRO'] = pd.to_datetime(pagos['FECHA DE COBRO'], errors='coerce')
+    pagos['MONTO PAGADO'] = pd.to_numeric(pagos['MONTO PAGADO'], errors='coerce').fillna(0)
+    pagos['CLIENTE ADMON'] = pagos['CLIENTE ADMON'].astype(str).str.strip().str.upper()
+    return pagos
+
+
+def last_stock_cebolla(df: pd.DataFrame) -> float:
+    """Obtiene el stock actual de cebolla en KG"""
+    # Obtener última existencia válida
+    existencia = df['EXISTENCIA'].dropna()
+    if len(existencia) > 0:
+        return float(existencia.iloc[-1])
+    return 0.0
+
+
+def last_stock_huevo(df: pd.DataFrame) -> float:
+    """Obtiene el stock actual de huevo en CAJAS (columna F)"""
+    # Huevo tiene múltiples columnas de existencia, usar la PRIMERA (cajas, columna F)
+    existencia_cols = [c for c in df.columns if 'EXISTENCIA' in str(c)]
+    if existencia_cols:
+        # Usar la primera columna de existencia (cajas)
+        first_col = existencia_cols[0]
+        first_val = df[first_col].dropna()
+        if len(first_val) > 0:
+            return float(first_val.iloc[-1])
+    return 0.0
+
+
+# ==================== TIPOS COMPACTOS ====================
+
+# Por tabla: columnas de texto con pocos valores (categóricas) y montos/cantidades (float64)
+_VENTAS_TYPES = (
+    ['segmento', 'tipo_venta', 'producto', 'cliente', 'operador', 'tipo', 'forma_pago'],
+    ['kg_netos', 'cajas', 'precio', 'total_venta'],
+)
+TABLE_TYPES = {
+    'ventas': _VENTAS_TYPES,
+    'contado': _VENTAS_TYPES,
+    'credito': (_VENTAS_TYPES[0], _VENTAS_TYPES[1] + ['saldo', 'cobros']),
+    'compras': (['proveedor', 'producto'], ['cantidad', 'kg_netos', 'precio', 'total']),
+    'egresos': (['tipo_egreso', 'centro_costos', 'operador', 'clasificacion'], ['importe']),
+}
+
+
+def compact_types(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """
+    Copia de una tabla limpia con tipos compactos: texto repetitivo como categórica,
+    montos como float64 (texto no numérico -> NaN) y 'fecha' como datetime64
+    """
+    categories, numbers = TABLE_TYPES[table]
+    df = df.copy()
+    for col in numbers:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    for col in categories:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if 'fecha' in df.columns:
+        df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
+    return df
+
+
+def memory_usage(df: pd.DataFrame) -> dict:
+    """Bytes de una tabla en memoria, total y por columna (incluye el índice)"""
+    usage = df.memory_usage(deep=True)
+    return {
+        "rows": len(df),
+        "bytes": int(usage.sum()),
+        "columns": {str(col): int(n) for col, n in usage.items()}
+    }
+
+
+# ==================== INGESTA POR DELTA ====================
+
+# Hojas de movimientos que se limpian por delta: hoja -> (libro, limpieza, tabla de tipos, columna de ID)
+# Cada limpieza trata las filas por separado (ver ingest.clean_sheet)
+INCREMENTAL_SHEETS = {
+    'VENTAS AL CONTADO': ('ventas', clean_ventas_contado, 'contado', 'ID'),
+    'VENTAS A CRÉDITO': ('ventas', clean_ventas_credito, 'credito', 'ID'),
+    'EGRESOS EN EFECTIVO': ('ventas', clean_egresos, 'egresos', 'id'),
+    'PAGOS_GENERALES': ('ventas', clean_pagos, None, 'ID'),
+    'COMPRAS (C)': ('almacen', clean_compras_cebolla, 'compras', 'ID'),
+    'COMPRAS (H)': ('almacen', clean_compras_huevo, 'compras', 'ID'),
+}
+# Hojas de origen de cada tabla del snapshot (para actualizar cubos e índices con el delta)
+TABLE_SHEETS = {
+    'ventas': ['VENTAS AL CONTADO', 'VENTAS A CRÉDITO'],
+    'contado': ['VENTAS AL CONTADO'],
+    'credito': ['VENTAS A CRÉDITO'],
+    'compras': ['COMPRAS (C)', 'COMPRAS (H)'],
+    'egresos': ['EGRESOS EN EFECTIVO'],
+    'pagos': ['PAGOS_GENERALES'],
+}
+
+
+def _clean_sheets(
+    ventas_sheets: Dict[str, pd.DataFrame],
+    almacen_sheets: Dict[str, pd.DataFrame],
+    previous: Optional['DatasetSnapshot']
+) -> tuple:
+    """Limpia las hojas de movimientos (por delta si hay snapshot anterior): (hojas, cambios)"""
+    sheets, changes = {}, {}
+    for sheet_name, (book, clean, table, id_col) in INCREMENTAL_SHEETS.items():
+        raw = (ventas_sheets if book == 'ventas' else almacen_sheets)[sheet_name]
+        base = previous.sheets.get(sheet_name) if previous is not None else None
+        normalize = (lambda df, table=table: compact_types(df, table)) if table else None
+        cleaner = (lambda df, clean=clean, table=table: compact_types(clean(df), table)) if table else clean
+        sheets[sheet_name], changes[sheet_name] = ingest.clean_sheet(raw, cleaner, base, normalize, id_col)
+    return sheets, changes
+
+
+# ==================== SNAPSHOT ====================
+
+# Tablas que se guardan ordenadas por fecha: filtrar un rango es una búsqueda binaria
+DATE_SORTED_TABLES = ('ventas', 'compras', 'egresos')
+
+
+def sort_by_date(df: pd.DataFrame, date_col: str = 'fecha') -> pd.DataFrame:
+    """Ordena por fecha (estable, filas sin fecha al final) conservando el índice original"""
+    return df.sort_values(date_col, kind='mergesort', na_position='last')
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """Datos limpios de una versión concreta de los libros (solo lectura)"""
+    version: str
+    built_at: datetime
+    ventas: pd.DataFrame
+    contado: pd.DataFrame
+    credito: pd.DataFrame
+    compras: pd.DataFrame
+    egresos: pd.DataFrame
+    cajas: pd.DataFrame
+    pagos: pd.DataFrame
+    stock_cebolla: float
+    stock_huevo: float
+    # Estructuras derivadas (cubos, índices) construidas bajo demanda, una vez por snapshot
+    derived: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+    # Hojas de movimientos limpias con las huellas de sus filas (base del siguiente delta)
+    sheets: Dict[str, ingest.IncrementalSheet] = field(default_factory=dict, compare=False, repr=False)
+    # Cambios respecto al snapshot anterior (None si se construyó desde cero)
+    delta: Optional[ingest.SnapshotDelta] = field(default=None, compare=False, repr=False)
+
+    def derive(self, name: str, build: Callable[['DatasetSnapshot'], Any]) -> Any:
+        """
+        Retorna la estructura derivada 'name', construyéndola con build(snapshot) la primera vez
+
+        Peticiones simultáneas comparten una sola construcción.
+        """
+        if name not in self.derived:
+            _derivations.do((self.version, name), self._build_derived, name, build)
+        return self.derived[name]
+
+    def _build_derived(self, name: str, build: Callable[['DatasetSnapshot'], Any]):
+        if name not in self.derived:
+            self.derived[name] = build(self)
+
+    def changes(self, table: str, base_version: str) -> Optional[list]:
+        """
+        Filas limpias agregadas (+1) y quitadas (-1) de una tabla desde el snapshot 'base_version'
+
+        Returns:
+            Lista de (DataFrame, signo), o None si este snapshot no es delta de 'base_version'
+        """
+        if self.delta is None or self.delta.base_version != base_version:
+            return None
+        return self.delta.changes(TABLE_SHEETS[table])
+
+    def between(
+        self,
+        table: str,
+        start: Optional[date],
+        end: Optional[date],
+        inclusive_end: bool = True
+    ) -> pd.DataFrame:
+        """
+        Filas de una tabla ordenada por fecha dentro de [start, end], como slice sin copia
+
+        Mismo criterio que filter_by_date: sin límites incluye las filas sin fecha;
+        con algún límite, solo filas con fecha.
+
+        Args:
+            table: Una de DATE_SORTED_TABLES
+            inclusive_end: False para el rango semiabierto [start, end)
+        """
+        df = getattr(self, table)
+        if not start and not end:
+            return df
+        with profiling.span('filter'):
+            fechas = self.derive(f'fechas:{table}', lambda s: _dated_index(getattr(s, table)))
+            lo = fechas.searchsorted(pd.Timestamp(start), side='left') if start else 0
+            hi = len(fechas)
+            if end:
+                hi = fechas.searchsorted(pd.Timestamp(end), side='right' if inclusive_end else 'left')
+            return df.iloc[lo:hi]
+
+    def info(self) -> dict:
+        """Metadatos del snapshot para diagnóstico"""
+        return {
+            "version": self.version,
+            "built_at": self.built_at.isoformat(),
+            "rows": {
+                "ventas": len(self.ventas),
+                "compras": len(self.compras),
+                "egresos": len(self.egresos),
+                "cajas": len(self.cajas),
+                "pagos": len(self.pagos)
+            },
+            "derived": sorted(self.derived),
+            "delta": self.delta.summary() if self.delta else None
+        }
+
+    def memory(self) -> dict:
+        """Memoria ocupada por cada tabla del snapshot (bytes por tabla y columna)"""
+        tables = {
+            name: memory_usage(getattr(self, name))
+            for name in ('ventas', 'contado', 'credito', 'compras', 'egresos', 'cajas', 'pagos')
+        }
+        return {
+            "version": self.version,
+            "total_bytes": sum(t['bytes'] for t in tables.values()),
+            "tables": tables
+        }
+
+
+_snapshot: Optional[DatasetSnapshot] = None
+_derivations = SingleFlight()
+_builds = SingleFlight()
+
+
+def _dated_index(df: pd.DataFrame, date_col: str = 'fecha') -> pd.DatetimeIndex:
+    """Fechas de una tabla ordenada, sin las filas finales sin fecha (para searchsorted)"""
+    fechas = df[date_col]
+    return pd.DatetimeIndex(fechas.iloc[:int(fechas.notna().sum())])
+
+
+def _version_id(ventas_version, almacen_version) -> str:
+    """ID corto y estable a partir de las versiones de ambos libros"""
+    raw = f"{ventas_version}|{almacen_version}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def build_snapshot(
+    ventas_sheets: Dict[str, pd.DataFrame],
+    almacen_sheets: Dict[str, pd.DataFrame],
+    version: str,
+    previous: Optional[DatasetSnapshot] = None
+) -> DatasetSnapshot:
+    """
+    Construye un snapshot limpio a partir de las hojas crudas de ambos libros
+
+    Con 'previous', las hojas de movimientos solo limpian las filas nuevas o
+    modificadas y el snapshot guarda el delta para actualizar cubos e índices.
+    """
+    with profiling.span('clean'):
+        sheets, changes = _clean_sheets(ventas_sheets, almacen_sheets, previous)
+        contado = sheets['VENTAS AL CONTADO'].cleaned
+        credito = sheets['VENTAS A CRÉDITO'].cleaned
+        compras = combine_compras(sheets['COMPRAS (C)'].cleaned, sheets['COMPRAS (H)'].cleaned)
+        # Ordenadas por fecha: FilteredView las recorta con DatasetSnapshot.between
+        ventas = label_productos(sort_by_date(combine_ventas(contado, credito)))
+        compras = sort_by_date(compras)
+        egresos = sort_by_date(sheets['EGRESOS EN EFECTIVO'].cleaned)
+
+        # Combinar tablas con categorías distintas las vuelve object: se recompactan al final
+        ventas = compact_types(ventas, 'ventas')
+        compras = compact_types(compras, 'compras')
+
+        return DatasetSnapshot(
+            version=version,
+            built_at=datetime.now(),
+            ventas=ventas,
+            contado=contado,
+            credito=credito,
+            compras=compras,
+            egresos=egresos,
+            cajas=clean_cajas(ventas_sheets['CAJAS']),
+            pagos=sheets['PAGOS_GENERALES'].cleaned,
+            stock_cebolla=last_stock_cebolla(almacen_sheets['CONTROL DE ALMACÉN (C)']),
+            stock_huevo=last_stock_huevo(almacen_sheets['CONTROL DE ALMACÉN (H)']),
+            sheets=sheets,
+            delta=ingest.SnapshotDelta(previous.version, changes) if previous is not None else None
+        )
+
+
+def get_snapshot() -> DatasetSnapshot:
+    """
+    Retorna el snapshot vigente, reconstruyéndolo solo si cambió algún libro
+
+    Returns:
+        DatasetSnapshot compartido (no mutar sus DataFrames)
+    """
+    global _snapshot
+
+    ventas_sheets = load_workbook_sheets('ventas')
+    almacen_sheets = load_workbook_sheets('almacen')
+    version = _version_id(get_workbook_version('ventas'), get_workbook_version('almacen'))
+
+    if _snapshot is None or _snapshot.version != version:
+        # Varios hilos pueden ver la versión nueva a la vez: se construye una sola vez
+        _snapshot = _builds.do(version, _build_current, ventas_sheets, almacen_sheets, version)
+    return _snapshot
+
+
+def _build_current(ventas_sheets, almacen_sheets, version: str) -> DatasetSnapshot:
+    """Construye el snapshot de 'version' salvo que otro hilo lo haya terminado antes"""
+    if _snapshot is not None and _snapshot.version == version:
+        return _snapshot
+    return build_snapshot(ventas_sheets, almacen_sheets, version, _snapshot if DELTA_INGEST else None)
+
+
+async def get_snapshot_async() -> DatasetSnapshot:
+    """
+    Como get_snapshot, sin bloquear el event loop: espera las descargas de OneDrive
+    y carga/parsea/limpia en el pool de hilos
+    """
+    await prefetch_workbooks()
+    return await asyncio.to_thread(get_snapshot)
+
+
+def peek_snapshot() -> Optional[DatasetSnapshot]:
+    """Snapshot actual sin disparar cargas (None si aún no se construye)"""
+    return _snapshot
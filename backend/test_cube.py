@@ -0,0 +1,107 @@
+"""
+Pruebas del cubo diario: mismos agregados que filtrar filas y agrupar
+Ejecutar: python -m pytest backend/test_cube.py  (o python backend/test_cube.py)
+"""
+
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cube import DailyCube
+from panels import filter_by_date
+
+DIMS = ['tipo', 'cliente']
+MEASURES = {'total': ('total_venta', 'sum'), 'n_id': ('ID', 'count')}
+RANGES = [
+    (None, None), (date(2026, 1, 3), date(2026, 1, 10)), (date(2026, 1, 10), None),
+    (None, date(2026, 1, 5)), (date(2026, 1, 7), date(2026, 1, 7)), (date(2027, 1, 1), None),
+]
+
+
+def _ventas(days: int = 20, seed: int = 3) -> pd.DataFrame:
+    rnd = np.random.default_rng(seed)
+    n = days * 15
+    fechas = [datetime(2026, 1, 1) + timedelta(days=int(d)) for d in rnd.integers(0, days, n)]
+    # Algunas filas con hora (quedan fuera si su día es la fecha final) y sin fecha
+    fechas = [f + timedelta(hours=9) if i % 11 == 0 else f for i, f in enumerate(fechas)]
+    fechas = [None if i % 37 == 0 else f for i, f in enumerate(fechas)]
+    df = pd.DataFrame({
+        'fecha': pd.to_datetime(fechas),
+        'tipo': rnd.choice(['CONTADO', 'CREDITO'], n),
+        'cliente': rnd.choice(['LUPITA', 'SOL', None], n),
+        'total_venta': rnd.uniform(10, 500, n).round(2),
+        'ID': [None if i % 7 == 0 else f'VC-{i}' for i in range(n)],
+    })
+    return df.sort_values('fecha', kind='stable', na_position='first').reset_index(drop=True)
+
+
+def _expected(df: pd.DataFrame, start, end, by) -> pd.DataFrame:
+    rows = filter_by_date(df, start, end)
+    return rows.groupby(by).agg(total=('total_venta', 'sum'), n_id=('ID', 'count')).reset_index()
+
+
+def _actual(cube: DailyCube, start, end, by) -> pd.DataFrame:
+    return cube.query(start, end).groupby(by)[['total', 'n_id']].sum().reset_index()
+
+
+def test_cube_matches_filter_and_groupby():
+    df = _ventas()
+    cube = DailyCube.build(df, DIMS, MEASURES)
+
+    for start, end in RANGES:
+        for by in (['tipo'], ['cliente'], DIMS):
+            pd.testing.assert_frame_equal(_actual(cube, start, end, by), _expected(df, start, end, by))
+        assert cube.query(start, end)['n_rows'].sum() == len(filter_by_date(df, start, end))
+
+
+def test_cube_extends_when_only_new_days_are_appended():
+    full = _ventas(days=30)
+    old = full[full['fecha'].isna() | (full['fecha'] < datetime(2026, 1, 20))]
+    cube = DailyCube.build(old, DIMS, MEASURES)
+
+    extended = cube.extend(full)
+
+    assert extended is not None
+    for start, end in RANGES:
+        pd.testing.assert_frame_equal(_actual(extended, start, end, DIMS), _expected(full, start, end, DIMS))
+
+
+def test_cube_rebuilds_when_an_old_day_changes():
+    df = _ventas()
+    cube = DailyCube.build(df, DIMS, MEASURES)
+
+    changed = df.copy()
+    changed.loc[5, 'total_venta'] += 1
+    assert cube.extend(changed) is None
+
+
+
+def test_range_totals_have_no_round_off():
+    # Montos grandes antes del rango: restar acumulados en float perdería centavos (77.07000000000698)
+    amounts = [1234.56, 98765.43, 204161.74, 0.1, 77.07]
+    df = pd.DataFrame({
+        'fecha': pd.date_range('2026-01-01', periods=len(amounts)),
+        'tipo': ['CONTADO'] * len(amounts),
+        'cliente': ['SOL'] * len(amounts),
+        'total_venta': amounts,
+        'ID': [f'VC-{i}' for i in range(len(amounts))],
+    })
+    cube = DailyCube.build(df, DIMS, MEASURES)
+
+    for day in pd.date_range('2026-01-01', periods=len(amounts)).date:
+        mask = (df['fecha'] >= pd.Timestamp(day)) & (df['fecha'] <= pd.Timestamp(day))
+        assert cube.query(day, day)['total'].sum() == df[mask]['total_venta'].sum()
+    mask = df['fecha'] >= pd.Timestamp('2026-01-03')
+    assert cube.query(date(2026, 1, 3), None)['total'].sum() == df[mask]['total_venta'].sum()
+
+if __name__ == "__main__":
+    test_cube_matches_filter_and_groupby()
+    test_cube_extends_when_only_new_days_are_appended()
+    test_cube_rebuilds_when_an_old_day_changes()
+    test_range_totals_have_no_round_off()
+    print("OK")
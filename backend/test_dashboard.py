@@ -0,0 +1,161 @@
+"""
+Pruebas de /api/dashboard: mismos paneles que los endpoints individuales
+Ejecutar: python -m pytest backend/test_dashboard.py  (o python backend/test_dashboard.py)
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import main
+from panels import filter_by_date
+from snapshot import build_snapshot, clean_format_name, label_productos
+
+RANGE = 'start_date=2026-01-01&end_date=2026-01-31'
+
+
+def _sheets():
+    """Hojas crudas pequeñas de ambos libros: (ventas, almacén)"""
+    d = datetime(2026, 1, 10)
+    ventas_sheets = {
+        'VENTAS AL CONTADO': pd.DataFrame({
+            'ID': ['VC-1', 'VC-2', 'VC-3'], 'FECHA': [d, datetime(2026, 1, 12), datetime(2026, 2, 1)],
+            'SEGMENTO DE NEGOCIO': ['CEBOLLA', 'HUEVO_CENTRAL', 'COVA'], 'TIPO DE VENTA': ['MAYOREO'] * 3,
+            'TIPO/PRODUCTO': ['BLANCA', 'HUEVO', 'COVA'], 'CLIENTE ADMON': ['LUPITA', 'SOL', 'LUPITA'],
+            'KG NETOS': [10.0, 0.0, 5.0], 'CAJAS/BULTOS': [1, 3, 1], 'PRECIO': [20.0, 300.0, 10.0],
+            'TOTAL VENTA': [200.0, 900.0, 50.0], 'FORMA DE PAGO': ['EFECTIVO'] * 3,
+            'OPERADOR': ['EMILIO', 'DIEGO', 'EMILIO'], 'NOTA': [None, None, None],
+        }),
+        'VENTAS A CRÉDITO': pd.DataFrame({
+            'ID': ['VCR-1', None], 'FECHA': [d, datetime(2026, 1, 20)],
+            'SEGMENTO DE NEGOCIO': ['CEBOLLA', 'CEBOLLA'], 'TIPO DE VENTA': ['CREDITO'] * 2,
+            'TIPO/PRODUCTO': ['MORADA', 'BLANCA'], 'CLIENTE ADMON': ['Lupita', 'Sol'],
+            'KG NETOS': [20.0, 4.0], 'CAJAS O BULTOS': [2, 1], 'PRECIO UNITARIO': [15.0, 20.0],
+            'TOTAL VENTA': [300.0, 80.0], 'OPERADOR': ['RICHARD', 'RICHARD'], 'SALDO': [100.0, 80.0],
+            'NOTA (SI APLICA)': [None, None], 'COBROS EFECTUADOS': [200.0, 0.0],
+        }),
+        'EGRESOS EN EFECTIVO': pd.DataFrame({
+            'ID': ['EG-1'], 'FECHA': [d], 'TIPO DE EGRESO': ['GASOLINA'], 'CENTRO DE COSTOS': ['BODEGA'],
+            'CONCEPTO': ['diesel'], 'IMPORTE': [150.0], 'OPERADOR': ['DIEGO'],
+            'CLASIFICACIÓN COSTO/GASTO': ['GASTO'],
+        }),
+        'CAJAS': pd.DataFrame({
+            'SEMANA': [1, 1], 'FECHA': [d, d], 'CONCEPTO': ['COBRANZA VENTAS AL CONTADO', 'FIN DEL DÍA'],
+            'EMILIO': [200.0, 500.0], 'RICHARD': [0.0, 10.0], 'BODEGA 55': [0.0, 0.0], 'DIEGO': [0.0, 5.0],
+            'SALDO FINAL DE EFECTIVO': [None, 515.0],
+        }),
+        'PAGOS_GENERALES': pd.DataFrame({
+            'ID': ['PG-1'], 'FECHA DE COBRO': [datetime(2026, 1, 15)], 'CLIENTE ADMON': ['lupita '],
+            'MONTO PAGADO': [200.0], 'TIPO DE MOVIMIENTO': ['ABONO'],
+        }),
+    }
+    almacen_sheets = {
+        'COMPRAS (C)': pd.DataFrame({
+            'ID': ['CMP-1'], 'FECHA': [d], 'PROVEEDOR DE CEBOLLA': ['PROV'], 'COSTALES': [10],
+            'KG NETOS': [500.0], 'PRECIO X KG': [9.0], 'TOTAL': [4500.0], 'ESTATUS': ['PAGADO'],
+        }),
+        'COMPRAS (H)': pd.DataFrame({
+            'ID': [None], 'FECHA': [d], 'PROVEEDOR DE HUEVO': ['PROVH'], 'CAJAS': [5], 'KG NETOS': [100.0],
+            'PRECIO x KG': [30.0], 'TOTAL': [3000.0], 'ESTATUS': ['PAGADO'], 'MARCA DE HUEVO': ['X'],
+        }),
+        'CONTROL DE ALMACÉN (C)': pd.DataFrame({'EXISTENCIA': [100.0, 90.0]}),
+        'CONTROL DE ALMACÉN (H)': pd.DataFrame({'EXISTENCIA': [7.0, 8.0]}),
+    }
+    return ventas_sheets, almacen_sheets
+
+
+def _snapshot():
+    """Snapshot pequeño construido desde hojas en memoria (sin libros de Excel)"""
+    return build_snapshot(*_sheets(), 'prueba')
+
+
+def _client(monkeypatch) -> TestClient:
+    snap = _snapshot()
+
+    async def fake_snapshot():
+        return snap
+
+    monkeypatch.setattr(main, 'get_snapshot_async', fake_snapshot)
+    return TestClient(main.app)
+
+
+def test_dashboard_matches_individual_endpoints(monkeypatch):
+    client = _client(monkeypatch)
+    endpoints = {
+        'summary': '/api/summary', 'sales_trend': '/api/sales/trend', 'top_products': '/api/sales/top-products',
+        'top_clients': '/api/sales/top-clients', 'ticket_distribution': '/api/sales/ticket-distribution',
+        'sales_by_weekday': '/api/sales/by-weekday', 'purchases': '/api/purchases', 'expenses': '/api/expenses',
+        'client_ledger': '/api/client-ledger', 'cash_status': '/api/cash-status', 'stock': '/api/stock',
+    }
+
+    dashboard = client.get(f'/api/dashboard?{RANGE}').json()
+
+    assert dashboard['snapshot'] == 'prueba'
+    for name, url in endpoints.items():
+        assert dashboard['panels'][name] == client.get(f'{url}?{RANGE}').json(), name
+
+
+def test_dashboard_panel_selector(monkeypatch):
+    client = _client(monkeypatch)
+
+    response = client.get(f'/api/dashboard?panels=summary,stock&{RANGE}')
+    assert list(response.json()['panels']) == ['summary', 'stock']
+    assert response.json()['panels']['summary']['num_ventas'] == 4
+
+    assert client.get('/api/dashboard?panels=summary,no-existe').status_code == 400
+
+
+def test_between_slices_like_filter_by_date():
+    snap = _snapshot()
+    ranges = [(None, None), (datetime(2026, 1, 10), None), (None, datetime(2026, 1, 12)),
+              (datetime(2026, 1, 11), datetime(2026, 1, 31)), (datetime(2027, 1, 1), None)]
+
+    for table in ('ventas', 'compras', 'egresos'):
+        for start, end in ranges:
+            expected = filter_by_date(getattr(snap, table), start, end)
+            pd.testing.assert_frame_equal(snap.between(table, start, end), expected)
+
+
+def test_product_names_match_row_apply():
+    ventas = pd.DataFrame({
+        'segmento': ['HUEVO_CENTRAL', 'huevo', 'CEBOLLA', None, 'CEBOLLA', 'COVA', 'CEBOLLA'],
+        'producto': ['HUEVO', 'Huevo ', 'BLANCA', 'MORADA', None, 'cova chica', 'BLANCA'],
+    })
+    labeled = label_productos(ventas)
+
+    assert labeled['nombre_producto'].astype(str).tolist() == ventas.apply(clean_format_name, axis=1).tolist()
+    assert labeled['es_cova'].tolist() == ventas['producto'].str.contains('COVA', case=False, na=False).tolist()
+    assert 'nombre_producto' not in ventas.columns
+
+    top = main.panels.top_products(main.FilteredView(_snapshot()))['data']
+    assert [p['producto'] for p in top] == ['HUEVO', 'CEBOLLA (MORADA)', 'CEBOLLA (BLANCA)']
+
+
+def test_snapshot_tables_use_compact_types(monkeypatch):
+    snap = _snapshot()
+    for col in ('cliente', 'segmento', 'producto', 'operador', 'tipo', 'forma_pago'):
+        assert isinstance(snap.ventas[col].dtype, pd.CategoricalDtype), col
+    assert isinstance(snap.compras['proveedor'].dtype, pd.CategoricalDtype)
+    assert isinstance(snap.egresos['tipo_egreso'].dtype, pd.CategoricalDtype)
+    assert snap.ventas['total_venta'].dtype == 'float64'
+    assert pd.api.types.is_datetime64_any_dtype(snap.compras['fecha'])
+
+    client = _client(monkeypatch)
+    # Categorías sin filas en el rango no aparecen como grupos vacíos
+    febrero = client.get('/api/sales/by-type?start_date=2026-02-01').json()['data']
+    assert [row['tipo'] for row in febrero] == ['CONTADO']
+
+    memory = client.get('/api/debug/memory').json()
+    assert memory['tables']['ventas']['rows'] == len(snap.ventas)
+    assert memory['tables']['ventas']['columns']['cliente'] > 0
+    assert memory['total_bytes'] == sum(t['bytes'] for t in memory['tables'].values())
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,114 @@
+"""
+Pruebas del caché condicional (ETag / If-None-Match)
+Ejecutar: python -m pytest backend/test_http_cache.py  (o python backend/test_http_cache.py)
+"""
+
+import sys
+from dataclasses import replace
+from datetime import date
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import http_cache
+import main
+from test_dashboard import _snapshot
+
+RANGE = 'start_date=2026-01-01&end_date=2026-01-31'
+
+
+def _client(monkeypatch, snap):
+    async def fake_snapshot():
+        return snap
+
+    monkeypatch.setattr(main, 'get_snapshot_async', fake_snapshot)
+    return TestClient(main.app)
+
+
+def test_not_modified_skips_the_endpoint(monkeypatch):
+    client = _client(monkeypatch, _snapshot())
+    calls = []
+    summary = main.panels.summary
+    monkeypatch.setattr(main.panels, 'summary', lambda view: calls.append(1) or summary(view))
+
+    first = client.get(f'/api/summary?{RANGE}')
+    etag = first.headers['etag']
+    assert first.headers['cache-control'] == 'no-cache'
+
+    second = client.get(f'/api/summary?{RANGE}', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.content == b''
+    assert len(calls) == 1
+
+
+def test_etag_follows_version_and_query(monkeypatch):
+    snap = _snapshot()
+    client = _client(monkeypatch, snap)
+    etag = client.get(f'/api/summary?{RANGE}').headers['etag']
+
+    # Mismos parámetros en otro orden (y vacíos) -> mismo ETag
+    reordered = client.get('/api/summary?end_date=2026-01-31&start_date=2026-01-01&operador=')
+    assert reordered.headers['etag'] == etag
+    assert client.get('/api/summary').headers['etag'] != etag
+
+    # Datos nuevos -> el ETag anterior ya no coincide
+    client = _client(monkeypatch, replace(snap, version='otra'))
+    response = client.get(f'/api/summary?{RANGE}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+
+
+def test_endpoint_uses_the_snapshot_of_the_etag(monkeypatch):
+    snap = _snapshot()
+    versions = iter(['v1', 'v2'])
+
+    async def fake_snapshot():
+        # Cada llamada ve una versión nueva: una segunda llamada desfasaría ETag y contenido
+        return replace(snap, version=next(versions))
+
+    monkeypatch.setattr(main, 'get_snapshot_async', fake_snapshot)
+    response = TestClient(main.app).get('/api/dashboard?panels=summary')
+
+    assert response.json()['snapshot'] == 'v1'
+    assert response.headers['etag'] == http_cache.make_etag('v1', '/api/dashboard', [('panels', 'summary')])
+    assert next(versions) == 'v2'
+
+
+def test_unknown_routes_do_not_load_the_snapshot(monkeypatch):
+    calls = []
+
+    async def fake_snapshot():
+        calls.append(1)
+        return _snapshot()
+
+    monkeypatch.setattr(main, 'get_snapshot_async', fake_snapshot)
+    client = TestClient(main.app)
+    # El http_cache que usa main (backend.http_cache si se corre desde la raíz)
+    tagged = main.http_cache.get_etag_stats()['tagged']
+
+    assert client.get('/api/no-existe').status_code == 404
+    assert client.get('/metrics').status_code == 200
+    assert calls == []
+    client.get('/api/summary')
+    assert len(calls) == 1
+    assert main.http_cache.get_etag_stats()['tagged'] == tagged + 1
+
+
+def test_health_is_not_tagged(monkeypatch):
+    client = _client(monkeypatch, _snapshot())
+    assert 'etag' not in client.get('/api/health').headers
+
+
+def test_etag_changes_with_the_day():
+    params = [('start_date', '2026-01-01')]
+    assert (http_cache.make_etag('v', '/api/summary', params, date(2026, 1, 1))
+            != http_cache.make_etag('v', '/api/summary', params, date(2026, 1, 2)))
+    assert http_cache.matches('"x", W/"abc"', 'W/"abc"')
+    assert not http_cache.matches(None, 'W/"abc"')
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,127 @@
+"""
+Pruebas de la ingesta por delta: mismo snapshot, cubos y estados de cuenta que limpiar todo
+Ejecutar: python -m pytest backend/test_ingest.py  (o python backend/test_ingest.py)
+"""
+
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cube
+import ledger
+from ingest import clean_sheet
+from snapshot import build_snapshot, clean_ventas_contado
+from test_dashboard import _sheets
+
+TABLES = ('ventas', 'contado', 'credito', 'compras', 'egresos', 'pagos')
+
+
+def _append(df: pd.DataFrame, **row) -> pd.DataFrame:
+    return pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+
+
+def _edited_sheets():
+    """Las hojas de prueba con una venta nueva, una nota modificada, un abono y una compra nuevos"""
+    ventas_sheets, almacen_sheets = _sheets()
+    ventas_sheets = dict(ventas_sheets)
+    almacen_sheets = dict(almacen_sheets)
+
+    contado = ventas_sheets['VENTAS AL CONTADO']
+    ventas_sheets['VENTAS AL CONTADO'] = _append(contado, **{
+        **contado.iloc[0].to_dict(), 'ID': 'VC-4', 'FECHA': datetime(2026, 2, 3), 'TOTAL VENTA': 75.0
+    })
+    credito = ventas_sheets['VENTAS A CRÉDITO'].copy()
+    credito.loc[0, 'TOTAL VENTA'] = 320.0
+    ventas_sheets['VENTAS A CRÉDITO'] = credito
+    pagos = ventas_sheets['PAGOS_GENERALES']
+    ventas_sheets['PAGOS_GENERALES'] = _append(pagos, **{
+        **pagos.iloc[0].to_dict(), 'ID': 'PG-2', 'FECHA DE COBRO': datetime(2026, 1, 25), 'MONTO PAGADO': 50.0
+    })
+    compras = almacen_sheets['COMPRAS (C)']
+    almacen_sheets['COMPRAS (C)'] = _append(compras, **{
+        **compras.iloc[0].to_dict(), 'ID': 'CMP-2', 'FECHA': datetime(2026, 1, 11), 'TOTAL': 900.0
+    })
+    return ventas_sheets, almacen_sheets
+
+
+def test_clean_sheet_matches_cleaning_the_whole_sheet():
+    raw = _sheets()[0]['VENTAS AL CONTADO']
+    previous, changes = clean_sheet(raw, clean_ventas_contado)
+    assert changes is None
+
+    # Se borra la primera fila, se modifica otra, se repite una y se agregan dos
+    edited = raw.iloc[1:].copy()
+    edited.loc[2, 'TOTAL VENTA'] = 60.0
+    edited = pd.concat([edited, raw.iloc[[1]], raw.iloc[[0]].assign(ID='VC-9')], ignore_index=True)
+
+    sheet, changes = clean_sheet(edited, clean_ventas_contado, previous)
+
+    pd.testing.assert_frame_equal(sheet.cleaned, clean_ventas_contado(edited))
+    assert changes.summary() == {"added": 3, "removed": 2, "modified": 1}
+    assert sorted(changes.added['ID']) == ['VC-2', 'VC-3', 'VC-9']
+
+
+def test_unchanged_sheet_reuses_the_cleaned_rows():
+    raw = _sheets()[0]['VENTAS AL CONTADO']
+    previous, _ = clean_sheet(raw, clean_ventas_contado)
+
+    sheet, changes = clean_sheet(raw.copy(), clean_ventas_contado, previous)
+
+    assert sheet.cleaned is previous.cleaned
+    assert changes.summary() == {"added": 0, "removed": 0, "modified": 0}
+
+
+def test_delta_snapshot_matches_full_rebuild():
+    previous = build_snapshot(*_sheets(), 'v1')
+    edited = _edited_sheets()
+
+    delta = build_snapshot(*edited, 'v2', previous)
+    full = build_snapshot(*edited, 'v2')
+
+    for table in TABLES:
+        pd.testing.assert_frame_equal(getattr(delta, table), getattr(full, table), obj=table)
+    sheets = delta.info()['delta']['sheets']
+    assert sheets['VENTAS AL CONTADO'] == {"added": 1, "removed": 0, "modified": 0}
+    assert sheets['VENTAS A CRÉDITO'] == {"added": 1, "removed": 1, "modified": 1}
+    assert sheets['EGRESOS EN EFECTIVO'] == {"added": 0, "removed": 0, "modified": 0}
+    assert full.delta is None and delta.changes('ventas', 'otra') is None
+
+
+def _by_cliente(daily_cube: cube.DailyCube, start=None, end=None) -> dict:
+    result = daily_cube.query(start, end)
+    result['cliente'] = result['cliente'].astype(str)
+    return result.groupby('cliente')[['total', 'n_rows']].sum().round(6).to_dict()
+
+
+def test_cube_and_ledger_follow_the_delta(monkeypatch):
+    monkeypatch.setattr(cube, '_latest', {})
+    monkeypatch.setattr(ledger, '_latest', None)
+    previous = build_snapshot(*_sheets(), 'v1')
+    edited = _edited_sheets()
+    delta = build_snapshot(*edited, 'v2', previous)
+    full = build_snapshot(*edited, 'v2')
+
+    cube.get_cube(previous, 'ventas')
+    stats = cube.get_cube_stats()
+    updated = cube.get_cube(delta, 'ventas')
+    assert cube.get_cube_stats()['deltas'] == stats['deltas'] + 1
+
+    rebuilt = cube.DailyCube.build(full.ventas, *cube.CUBE_SPECS['ventas'][1:])
+    for start, end in ((None, None), (date(2026, 1, 1), date(2026, 1, 31)), (date(2026, 2, 1), None)):
+        assert _by_cliente(updated, start, end) == _by_cliente(rebuilt, start, end)
+
+    before = {e['cliente']: e for e in ledger.get_ledger_index(previous).ledger}
+    after = ledger.get_ledger_index(delta).ledger
+    assert after == ledger.build_ledger(full.credito, full.pagos)
+    # Solo cambiaron notas y abonos de Lupita: el estado de cuenta de Sol se reutiliza
+    assert next(e for e in after if e['cliente'] == 'Sol') is before['Sol']
+    assert next(e for e in after if e['cliente'] == 'Lupita') is not before['Lupita']
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,164 @@
+"""
+Pruebas del estado de cuenta por cliente: mismo resultado que recorrer cada cliente con iterrows
+Ejecutar: python -m pytest backend/test_ledger.py  (o python backend/test_ledger.py)
+"""
+
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import main
+from ledger import LedgerIndex, build_ledger
+from snapshot import build_snapshot, clean_pagos
+from test_dashboard import _sheets, _snapshot, _client
+
+
+def _reference(credito: pd.DataFrame, pagos_raw: pd.DataFrame) -> list:
+    """Implementación original: filtra credito y pagos por cada cliente"""
+    clientes = credito[credito['saldo'] > 0]['cliente'].dropna().unique()
+    resultado = []
+    for cliente_nombre in clientes:
+        if str(cliente_nombre) in ('nan', 'None', ''):
+            continue
+        ventas_cliente = credito[credito['cliente'] == cliente_nombre]
+        movimientos = []
+        for _, row in ventas_cliente.sort_values('fecha', kind='stable').iterrows():
+            movimientos.append({
+                "fecha": str(row['fecha'])[:10] if pd.notna(row['fecha']) else '',
+                "nota": float(row['total_venta']) if pd.notna(row['total_venta']) else 0,
+                "abono": None
+            })
+        pagos_cliente = pagos_raw[pagos_raw['CLIENTE ADMON'] == cliente_nombre.upper()]
+        for _, row in pagos_cliente.sort_values('FECHA DE COBRO', kind='stable').iterrows():
+            movimientos.append({
+                "fecha": str(row['FECHA DE COBRO'])[:10] if pd.notna(row['FECHA DE COBRO']) else '',
+                "nota": None,
+                "abono": float(row['MONTO PAGADO']) if row['MONTO PAGADO'] > 0 else None
+            })
+        movimientos.sort(key=lambda x: x['fecha'] or '')
+        total_venta = sum(m['nota'] for m in movimientos if m['nota'])
+        total_cobrado = sum(m['abono'] for m in movimientos if m['abono'])
+        resultado.append({
+            "cliente": str(cliente_nombre),
+            "total_venta": total_venta,
+            "total_cobrado": total_cobrado,
+            "saldo_pendiente": total_venta - total_cobrado,
+            "movimientos": movimientos
+        })
+    resultado.sort(key=lambda x: x['saldo_pendiente'], reverse=True)
+    return resultado
+
+
+def _random_tables(n: int = 400, seed: int = 5):
+    rnd = np.random.default_rng(seed)
+    nombres = ['Lupita', 'LUPITA', 'Sol', 'Don Beto', 'Rosa ', 'Chuy', None]
+    fechas = [datetime(2026, 1, 1) + timedelta(days=int(d), hours=int(h))
+              for d, h in zip(rnd.integers(0, 40, n), rnd.choice([0, 0, 9], n))]
+    fechas[3] = pd.NaT
+    credito = pd.DataFrame({
+        'cliente': rnd.choice(nombres, n),
+        'fecha': pd.to_datetime(fechas),
+        'total_venta': rnd.choice([100.0, 250.5, np.nan, 80.0], n),
+        'saldo': rnd.choice([0.0, 0.0, 50.0], n),
+    })
+    pagos = clean_pagos(pd.DataFrame({
+        'CLIENTE ADMON': rnd.choice(['lupita', 'SOL ', 'chuy', 'ROSA', 'nadie', None], n // 2),
+        'FECHA DE COBRO': [datetime(2026, 1, 1) + timedelta(days=int(d)) for d in rnd.integers(0, 40, n // 2)],
+        'MONTO PAGADO': rnd.choice([0.0, 30.0, 75.25, 'x'], n // 2),
+    }))
+    return credito, pagos
+
+
+def test_ledger_matches_per_client_loop():
+    credito, pagos = _random_tables()
+    assert build_ledger(credito, pagos) == _reference(credito, pagos)
+
+
+def test_ledger_on_snapshot():
+    snap = _snapshot()
+    ledger = build_ledger(snap.credito, snap.pagos)
+
+    assert ledger == _reference(snap.credito, snap.pagos)
+    assert [c['cliente'] for c in ledger] == ['Lupita', 'Sol']
+    assert ledger[0]['movimientos'][-1] == {"fecha": '2026-01-15', "nota": None, "abono": 200.0}
+
+
+def test_ledger_without_pending_balances():
+    credito, pagos = _random_tables()
+    assert build_ledger(credito.assign(saldo=0.0), pagos) == []
+
+
+def test_index_lookup_by_normalized_name():
+    credito, pagos = _random_tables()
+    ledger = build_ledger(credito, pagos)
+    index = LedgerIndex(ledger)
+
+    assert index.clients == [{k: v for k, v in c.items() if k != 'movimientos'} for c in ledger]
+    # 'Lupita' y 'LUPITA' comparten clave: gana el escrito igual
+    assert index.lookup('LUPITA')['cliente'] == 'LUPITA'
+    assert index.lookup('Lupita')['cliente'] == 'Lupita'
+    assert index.lookup('  don beto ')['cliente'] == 'Don Beto'
+    assert index.lookup('nadie') is None
+
+
+def test_clients_and_single_ledger_endpoints(monkeypatch):
+    client = _client(monkeypatch)
+    full = client.get('/api/client-ledger').json()
+
+    clients = client.get('/api/clients').json()
+    assert [c['cliente'] for c in clients] == [c['cliente'] for c in full]
+    assert 'movimientos' not in clients[0]
+
+    assert client.get('/api/client-ledger/lupita').json() == full[0]
+    assert client.get('/api/client-ledger/No%20Existe').status_code == 404
+
+
+
+def test_single_ledger_with_a_slash_in_the_name(monkeypatch):
+    ventas, almacen = _sheets()
+    ventas['VENTAS A CRÉDITO'].loc[1, 'CLIENTE ADMON'] = 'JUAN S/N'
+    snap = build_snapshot(ventas, almacen, 'prueba')
+
+    async def fake_snapshot():
+        return snap
+
+    monkeypatch.setattr(main, 'get_snapshot_async', fake_snapshot)
+    client = TestClient(main.app)
+
+    # Como lo pide app.js: encodeURIComponent('JUAN S/N')
+    response = client.get('/api/client-ledger/JUAN%20S%2FN')
+    assert response.status_code == 200
+    assert response.json()['cliente'] == 'JUAN S/N'
+    assert client.get('/api/client-ledger/juan s/n').json() == response.json()
+    assert client.get('/api/client-ledger/JUAN%20S%2FX').status_code == 404
+
+
+def test_single_ledger_is_serialized_off_the_event_loop(monkeypatch):
+    client = _client(monkeypatch)
+    threads = {}
+    get_view, json_response = main.get_view, main.json_response
+
+    async def tracking_view(request):
+        threads['loop'] = threading.current_thread()
+        return await get_view(request)
+
+    def tracking_response(content):
+        threads['serialize'] = threading.current_thread()
+        return json_response(content)
+
+    monkeypatch.setattr(main, 'get_view', tracking_view)
+    monkeypatch.setattr(main, 'json_response', tracking_response)
+    assert client.get('/api/client-ledger/lupita').status_code == 200
+    assert threads['serialize'] is not threads['loop']
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
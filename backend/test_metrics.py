@@ -0,0 +1,100 @@
+"""
+Pruebas del endpoint /metrics (formato de texto de Prometheus)
+Ejecutar: python -m pytest backend/test_metrics.py  (o python backend/test_metrics.py)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import main
+from test_dashboard import _client, _snapshot
+
+# El módulo que actualiza el middleware de main (backend.metrics si se corre desde la raíz)
+metrics = main.metrics
+
+
+@pytest.fixture
+def fresh_requests(monkeypatch):
+    """Contadores de peticiones en cero, sin arrastrar las de otras pruebas"""
+    monkeypatch.setattr(metrics.requests_total, '_values', {})
+    monkeypatch.setattr(metrics.requests_in_flight, '_values', {})
+    metrics.requests_in_flight.set(0)
+
+
+def _samples(text: str) -> dict:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_counter_gauge_and_histogram_text_format():
+    counter = metrics.Counter('prueba_eventos_total', 'Eventos de prueba')
+    counter.inc(cache='file', result='hit')
+    counter.inc(2, cache='file', result='hit')
+    gauge = metrics.Gauge('prueba_en_curso', 'En curso')
+    gauge.inc()
+    gauge.dec()
+    histogram = metrics.Histogram('prueba_segundos', 'Duración', buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 3.0):
+        histogram.observe(value, sheet='VENTAS "A"')
+
+    try:
+        text = metrics.render()
+    finally:
+        del metrics._registry[-3:]
+    assert '# TYPE prueba_eventos_total counter' in text
+    samples = _samples(text)
+    assert samples['prueba_eventos_total{cache="file",result="hit"}'] == 3
+    assert samples['prueba_en_curso'] == 0
+    # Buckets acumulados, con las comillas de la etiqueta escapadas
+    assert samples['prueba_segundos_bucket{sheet="VENTAS \\"A\\"",le="0.1"}'] == 1
+    assert samples['prueba_segundos_bucket{sheet="VENTAS \\"A\\"",le="1"}'] == 2
+    assert samples['prueba_segundos_bucket{sheet="VENTAS \\"A\\"",le="+Inf"}'] == 3
+    assert samples['prueba_segundos_sum{sheet="VENTAS \\"A\\""}'] == 3.55
+    assert samples['prueba_segundos_count{sheet="VENTAS \\"A\\""}'] == 3
+
+
+def test_metrics_endpoint_reports_requests_and_snapshot_age(monkeypatch, fresh_requests):
+    client = _client(monkeypatch)
+    monkeypatch.setattr(main, 'peek_snapshot', _snapshot)
+
+    client.get('/api/client-ledger/Sol')
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    # /metrics no pasa por el ETag de /api/*
+    assert 'etag' not in response.headers
+    samples = _samples(response.text)
+    assert samples['ova_http_requests_total{method="GET",route="/api/client-ledger/{cliente}",status="200"}'] == 1
+    # La petición a /metrics sigue en curso mientras se genera la respuesta
+    assert samples['ova_http_requests_in_flight'] == 1
+    assert samples['ova_snapshot_age_seconds'] >= 0
+    assert 'ova_workbook_cache_lookups_total{result="hit"}' in samples
+    assert 'ova_sheet_loads_total{source="range"}' in samples
+    # Un contador por concepto: 200 con ETag y 304 no se suman bajo una misma métrica
+    assert 'ova_etag_tagged_total' in samples and 'ova_etag_not_modified_total' in samples
+
+
+def test_broken_collector_does_not_break_the_scrape():
+    def broken():
+        raise RuntimeError("sin datos")
+
+    metrics.register_collector('prueba_rota', 'gauge', 'Colector roto', broken)
+    try:
+        text = metrics.render()
+    finally:
+        metrics._collectors.pop()
+    assert 'prueba_rota' not in text
+    assert 'ova_http_requests_in_flight' in text
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,107 @@
+"""
+Prueba del sondeo de cambios contra el servidor falso de Graph
+Ejecutar: python -m pytest backend/test_poller.py  (o python backend/test_poller.py)
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import data_loader
+import graph_client
+from fake_graph_server import start_fake_graph
+
+
+@pytest.fixture
+def fake_graph(monkeypatch, tmp_path):
+    workbook = tmp_path / 'ventas.xlsx'
+    workbook.write_bytes(b'version-1')
+    server, _ = start_fake_graph({'ventas-id': workbook})
+    # El servidor falso no valida el token: evitar MSAL (y la red) en la prueba
+    monkeypatch.setattr(graph_client, 'get_access_token', lambda: 'fake-token')
+    monkeypatch.setattr(graph_client, 'GRAPH_BASE_URL', server.base_url)
+    graph_client.clear_cache()
+    yield server, workbook
+    server.shutdown()
+
+
+def sync(item_id: str) -> bool:
+    return asyncio.run(graph_client.sync_file(item_id))
+
+
+def test_sync_file_downloads_only_on_change(fake_graph):
+    server, workbook = fake_graph
+
+    # Primera vez: descarga
+    assert sync('ventas-id') is True
+    assert graph_client.download_excel_file('ventas-id') == b'version-1'
+
+    # Sin cambios: solo consulta metadatos
+    assert sync('ventas-id') is False
+    assert server.requests[('content', 'ventas-id')] == 1
+
+    # Archivo editado: vuelve a descargar
+    workbook.write_bytes(b'version-2')
+    assert sync('ventas-id') is True
+    assert graph_client.download_excel_file('ventas-id') == b'version-2'
+    assert server.requests[('content', 'ventas-id')] == 2
+    assert server.requests[('info', 'ventas-id')] == 3
+
+
+
+async def _until(condition, timeout: float = 3.0) -> bool:
+    """Espera (sin bloquear el loop) a que se cumpla la condición"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+def test_cache_ttl_returns_when_polls_keep_failing(fake_graph):
+    server, _ = fake_graph
+
+    async def scenario():
+        watcher = asyncio.create_task(graph_client.watch_files(['ventas-id'], lambda: None, interval=0.1))
+        assert await _until(graph_client._watcher_fresh)
+        # Sondeo al día: el contenido en caché se sirve aunque su TTL (0 minutos) haya vencido
+        served = graph_client._cached_file('ventas-id', 0) is not None
+        # Graph deja de responder por el archivo: cada sondeo falla
+        server.files.clear()
+        stale = await _until(lambda: not graph_client._watcher_fresh())
+        expired = graph_client._cached_file('ventas-id', 0) is None
+        watcher.cancel()
+        return served, stale, expired
+
+    assert asyncio.run(scenario()) == (True, True, True)
+
+
+def test_watcher_logs_and_retries_a_missing_item_id(monkeypatch, capsys):
+    # data_loader importa el cliente de Graph solo si arranca en modo OneDrive
+    for name in ('watch_files', 'GraphAPIError'):
+        monkeypatch.setattr(data_loader, name, getattr(graph_client, name), raising=False)
+    monkeypatch.setattr(data_loader, 'USE_ONEDRIVE', True)
+    monkeypatch.setattr(data_loader, 'POLL_INTERVAL_SECONDS', 0.01, raising=False)
+    monkeypatch.setattr(data_loader, 'EXCEL_VENTAS_ITEM_ID', '', raising=False)
+    monkeypatch.setattr(data_loader, 'EXCEL_ALMACEN_ITEM_ID', 'almacen-id', raising=False)
+
+    async def scenario():
+        watcher = asyncio.create_task(data_loader.watch_workbooks(lambda: None))
+        await asyncio.sleep(0.05)
+        alive = not watcher.done()
+        watcher.cancel()
+        return alive
+
+    assert asyncio.run(scenario())
+    errors = [line for line in capsys.readouterr().out.splitlines() if 'ventas' in line and '[ERROR]' in line]
+    assert len(errors) > 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
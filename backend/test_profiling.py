@@ -0,0 +1,71 @@
+"""
+Pruebas del perfilado por petición (Server-Timing y /api/debug/profile)
+Ejecutar: python -m pytest backend/test_profiling.py  (o python backend/test_profiling.py)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import main
+from test_dashboard import _client
+
+# El módulo que usa main: desde la raíz del repo es backend.profiling, no el profiling de nivel superior
+profiling = main.profiling
+
+RANGE = 'start_date=2026-01-01&end_date=2026-01-31'
+
+
+def _timings(header: str) -> dict:
+    metrics = {}
+    for item in header.split(', '):
+        name, dur = item.split(';dur=')
+        metrics[name] = float(dur)
+    return metrics
+
+
+def test_server_timing_and_route_percentiles(monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILING_ENABLED', True)
+    profiling.clear()
+    client = _client(monkeypatch)
+
+    response = client.get(f'/api/sales/trend?{RANGE}')
+    metrics = _timings(response.headers['server-timing'])
+    assert {'snapshot', 'filter', 'aggregate', 'serialize', 'total'} <= set(metrics)
+    assert metrics['total'] >= metrics['aggregate']
+
+    for name in ('Sol', 'lupita'):
+        client.get(f'/api/client-ledger/{name}')
+
+    report = client.get('/api/debug/profile?recent=2').json()
+    assert report['enabled'] is True
+    assert report['routes']['GET /api/sales/trend']['count'] == 1
+    # Las rutas con parámetro se agrupan por plantilla
+    ledger = report['routes']['GET /api/client-ledger/{cliente}']
+    assert ledger['count'] == 2
+    assert ledger['p50_ms'] <= ledger['p95_ms'] <= ledger['p99_ms']
+    assert 'aggregate' in ledger['spans']
+    assert [p['path'] for p in report['recent']] == ['/api/client-ledger/Sol', '/api/client-ledger/lupita']
+
+
+def test_disabled_by_default(monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILING_ENABLED', False)
+    profiling.clear()
+    client = _client(monkeypatch)
+
+    response = client.get('/api/summary')
+    assert 'server-timing' not in response.headers
+    assert client.get('/api/debug/profile').json()['routes'] == {}
+
+
+def test_span_outside_a_request_is_a_noop():
+    profiling.clear()
+    with profiling.span('parse'):
+        pass
+    assert profiling.get_profile_report()['buffer']['size'] == 0
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,169 @@
+"""
+Pruebas de la lectura por rangos de Graph contra el servidor falso: mismos DataFrames que parsear el archivo
+Ejecutar: python -m pytest backend/test_range_fetch.py  (o python backend/test_range_fetch.py)
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import data_loader
+import graph_client
+from fake_graph_server import start_fake_graph
+from test_reader import HEADER, _read, _write_workbook
+
+USECOLS = ['ID', 'FECHA', 'CLIENTE ADMON', 'TOTAL VENTA', 'NOTA']
+
+
+def _server(monkeypatch, tmp_path):
+    path = tmp_path / 'ventas.xlsx'
+    _write_workbook(path)
+    server, _ = start_fake_graph({'ventas-id': path})
+    # El servidor falso no valida el token: evitar MSAL (y la red) en la prueba
+    monkeypatch.setattr(graph_client, 'get_access_token', lambda: 'fake-token')
+    monkeypatch.setattr(graph_client, 'GRAPH_BASE_URL', server.base_url)
+    graph_client.clear_cache()
+    return server, path
+
+
+def _fetch(usecols=None, stop_at=None) -> pd.DataFrame:
+    rows = graph_client.read_sheet_values('ventas-id', 'VENTAS', HEADER, usecols)
+    return data_loader.frame_from_rows(rows, 'VENTAS', HEADER, usecols, stop_at)
+
+
+def test_range_fetch_matches_parsing_the_file(monkeypatch, tmp_path):
+    server, path = _server(monkeypatch, tmp_path)
+    # Bloques de 3 filas: la hoja se pide en varias partes
+    monkeypatch.setattr(graph_client, 'GRAPH_RANGE_ROWS', 3)
+    try:
+        pd.testing.assert_frame_equal(_fetch(), _read(path))
+        pd.testing.assert_frame_equal(_fetch(USECOLS), _read(path, usecols=USECOLS))
+        pd.testing.assert_frame_equal(_fetch(USECOLS, 'ID'), _read(path, usecols=USECOLS, stop_at='ID'))
+        assert _fetch(USECOLS)['FECHA'].iloc[0] == pd.Timestamp('2026-01-05')
+        assert server.requests[('content', 'ventas-id')] == 0
+    finally:
+        server.shutdown()
+
+
+def test_range_fetch_requests_only_the_wanted_columns(monkeypatch, tmp_path):
+    server, _ = _server(monkeypatch, tmp_path)
+    try:
+        # ID..CLIENTE ADMON y TOTAL VENTA: dos tramos de columnas, más rango usado, encabezado y última fila
+        _fetch(['ID', 'FECHA', 'CLIENTE ADMON', 'TOTAL VENTA'])
+        assert server.requests[('used_range', 'ventas-id')] == 1
+        assert server.requests[('range', 'ventas-id')] == 4
+    finally:
+        server.shutdown()
+
+
+def test_range_fetch_rejects_a_missing_column(monkeypatch, tmp_path):
+    server, _ = _server(monkeypatch, tmp_path)
+    try:
+        # Columna renombrada en el Excel: error claro, no una columna que falta más adelante
+        with pytest.raises(ValueError, match='TOTAL NETO'):
+            graph_client.read_sheet_values('ventas-id', 'VENTAS', HEADER, ['ID', 'TOTAL NETO'])
+    finally:
+        server.shutdown()
+
+
+def test_range_fetch_reuses_one_connection(monkeypatch, tmp_path):
+    server, _ = _server(monkeypatch, tmp_path)
+    monkeypatch.setattr(graph_client, 'GRAPH_RANGE_ROWS', 3)
+    try:
+        _fetch(USECOLS)
+        _fetch()
+        # Todas las peticiones (de ambas lecturas) por la conexión keep-alive del cliente compartido
+        assert server.requests[('range', 'ventas-id')] > 2
+        assert server.connections == 1
+    finally:
+        server.shutdown()
+
+
+def test_range_fetch_retries_once_with_a_new_token(monkeypatch, tmp_path):
+    server, path = _server(monkeypatch, tmp_path)
+    tokens = []
+    monkeypatch.setattr(graph_client, 'get_access_token', lambda: tokens.append(1) or f'token-{len(tokens)}')
+    invalidated = []
+    monkeypatch.setattr(graph_client._token_manager, 'invalidate', lambda: invalidated.append(1))
+    server.workbook_errors = [401]
+    try:
+        pd.testing.assert_frame_equal(_fetch(USECOLS), _read(path, usecols=USECOLS))
+        assert (len(tokens), len(invalidated)) == (2, 1)
+    finally:
+        server.shutdown()
+
+
+def _onedrive_loader(monkeypatch, tmp_path, spec):
+    # data_loader importa el cliente de Graph solo si arranca en modo OneDrive
+    for name in ('read_sheet_values', 'get_item_version', 'download_excel_file', 'get_file_hash', 'GraphAPIError'):
+        monkeypatch.setattr(data_loader, name, getattr(graph_client, name), raising=False)
+    monkeypatch.setattr(data_loader, 'EXCEL_VENTAS_ITEM_ID', 'ventas-id', raising=False)
+    monkeypatch.setattr(data_loader, 'USE_ONEDRIVE', True)
+    monkeypatch.setattr(data_loader, 'SHEET_SPECS', {'ventas': {'VENTAS': spec}})
+    monkeypatch.setattr(data_loader, 'GRAPH_RANGE_SHEETS', {'VENTAS'})
+    # El sheet_store que usa data_loader (backend.sheet_store si se corre desde la raíz)
+    monkeypatch.setattr(data_loader.sheet_store, 'SHEET_CACHE_ENABLED', False)
+    monkeypatch.setattr(data_loader.sheet_store, 'SHEET_CACHE_DIR', tmp_path / '.sheet_cache')
+    data_loader.clear_cache()
+
+
+def test_range_only_workbook_skips_the_download(monkeypatch, tmp_path):
+    server, path = _server(monkeypatch, tmp_path)
+    _onedrive_loader(monkeypatch, tmp_path, {'header': HEADER, 'usecols': USECOLS, 'stop_at': 'ID'})
+    try:
+        sheets = data_loader.load_workbook_sheets('ventas')
+        assert data_loader.load_workbook_sheets('ventas') is sheets
+
+        pd.testing.assert_frame_equal(sheets['VENTAS'], _read(path, usecols=USECOLS, stop_at='ID'))
+        assert server.requests[('content', 'ventas-id')] == 0
+        assert server.requests[('info', 'ventas-id')] == 1
+        stats = data_loader.get_cache_stats()
+        assert (stats['range_fetches'], stats['sheet_parses'], stats['hits']) == (1, 0, 1)
+    finally:
+        data_loader.clear_cache()
+        server.shutdown()
+
+
+def test_failed_range_fetch_falls_back_to_the_last_good_workbook(monkeypatch, tmp_path):
+    server, path = _server(monkeypatch, tmp_path)
+    _onedrive_loader(monkeypatch, tmp_path, {'header': HEADER, 'usecols': USECOLS})
+    try:
+        sheets = data_loader.load_workbook_sheets('ventas')
+
+        # Versión nueva en OneDrive, pero Graph falla al leer sus rangos
+        book = load_workbook(path)
+        book['VENTAS'].cell(row=HEADER + 2, column=4, value=11.0)
+        book.save(path)
+        graph_client.clear_cache()
+        server.workbook_errors = [503]
+        assert data_loader.load_workbook_sheets('ventas') is sheets
+        # Mientras dura la espera, ni siquiera se consulta Graph
+        info = server.requests[('info', 'ventas-id')]
+        assert data_loader.load_workbook_sheets('ventas') is sheets
+        assert server.requests[('info', 'ventas-id')] == info
+        assert data_loader.get_cache_stats()['fallbacks'] == 2
+    finally:
+        data_loader.clear_cache()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
+
+
+def test_file_info_and_download_reuse_the_range_connection(monkeypatch, tmp_path):
+    server, path = _server(monkeypatch, tmp_path)
+    try:
+        _fetch(USECOLS)
+        assert graph_client.get_file_info('ventas-id')['id'] == 'ventas-id'
+        assert graph_client.download_excel_file('ventas-id', cache_minutes=0) == path.read_bytes()
+        # Metadatos y descarga síncrona usan el mismo cliente compartido que la lectura por rangos
+        assert server.requests[('content', 'ventas-id')] == 1
+        assert server.connections == 1
+    finally:
+        server.shutdown()
@@ -0,0 +1,111 @@
+"""
+Pruebas del lector streaming: mismos DataFrames que pd.read_excel
+Ejecutar: python -m pytest backend/test_reader.py  (o python backend/test_reader.py)
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import data_loader
+from data_loader import read_sheet_streaming
+
+HEADER = 3
+COLUMNS = ['ID', 'FECHA', 'CLIENTE ADMON', 'KG NETOS', 'SIN USO', 'TOTAL VENTA', 'NOTA', 'KG NETOS']
+
+
+def _write_workbook(path: Path):
+    """Libro con las rarezas de los Excel reales: títulos, huecos, errores y filas plantilla"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'VENTAS'
+    ws['A1'] = 'CONTROL DE VENTAS'
+    ws['K2'] = 'título más ancho que el encabezado'
+    for col, name in enumerate(COLUMNS, start=1):
+        ws.cell(row=HEADER + 1, column=col, value=name)
+    rows = [
+        ['VC-1', datetime(2026, 1, 5), 'ABARROTES', 10.0, 'x', 250.5, None, 1],
+        ['VC-2', datetime(2026, 1, 6), 'LA ESQUINA', 3.25, None, '#N/A', 'ANULADO', 2],
+        [None, None, None, None, None, None, None, None],
+        ['VC-3', '2026-01-07', None, 7, 'y', 100, 'revisar', None],
+    ]
+    for offset, values in enumerate(rows):
+        for col, value in enumerate(values, start=1):
+            if value is not None:
+                ws.cell(row=HEADER + 2 + offset, column=col, value=value)
+    # Filas plantilla: totales en cero sin ID
+    for row in range(HEADER + 2 + len(rows), HEADER + 2 + len(rows) + 5):
+        ws.cell(row=row, column=6, value=0)
+    wb.save(path)
+
+
+def _read(path: Path, **kwargs) -> pd.DataFrame:
+    workbook = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        return read_sheet_streaming(workbook, 'VENTAS', HEADER, **kwargs)
+    finally:
+        workbook.close()
+
+
+def test_streaming_matches_read_excel_with_usecols(tmp_path):
+    path = tmp_path / 'ventas.xlsx'
+    _write_workbook(path)
+    usecols = ['ID', 'FECHA', 'CLIENTE ADMON', 'KG NETOS', 'TOTAL VENTA', 'NOTA']
+
+    expected = pd.read_excel(path, sheet_name='VENTAS', header=HEADER, usecols=usecols)
+    pd.testing.assert_frame_equal(_read(path, usecols=usecols), expected)
+
+
+def test_streaming_matches_read_excel_without_usecols(tmp_path):
+    path = tmp_path / 'ventas.xlsx'
+    _write_workbook(path)
+
+    expected = pd.read_excel(path, sheet_name='VENTAS', header=HEADER)
+    pd.testing.assert_frame_equal(_read(path), expected)
+
+
+def test_stop_at_drops_template_rows_after_last_id(tmp_path):
+    path = tmp_path / 'ventas.xlsx'
+    _write_workbook(path)
+
+    full = _read(path, usecols=['ID', 'TOTAL VENTA'])
+    df = _read(path, usecols=['ID', 'TOTAL VENTA'], stop_at='ID')
+    assert len(full) == 9
+    assert len(df) == 4
+    assert df['ID'].iloc[-1] == 'VC-3'
+
+
+def test_pandas_reader_applies_stop_at(monkeypatch, tmp_path):
+    path = tmp_path / 'ventas.xlsx'
+    _write_workbook(path)
+    spec = {'header': HEADER, 'usecols': ['ID', 'CLIENTE ADMON', 'TOTAL VENTA'], 'stop_at': 'ID'}
+
+    monkeypatch.setattr(data_loader, 'EXCEL_READER', 'pandas')
+    sheets, _ = data_loader._parse_workbook_timed(path, {'VENTAS': spec})
+    expected = _read(path, usecols=spec['usecols'], stop_at='ID')
+    pd.testing.assert_frame_equal(sheets['VENTAS'], expected)
+
+
+def test_registered_sheets_with_stop_at_come_from_the_parsed_workbook():
+    spec = data_loader.SHEET_SPECS['ventas']['VENTAS AL CONTADO']
+    options = {key: value for key, value in spec.items() if key != 'header'}
+
+    assert data_loader._is_registered('ventas', 'VENTAS AL CONTADO', spec['header'], options)
+    assert not data_loader._is_registered('ventas', 'VENTAS AL CONTADO', spec['header'], {**options, 'stop_at': None})
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pytest
+    with tempfile.TemporaryDirectory() as tmp:
+        test_streaming_matches_read_excel_with_usecols(Path(tmp))
+        test_streaming_matches_read_excel_without_usecols(Path(tmp))
+        test_stop_at_drops_template_rows_after_last_id(Path(tmp))
+        test_pandas_reader_applies_stop_at(pytest.MonkeyPatch(), Path(tmp))
+    test_registered_sheets_with_stop_at_come_from_the_parsed_workbook()
+    print("OK")
@@ -0,0 +1,57 @@
+"""
+Pruebas de la serialización por columnas: mismos valores que recorrer filas con iterrows
+Ejecutar: python -m pytest backend/test_serialization.py  (o python backend/test_serialization.py)
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from serialization import floats, ints, strings, dates, records, json_response
+
+
+def test_columns_become_python_types_with_defaults():
+    df = pd.DataFrame({
+        'total': [1.5, np.nan, 3.0],
+        'n': [2, 0, 7],
+        'cliente': ['LUPITA', None, np.nan],
+        'fecha': [datetime(2026, 1, 10, 8, 30), pd.NaT, datetime(2026, 2, 1)],
+    })
+
+    assert floats(df['total']) == [1.5, 0.0, 3.0]
+    assert ints(df['n']) == [2, 0, 7]
+    assert strings(df['cliente'], 'Sin nombre') == ['LUPITA', 'Sin nombre', 'Sin nombre']
+    assert dates(df['fecha']) == ['2026-01-10', '', '2026-02-01']
+    assert all(type(v) is float for v in floats(df['total']))
+    assert all(type(v) is int for v in ints(df['n']))
+
+
+def test_categorical_labels_as_strings():
+    rango = pd.Series(pd.Categorical(['Micro', 'Grande'], categories=['Micro', 'Grande']))
+    assert strings(rango) == ['Micro', 'Grande']
+
+
+def test_records_zip_columns_like_iterrows():
+    df = pd.DataFrame({'tipo': ['CONTADO', 'CREDITO'], 'total': [10.0, np.nan], 'n_id': [1, 2]})
+    expected = [
+        {"tipo": row['tipo'], "total": float(row['total']) if pd.notna(row['total']) else 0, "cantidad": int(row['n_id'])}
+        for _, row in df.iterrows()
+    ]
+
+    assert records(tipo=df['tipo'].tolist(), total=floats(df['total']), cantidad=ints(df['n_id'])) == expected
+    assert records(tipo=[], total=[]) == []
+
+
+def test_json_response_renders_numpy_scalars():
+    response = json_response({"total": np.float64(2.5), "n": np.int64(3), "data": [{"x": 1}]})
+    assert response.body.replace(b' ', b'') == b'{"total":2.5,"n":3,"data":[{"x":1}]}'
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,145 @@
+"""
+Pruebas del reparseo por hoja: solo se vuelven a leer las hojas cuya parte del zip cambió
+Ejecutar: python -m pytest backend/test_sheet_parts.py  (o python backend/test_sheet_parts.py)
+"""
+
+import io
+import os
+import re
+import sys
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import data_loader
+from xlsx_parts import WorkbookParts
+
+SPECS = {
+    'VENTAS': {'header': 0, 'usecols': ['ID', 'CLIENTE', 'TOTAL']},
+    'PAGOS': {'header': 0, 'usecols': ['ID', 'CLIENTE', 'MONTO']},
+}
+
+
+def _share_strings(path: Path):
+    """Pasa los textos en línea de openpyxl a una tabla sharedStrings, como la guarda Excel"""
+    with zipfile.ZipFile(path) as zf:
+        parts = {info.filename: zf.read(info) for info in zf.infolist()}
+    strings = []
+
+    def shared(match):
+        text = match.group(2)
+        if text not in strings:
+            strings.append(text)
+        return f'{match.group(1)}t="s"><v>{strings.index(text)}</v></c>'
+
+    for name in sorted(n for n in parts if n.startswith('xl/worksheets/')):
+        parts[name] = re.sub(
+            r'(<c r="[A-Z]+[0-9]+" )t="inlineStr"><is><t>([^<]*)</t></is></c>', shared, parts[name].decode()
+        ).encode()
+    parts['xl/sharedStrings.xml'] = (
+        '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        f'uniqueCount="{len(strings)}">' + ''.join(f'<si><t>{text}</t></si>' for text in strings) + '</sst>'
+    ).encode()
+    parts['xl/_rels/workbook.xml.rels'] = parts['xl/_rels/workbook.xml.rels'].replace(b'</Relationships>', (
+        b'<Relationship Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" '
+        b'Target="sharedStrings.xml" Id="rId9" /></Relationships>'
+    ))
+    parts['[Content_Types].xml'] = parts['[Content_Types].xml'].replace(b'</Types>', (
+        b'<Override PartName="/xl/sharedStrings.xml" '
+        b'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml" /></Types>'
+    ))
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, data in parts.items():
+            zf.writestr(name, data)
+
+
+def _write(path: Path, ventas: list, pagos: list):
+    """Libro con dos hojas registradas y textos compartidos (en orden de aparición, como Excel)"""
+    wb = Workbook()
+    for ws, (columns, rows) in zip(
+        (wb.active, wb.create_sheet()),
+        ((['ID', 'CLIENTE', 'TOTAL'], ventas), (['ID', 'CLIENTE', 'MONTO'], pagos))
+    ):
+        ws.title = 'VENTAS' if columns[-1] == 'TOTAL' else 'PAGOS'
+        ws.append(columns)
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+    _share_strings(path)
+    # Misma versión local solo si no cambió el archivo: forzar un mtime distinto
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+VENTAS = [['V-1', 'Sol', 100.0], ['V-2', 'Lupita', 40.5]]
+PAGOS = [['P-1', 'Sol', 50.0]]
+
+
+def _loader(monkeypatch, tmp_path) -> Path:
+    path = tmp_path / 'ventas.xlsx'
+    monkeypatch.setattr(data_loader, 'USE_ONEDRIVE', False)
+    monkeypatch.setattr(data_loader, 'VENTAS_FILE', path)
+    monkeypatch.setattr(data_loader, 'SHEET_SPECS', {'ventas': SPECS})
+    # El sheet_store que usa data_loader (backend.sheet_store si se corre desde la raíz)
+    monkeypatch.setattr(data_loader.sheet_store, 'SHEET_CACHE_ENABLED', False)
+    monkeypatch.setattr(data_loader.sheet_store, 'SHEET_CACHE_DIR', tmp_path / '.sheet_cache')
+    data_loader.clear_cache()
+    return path
+
+
+def test_only_the_edited_sheet_is_reparsed(monkeypatch, tmp_path):
+    path = _loader(monkeypatch, tmp_path)
+    _write(path, VENTAS, PAGOS)
+    before = data_loader.load_workbook_sheets('ventas')
+
+    # Un abono nuevo con un cliente nuevo: el texto se agrega al final de sharedStrings
+    _write(path, VENTAS, PAGOS + [['P-2', 'La Esquina', 20.0]])
+    after = data_loader.load_workbook_sheets('ventas')
+
+    assert after['VENTAS'] is before['VENTAS']
+    pd.testing.assert_frame_equal(after['PAGOS'], data_loader._parse_workbook(path, SPECS)['PAGOS'])
+    assert list(after['PAGOS']['CLIENTE']) == ['Sol', 'La Esquina']
+    stats = data_loader.get_cache_stats()
+    assert (stats['sheet_parses'], stats['sheet_reuses']) == (3, 1)
+
+
+def test_replaced_shared_string_reparses_every_sheet(monkeypatch, tmp_path):
+    path = _loader(monkeypatch, tmp_path)
+    _write(path, VENTAS, PAGOS)
+    before = data_loader.load_workbook_sheets('ventas')
+
+    # Otro texto en el mismo índice: la parte de la hoja queda igual, pero no su contenido
+    _write(path, [VENTAS[0], ['V-2', 'Lupe', 40.5]], PAGOS)
+    parts = data_loader._workbook_parts['ventas'][0]
+    after = data_loader.load_workbook_sheets('ventas')
+
+    assert data_loader._workbook_parts['ventas'][0].sheets == parts.sheets
+    assert list(after['VENTAS']['CLIENTE']) == ['Sol', 'Lupe']
+    assert after['PAGOS'] is not before['PAGOS']
+    expected = data_loader._parse_workbook(path, SPECS)
+    for name in SPECS:
+        pd.testing.assert_frame_equal(after[name], expected[name])
+    assert data_loader.get_cache_stats()['sheet_reuses'] == 0
+
+
+def test_parts_of_an_in_memory_workbook(tmp_path):
+    path = tmp_path / 'ventas.xlsx'
+    _write(path, VENTAS, PAGOS)
+    source = io.BytesIO(path.read_bytes())
+
+    parts = WorkbookParts.read(source)
+
+    assert source.tell() == 0
+    assert sorted(parts.sheets) == ['PAGOS', 'VENTAS']
+    assert parts.sheets['VENTAS'][0] == 'xl/worksheets/sheet1.xml'
+    assert parts.changed_sheets(None, ['VENTAS']) == ['VENTAS']
+    assert WorkbookParts.read(source, parts).changed_sheets(parts, ['VENTAS', 'PAGOS']) == []
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
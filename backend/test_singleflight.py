@@ -0,0 +1,127 @@
+"""
+Pruebas de concurrencia: N peticiones simultáneas -> una sola descarga/parseo
+Ejecutar: python -m pytest backend/test_singleflight.py  (o python backend/test_singleflight.py)
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from singleflight import SingleFlight
+
+N_REQUESTS = 16
+
+
+def test_single_flight_runs_once_for_simultaneous_callers():
+    group = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(N_REQUESTS)
+
+    def slow_work():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'resultado'
+
+    def caller(_):
+        barrier.wait()
+        return group.do('llave', slow_work)
+
+    with ThreadPoolExecutor(max_workers=N_REQUESTS) as pool:
+        results = list(pool.map(caller, range(N_REQUESTS)))
+
+    assert len(calls) == 1
+    assert results == ['resultado'] * N_REQUESTS
+    assert group.stats == {'executed': 1, 'shared': N_REQUESTS - 1}
+    assert group.in_flight() == 0
+
+
+def test_single_flight_shares_errors_and_allows_retry():
+    group = SingleFlight()
+    barrier = threading.Barrier(4)
+
+    def failing():
+        time.sleep(0.1)
+        raise ValueError('falló')
+
+    def caller(_):
+        barrier.wait()
+        try:
+            group.do('llave', failing)
+        except ValueError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(caller, range(4))) == ['falló'] * 4
+
+    # Tras el error la llave queda libre para un nuevo intento
+    assert group.do('llave', lambda: 'ok') == 'ok'
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    group = SingleFlight()
+    calls = []
+
+    async def slow_work():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return 'resultado'
+
+    async def scenario():
+        leader = asyncio.create_task(group.do_async('llave', slow_work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(group.do_async('llave', slow_work))
+        await asyncio.sleep(0.01)
+        # El cliente de la primera petición se desconecta
+        leader.cancel()
+        result = await follower
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return result
+
+    assert asyncio.run(scenario()) == 'resultado'
+    assert len(calls) == 1
+    assert group.stats == {'executed': 1, 'shared': 1}
+    assert group.in_flight() == 0
+
+
+@pytest.fixture
+def fake_graph(monkeypatch, tmp_path):
+    import graph_client
+    from fake_graph_server import start_fake_graph
+
+    workbook = tmp_path / 'ventas.xlsx'
+    workbook.write_bytes(b'contenido del libro' * 1000)
+    server, _ = start_fake_graph({'ventas-id': workbook})
+    # El servidor falso no valida el token: evitar MSAL (y la red) en la prueba
+    monkeypatch.setattr(graph_client, 'get_access_token', lambda: 'fake-token')
+    monkeypatch.setattr(graph_client, 'GRAPH_BASE_URL', server.base_url)
+    graph_client.clear_cache()
+    yield graph_client, server, workbook
+    server.shutdown()
+
+
+def test_simultaneous_downloads_hit_graph_once(fake_graph):
+    graph_client, server, workbook = fake_graph
+    server.content_delay = 0.3
+    barrier = threading.Barrier(N_REQUESTS)
+
+    def caller(_):
+        barrier.wait()
+        return graph_client.download_excel_file('ventas-id')
+
+    with ThreadPoolExecutor(max_workers=N_REQUESTS) as pool:
+        results = list(pool.map(caller, range(N_REQUESTS)))
+
+    assert server.requests[('content', 'ventas-id')] == 1
+    assert all(r == workbook.read_bytes() for r in results)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
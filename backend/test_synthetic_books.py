@@ -0,0 +1,44 @@
+"""
+Pruebas del generador de libros sintéticos: el loader y el snapshot los leen como los reales
+Ejecutar: python -m pytest backend/test_synthetic_books.py  (o python backend/test_synthetic_books.py)
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT.parent / 'benchmarks'))
+
+import data_loader
+from snapshot import build_snapshot
+from synthetic_books import write_books
+
+
+def test_synthetic_books_match_registered_layouts(tmp_path):
+    counts = write_books(tmp_path, 2000)
+    paths = {'ventas': tmp_path / data_loader.VENTAS_FILE.name, 'almacen': tmp_path / data_loader.ALMACEN_FILE.name}
+    sheets = {
+        file_type: data_loader._parse_workbook(path, data_loader.SHEET_SPECS[file_type])
+        for file_type, path in paths.items()
+    }
+    contado = sheets['ventas']['VENTAS AL CONTADO']
+    credito = sheets['ventas']['VENTAS A CRÉDITO']
+
+    # stop_at recorta las filas plantilla al final de VENTAS AL CONTADO
+    assert len(contado) == counts['ventas']['VENTAS AL CONTADO']
+
+    snap = build_snapshot(sheets['ventas'], sheets['almacen'], 'sintetico')
+    assert len(snap.contado) == (contado['NOTA'] != 'ANULADO').sum()
+    # VENTAS A CRÉDITO no tiene stop_at: sus filas plantilla (sin ID ni cliente) se descartan al limpiar
+    assert len(snap.credito) == (credito['ID'].notna() & (credito['NOTA (SI APLICA)'] != 'ANULADO')).sum()
+    assert len(snap.egresos) == counts['ventas']['EGRESOS EN EFECTIVO']
+    assert len(snap.pagos) == counts['ventas']['PAGOS_GENERALES']
+    assert len(snap.compras) == counts['almacen']['COMPRAS (C)'] + counts['almacen']['COMPRAS (H)']
+    assert (snap.cajas['CONCEPTO'] == 'FIN DEL DÍA').sum() == 365
+    assert snap.stock_cebolla >= 0 and snap.stock_huevo >= 0
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,77 @@
+"""
+Pruebas del TokenManager: renovación de fondo sin bloquear, métricas e invalidación tras un 401
+Ejecutar: python -m pytest backend/test_token.py  (o python backend/test_token.py)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import graph_client
+from graph_client import TokenManager
+
+
+def _manager(monkeypatch, expires_in: int = 3600, delay: float = 0.0) -> TokenManager:
+    """TokenManager con un canje falso que tarda 'delay' segundos"""
+    issued = []
+
+    def acquire(app, save_cache):
+        time.sleep(delay)
+        issued.append(f'token-{len(issued) + 1}')
+        return issued[-1], expires_in
+
+    monkeypatch.setattr(graph_client, 'get_msal_app', lambda: (None, None))
+    monkeypatch.setattr(graph_client, '_acquire_token', acquire)
+    return TokenManager(refresh_margin=300)
+
+
+def test_token_is_reused_until_the_refresh_margin(monkeypatch):
+    manager = _manager(monkeypatch)
+
+    assert manager.get_token() == 'token-1'
+    assert manager.get_token() == 'token-1'
+    assert manager.stats['acquisitions'] == 1
+    assert manager.stats['cache_hits'] == 1
+
+
+def test_background_refresh_does_not_block_requests(monkeypatch):
+    # Vigencia dentro del margen: cada get_token() retorna el actual y renueva de fondo
+    manager = _manager(monkeypatch, expires_in=200, delay=0.5)
+    manager._token, manager._expires_at = 'token-0', time.monotonic() + 200
+
+    started = time.perf_counter()
+    assert manager.get_token() == 'token-0'
+    time.sleep(0.05)
+    # El canje de fondo tiene el lock principal: esta llamada no debe esperarlo
+    assert manager.get_token() == 'token-0'
+    assert time.perf_counter() - started < 0.3
+
+    deadline = time.monotonic() + 5
+    while manager.stats['background_refreshes'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert manager.stats['background_refreshes'] == 1
+    assert manager.stats['acquisitions'] == 1
+    assert manager._token == 'token-1'
+
+
+def test_unauthorized_response_invalidates_the_token(monkeypatch):
+    manager = _manager(monkeypatch)
+    monkeypatch.setattr(graph_client, '_token_manager', manager)
+    assert manager.get_token() == 'token-1'
+
+    request = httpx.Request('GET', 'https://graph.example/me')
+    graph_client._check_unauthorized(
+        httpx.HTTPStatusError('401', request=request, response=httpx.Response(401, request=request))
+    )
+
+    assert manager.get_token() == 'token-2'
+    assert manager.stats['acquisitions'] == 2
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
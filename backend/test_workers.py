@@ -0,0 +1,80 @@
+"""
+Pruebas del trabajo bloqueante fuera del event loop
+Ejecutar: python -m pytest backend/test_workers.py  (o python backend/test_workers.py)
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import main
+import workers
+from test_dashboard import _snapshot
+
+
+def _slow_summary(view):
+    time.sleep(0.3)
+    return {"ok": True}
+
+
+def test_slow_panel_keeps_the_loop_responsive(monkeypatch):
+    snap = _snapshot()
+
+    async def fake_snapshot():
+        return snap
+
+    monkeypatch.setattr(main, 'get_snapshot_async', fake_snapshot)
+    monkeypatch.setattr(main.panels, 'summary', _slow_summary)
+
+    async def scenario():
+        workers.install_thread_pool()
+        probe = workers.LoopLagProbe(interval=0.01)
+        task = asyncio.create_task(probe.run())
+        # Dos peticiones lentas a la vez: corren en paralelo en el pool de hilos
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            main.get_summary(Request({'type': 'http'}), start_date=None, end_date=None),
+            main.get_summary(Request({'type': 'http'}), start_date=None, end_date=None)
+        )
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        return responses, elapsed, probe.stats()
+
+    try:
+        responses, elapsed, lag = asyncio.run(scenario())
+    finally:
+        workers.shutdown()
+
+    assert all(r.body.replace(b' ', b'') == b'{"ok":true}' for r in responses)
+    assert elapsed < 0.55
+    assert lag['samples'] > 10
+    assert lag['max_ms'] < 100
+
+
+def test_parse_in_process_pool(monkeypatch):
+    monkeypatch.setattr(workers, 'PARSE_PROCESSES', 1)
+    try:
+        assert workers.run_parse(sum, [1, 2, 3]) == 6
+        assert workers.get_worker_stats()['process_parses'] >= 1
+    finally:
+        workers.shutdown()
+
+
+def test_health_reports_workers():
+    # Con el lifespan activo: pool instalado y sonda del loop corriendo
+    with TestClient(main.app) as client:
+        stats = client.get('/api/health').json()['workers']
+
+    assert stats['blocking_threads'] == workers.BLOCKING_THREADS
+    assert 'loop_lag' in stats
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
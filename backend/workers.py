@@ -0,0 +1,108 @@
+"""
+Workers - Trabajo bloqueante fuera del event loop
+Las cargas, parseos y agregaciones de pandas corren en un pool de hilos acotado
+(el ejecutor por defecto del loop, así asyncio.to_thread lo usa también); los
+parseos de Excel pueden ir además a un pool de procesos para no competir por el GIL.
+Una sonda mide el retraso del event loop para comprobar que sigue respondiendo.
+"""
+
+import os
+import asyncio
+import statistics
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+# Tamaños de los pools (configurables por variables de entorno)
+BLOCKING_THREADS = int(os.getenv('BLOCKING_THREADS', '8'))
+# 0 = parsear en el hilo que carga el libro (sin pool de procesos)
+PARSE_PROCESSES = int(os.getenv('PARSE_PROCESSES', '0'))
+LOOP_LAG_INTERVAL_SECONDS = float(os.getenv('LOOP_LAG_INTERVAL_SECONDS', '0.5'))
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_worker_stats = {'process_parses': 0, 'inline_parses': 0}
+
+
+def install_thread_pool(loop: Optional[asyncio.AbstractEventLoop] = None) -> ThreadPoolExecutor:
+    """Usa un pool de BLOCKING_THREADS hilos como ejecutor por defecto del loop"""
+    global _thread_pool
+    loop = loop or asyncio.get_running_loop()
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=BLOCKING_THREADS, thread_name_prefix='blocking')
+    loop.set_default_executor(_thread_pool)
+    return _thread_pool
+
+
+def run_parse(fn: Callable[..., Any], *args) -> Any:
+    """
+    Ejecuta un parseo intensivo en CPU: en el pool de procesos si PARSE_PROCESSES > 0
+
+    Se llama desde un hilo del pool (bloquea ese hilo, no el event loop).
+    fn y sus argumentos deben poder serializarse con pickle.
+    """
+    global _process_pool
+    if PARSE_PROCESSES <= 0:
+        _worker_stats['inline_parses'] += 1
+        return fn(*args)
+
+    if _process_pool is None:
+        # spawn: el proceso hijo no hereda hilos ni locks a medio usar del servidor
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PARSE_PROCESSES, mp_context=multiprocessing.get_context('spawn')
+        )
+    _worker_stats['process_parses'] += 1
+    return _process_pool.submit(fn, *args).result()
+
+
+def shutdown():
+    """Cierra los pools (al apagar la aplicación)"""
+    global _thread_pool, _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+        _thread_pool = None
+
+
+class LoopLagProbe:
+    """Mide cuánto tarde despierta el event loop respecto a un sleep programado"""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL_SECONDS, window: int = 240):
+        self.interval = interval
+        self.samples = deque(maxlen=window)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(loop.time() - start - self.interval, 0.0))
+
+    def stats(self) -> dict:
+        """Retraso del loop en ms: último, p99 y máximo de la ventana reciente"""
+        if not self.samples:
+            return {"samples": 0, "last_ms": None, "p99_ms": None, "max_ms": None}
+        lags = sorted(self.samples)
+        p99 = statistics.quantiles(lags, n=100)[98] if len(lags) > 1 else lags[0]
+        return {
+            "samples": len(lags),
+            "last_ms": round(self.samples[-1] * 1000, 2),
+            "p99_ms": round(p99 * 1000, 2),
+            "max_ms": round(lags[-1] * 1000, 2)
+        }
+
+
+loop_lag = LoopLagProbe()
+
+
+def get_worker_stats() -> dict:
+    """Tamaños de los pools, parseos por destino y retraso del event loop"""
+    return {
+        "blocking_threads": BLOCKING_THREADS,
+        "parse_processes": PARSE_PROCESSES,
+        **_worker_stats,
+        "loop_lag": loop_lag.stats()
+    }
@@ -0,0 +1,160 @@
+"""
+Xlsx Parts - Huellas por hoja de un libro .xlsx a partir de su zip
+Un .xlsx es un zip con una parte XML por hoja. El directorio central del zip ya
+trae el CRC-32 y el tamaño de cada parte, así que saber qué hojas cambiaron entre
+dos versiones del libro no requiere descomprimir ni parsear las hojas.
+
+Una hoja se considera sin cambios si su parte es la misma y además no cambió nada
+de lo que sus celdas referencian fuera de ella:
+- sharedStrings.xml: los textos se guardan como índices a esta tabla; si solo se
+  agregaron textos al final, los índices anteriores siguen significando lo mismo.
+- styles.xml: el formato numérico decide si un número se lee como fecha.
+"""
+
+import hashlib
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+WORKBOOK_PART = 'xl/workbook.xml'
+WORKBOOK_RELS = 'xl/_rels/workbook.xml.rels'
+STRINGS_PART = 'xl/sharedStrings.xml'
+STYLES_PART = 'xl/styles.xml'
+
+
+def _part_digest(info: Optional[zipfile.ZipInfo]) -> Optional[Tuple[int, int]]:
+    """(CRC-32, tamaño sin comprimir) de una parte según el directorio central"""
+    if info is None:
+        return None
+    return (info.CRC, info.file_size)
+
+
+def _sheet_paths(zf: zipfile.ZipFile) -> Tuple[Dict[str, str], bool]:
+    """{nombre de hoja: ruta de su parte en el zip} y si el libro usa fechas de 1904"""
+    workbook = ET.fromstring(zf.read(WORKBOOK_PART))
+    rels = ET.fromstring(zf.read(WORKBOOK_RELS))
+    targets = {}
+    for rel in rels.iter(f'{_PKG_REL_NS}Relationship'):
+        target = rel.get('Target', '')
+        # Rutas relativas a xl/ o absolutas dentro del paquete
+        targets[rel.get('Id')] = target.lstrip('/') if target.startswith('/') else posixpath.normpath(
+            posixpath.join('xl', target)
+        )
+
+    paths = {}
+    for sheet in workbook.iter(f'{_MAIN_NS}sheet'):
+        path = targets.get(sheet.get(f'{_REL_NS}id'))
+        if path:
+            paths[sheet.get('name')] = path
+    pr = workbook.find(f'{_MAIN_NS}workbookPr')
+    date1904 = pr is not None and pr.get('date1904', '').lower() in ('1', 'true')
+    return paths, date1904
+
+
+class SharedStrings:
+    """Huella de la tabla de textos compartidos: cantidad de textos y hash de todos ellos"""
+
+    def __init__(self, digest: Optional[Tuple[int, int]], count: int, items_hash: Optional[str]):
+        self.digest = digest
+        self.count = count
+        self.items_hash = items_hash
+
+    @staticmethod
+    def _items(data: bytes) -> Optional[List[bytes]]:
+        # Cada texto es un <si>...</si>; el encabezado (con los conteos) no cuenta
+        start = data.find(b'<si>')
+        if start < 0:
+            return None if b'<si' in data or b':si' in data else []
+        end = data.rfind(b'</sst>')
+        return data[start:end if end >= 0 else len(data)].split(b'<si>')[1:]
+
+    @staticmethod
+    def _hash(items: List[bytes]) -> str:
+        return hashlib.sha1(b'<si>'.join(items)).hexdigest()
+
+    @classmethod
+    def read(cls, zf: zipfile.ZipFile, previous: Optional['SharedStrings'] = None) -> Tuple['SharedStrings', bool]:
+        """
+        Lee la huella de sharedStrings.xml
+
+        Returns:
+            (huella, True si los índices de 'previous' siguen significando lo mismo)
+        """
+        try:
+            info = zf.getinfo(STRINGS_PART)
+        except KeyError:
+            info = None
+        digest = _part_digest(info)
+        if previous is not None and digest == previous.digest:
+            return previous, True
+        if info is None:
+            strings = cls(None, 0, cls._hash([]))
+            return strings, previous is not None and previous.count == 0
+
+        items = cls._items(zf.read(info))
+        if items is None:
+            # Formato no reconocido (p.ej. prefijos de namespace): sin comparación posible
+            return cls(digest, 0, None), False
+        strings = cls(digest, len(items), cls._hash(items))
+        if previous is None or previous.items_hash is None or len(items) < previous.count:
+            return strings, False
+        # Solo se agregaron textos al final: los primeros 'previous.count' son los mismos
+        same_prefix = previous.items_hash == (
+            strings.items_hash if len(items) == previous.count else cls._hash(items[:previous.count])
+        )
+        return strings, same_prefix
+
+
+class WorkbookParts:
+    """Huellas de las hojas de una versión de un libro .xlsx"""
+
+    def __init__(self, sheets: Dict[str, tuple], common: tuple, strings: SharedStrings, strings_stable: bool):
+        # Hoja -> (ruta de la parte, CRC-32, tamaño)
+        self.sheets = sheets
+        # Lo que afecta a todas las hojas salvo los textos: estilos y sistema de fechas
+        self.common = common
+        self.strings = strings
+        # Los índices de textos de la versión anterior siguen valiendo en esta
+        self.strings_stable = strings_stable
+
+    @classmethod
+    def read(cls, source, previous: Optional['WorkbookParts'] = None) -> 'WorkbookParts':
+        """
+        Lee las huellas de un libro (ruta o archivo en memoria)
+
+        Solo se leen el directorio central, workbook.xml con sus relaciones y, si
+        cambió, sharedStrings.xml. Un BytesIO queda listo para volver a leerse.
+        """
+        position = source.tell() if hasattr(source, 'tell') else None
+        try:
+            with zipfile.ZipFile(source) as zf:
+                paths, date1904 = _sheet_paths(zf)
+                sheets = {}
+                for name, path in paths.items():
+                    try:
+                        sheets[name] = (path,) + _part_digest(zf.getinfo(path))
+                    except KeyError:
+                        continue
+                try:
+                    styles = _part_digest(zf.getinfo(STYLES_PART))
+                except KeyError:
+                    styles = None
+                strings, stable = SharedStrings.read(zf, previous.strings if previous is not None else None)
+        finally:
+            if position is not None:
+                source.seek(position)
+        return cls(sheets, (styles, date1904), strings, stable)
+
+    def changed_sheets(self, previous: Optional['WorkbookParts'], names: List[str]) -> List[str]:
+        """Hojas de 'names' que pueden leerse distinto que en 'previous' (todas si no hay forma de saberlo)"""
+        if previous is None or not self.strings_stable or self.common != previous.common:
+            return list(names)
+        return [
+            name for name in names
+            if name not in self.sheets or self.sheets[name] != previous.sheets.get(name)
+        ]
@@ -0,0 +1,214 @@
+"""
+Benchmark de loaders y endpoints /api/* sobre libros sintéticos de varios tamaños
+Por tamaño: genera (o reutiliza) los libros con synthetic_books, mide el parseo de
+cada libro, cada loader, la construcción del snapshot y cada endpoint GET de /api/*
+(primera llamada en frío y mediana en caliente, sin y con rango de fechas), y escribe
+un reporte JSON con llaves estables para comparar corridas.
+
+Ejecutar:
+    python benchmarks/bench_endpoints.py --sizes 10000 100000 1000000 --report antes.json
+    python benchmarks/bench_endpoints.py --sizes 10000 100000 --report despues.json --compare antes.json
+"""
+
+import os
+import sys
+import json
+import time
+import zipfile
+import platform
+import argparse
+import statistics
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault('USE_ONEDRIVE', 'false')
+os.environ.setdefault('SHEET_CACHE_ENABLED', 'false')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import data_loader
+import snapshot
+import main
+from synthetic_books import write_books
+from xlsx_parts import WorkbookParts
+
+RANGE = {'start_date': '2026-03-01', 'end_date': '2026-05-31'}
+LOADERS = [
+    'load_ventas_contado', 'load_ventas_credito', 'load_egresos', 'load_cajas', 'load_pagos_generales',
+    'load_compras_cebolla', 'load_compras_huevo', 'load_stock_almacen_cebolla', 'load_stock_almacen_huevo',
+]
+
+
+def timed(fn, repeat: int) -> dict:
+    """Primera ejecución (fría) y mediana de las siguientes 'repeat' (calientes), en ms"""
+    t0 = time.perf_counter()
+    fn()
+    cold = (time.perf_counter() - t0) * 1000
+    warm = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        warm.append((time.perf_counter() - t0) * 1000)
+    return {"cold_ms": round(cold, 3), "warm_ms": round(statistics.median(warm), 3) if warm else None}
+
+
+def use_books(folder: Path):
+    """Apunta data_loader a los libros de 'folder' y descarta todo lo cargado antes"""
+    data_loader.VENTAS_FILE = folder / data_loader.VENTAS_FILE.name
+    data_loader.ALMACEN_FILE = folder / data_loader.ALMACEN_FILE.name
+    data_loader.clear_cache()
+    snapshot._snapshot = None
+
+
+def api_routes(client: TestClient) -> list:
+    """Rutas GET de /api/* (las de parámetro de ruta con un valor real del snapshot)"""
+    clients = client.get('/api/clients').json()
+    routes = []
+    for route in main.app.routes:
+        path = getattr(route, 'path', '')
+        if not path.startswith('/api/') or 'GET' not in getattr(route, 'methods', ()):
+            continue
+        if '{cliente}' in path:
+            if not clients:
+                continue
+            path = path.replace('{cliente}', clients[0]['cliente'])
+        routes.append(path)
+    return routes
+
+
+def bench_loaders(repeat: int) -> dict:
+    results = {}
+    for file_type in ('ventas', 'almacen'):
+        path = data_loader._local_path(file_type)
+        results[f'parse:{file_type}'] = timed(
+            lambda: data_loader._parse_workbook(path, data_loader.SHEET_SPECS[file_type]), 0
+        )
+    # Los loaders salen del libro ya parseado (la primera llamada paga el parseo)
+    for name in LOADERS:
+        results[name] = timed(getattr(data_loader, name), repeat)
+
+    ventas = data_loader.load_workbook_sheets('ventas')
+    almacen = data_loader.load_workbook_sheets('almacen')
+    results['build_snapshot'] = timed(lambda: snapshot.build_snapshot(ventas, almacen, 'bench'), 0)
+
+    # Ingesta por delta: la misma versión más una venta agregada al final
+    base = snapshot.build_snapshot(ventas, almacen, 'bench')
+    contado = ventas['VENTAS AL CONTADO']
+    edited = {**ventas, 'VENTAS AL CONTADO': pd.concat(
+        [contado, contado.tail(1).assign(ID='VC-BENCH')], ignore_index=True
+    )}
+    results['build_snapshot:delta'] = timed(
+        lambda: snapshot.build_snapshot(edited, almacen, 'bench-delta', base), 0
+    )
+    return results
+
+
+def edit_sheet(path: Path, out: Path, sheet_name: str):
+    """Copia el libro cambiando un valor numérico de una sola hoja (las demás partes quedan iguales)"""
+    part = WorkbookParts.read(path).sheets[sheet_name][0]
+    with zipfile.ZipFile(path) as src, zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            if info.filename == part:
+                data = data.replace(b'</v>', b'1</v>', 1)
+            dst.writestr(info, data)
+
+
+def bench_partial_reparse() -> dict:
+    """Libro de ventas parseado completo contra reparseo de una sola hoja cambiada"""
+    path = data_loader._local_path('ventas')
+    edited = path.with_name('editado-' + path.name)
+    edit_sheet(path, edited, 'CAJAS')
+
+    def load(source: Path):
+        data_loader.VENTAS_FILE = source
+        return data_loader.load_workbook_sheets('ventas')
+
+    results = {}
+    data_loader.clear_cache()
+    results['load_workbook:full'] = timed(lambda: load(path), 0)
+    results['load_workbook:one_sheet_changed'] = timed(lambda: load(edited), 0)
+    data_loader.VENTAS_FILE = path
+    data_loader.clear_cache()
+    edited.unlink()
+    return results
+
+
+def bench_endpoints(repeat: int) -> dict:
+    results = {}
+    with TestClient(main.app) as client:
+        client.get('/api/health')
+        for path in api_routes(client):
+            for label, params in (('all', {}), ('range', RANGE)):
+                def call():
+                    response = client.get(path, params=params)
+                    assert response.status_code == 200, f"{path}: {response.status_code}"
+                    return response
+                stats = timed(call, repeat)
+                stats['bytes'] = len(call().content)
+                results[f'{path}?{label}'] = stats
+    return results
+
+
+def bench_size(rows: int, books_dir: Path, repeat: int) -> dict:
+    folder = books_dir / f'rows-{rows}'
+    if not (folder / data_loader.VENTAS_FILE.name).exists():
+        print(f"Generando libros de {rows} filas en {folder} ...")
+        write_books(folder, rows)
+    use_books(folder)
+
+    loaders = bench_loaders(repeat)
+    loaders.update(bench_partial_reparse())
+    snap = snapshot.get_snapshot()
+    use_books(folder)
+    endpoints = bench_endpoints(repeat)
+    return {
+        "rows": {name: len(getattr(snap, name)) for name in ('ventas', 'compras', 'egresos', 'cajas', 'pagos')},
+        "loaders": loaders,
+        "endpoints": endpoints
+    }
+
+
+def print_report(size: str, result: dict, previous: dict = None):
+    print(f"\n== {size} filas: {result['rows']}")
+    for section in ('loaders', 'endpoints'):
+        for name, stats in result[section].items():
+            line = f"{name:<48}{stats['cold_ms']:>11.1f}{(stats['warm_ms'] or 0):>11.2f}"
+            old = (previous or {}).get(section, {}).get(name)
+            if old and old.get('warm_ms') and stats['warm_ms']:
+                line += f"   x{old['warm_ms'] / stats['warm_ms']:.2f} vs anterior"
+            print(line)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--books-dir', type=Path, default=Path(__file__).resolve().parent / '.books',
+                        help="Carpeta donde se generan (y reutilizan) los libros sintéticos")
+    parser.add_argument('--repeat', type=int, default=5, help="Llamadas en caliente por medición (mediana)")
+    parser.add_argument('--report', type=Path, default=Path('bench_endpoints.json'))
+    parser.add_argument('--compare', type=Path, help="Reporte anterior para mostrar la aceleración")
+    args = parser.parse_args()
+
+    previous = json.loads(args.compare.read_text()) if args.compare else {"sizes": {}}
+    report = {
+        "generated_at": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "excel_reader": data_loader.EXCEL_READER,
+        "sizes": {}
+    }
+    for rows in args.sizes:
+        result = bench_size(rows, args.books_dir, args.repeat)
+        report["sizes"][str(rows)] = result
+        print_report(str(rows), result, previous["sizes"].get(str(rows)))
+
+    args.report.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\nReporte: {args.report}")
+
+
+if __name__ == "__main__":
+    main_cli()
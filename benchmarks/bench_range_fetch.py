@@ -0,0 +1,101 @@
+"""
+Benchmark de lectura por rangos de Graph vs descarga completa del libro
+Contra el servidor falso de Graph y los libros sintéticos: por cada hoja, compara
+descargar el archivo y parsear la hoja contra pedir solo sus valores por rangos
+(tiempo y bytes transferidos), y verifica que ambos den el mismo DataFrame.
+
+Ejecutar:
+    python benchmarks/bench_range_fetch.py --rows 10000
+    python benchmarks/bench_range_fetch.py --rows 100000 --sheets "CONTROL DE ALMACÉN (C)" "CAJAS"
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault('USE_ONEDRIVE', 'false')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import pandas as pd
+
+import data_loader
+import graph_client
+import metrics
+from fake_graph_server import start_fake_graph
+from synthetic_books import write_books
+
+DEFAULT_SHEETS = ['CONTROL DE ALMACÉN (C)', 'CONTROL DE ALMACÉN (H)', 'CAJAS', 'VENTAS AL CONTADO']
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def bench_sheet(file_type: str, sheet_name: str) -> dict:
+    spec = data_loader.SHEET_SPECS[file_type][sheet_name]
+
+    graph_client.clear_cache()
+    started = time.perf_counter()
+    content = graph_client.download_excel_file(file_type)
+    download_ms = _elapsed_ms(started)
+    full = data_loader._parse_workbook(io.BytesIO(content), {sheet_name: spec})[sheet_name]
+    full_ms = _elapsed_ms(started)
+
+    received = metrics.graph_download_bytes.sum(mode='range')
+    started = time.perf_counter()
+    rows = graph_client.read_sheet_values(file_type, sheet_name, spec['header'], spec.get('usecols'))
+    ranged = data_loader.frame_from_rows(rows, sheet_name, spec['header'], spec.get('usecols'), spec.get('stop_at'))
+    range_ms = _elapsed_ms(started)
+
+    pd.testing.assert_frame_equal(ranged, full)
+    return {
+        "download_ms": download_ms,
+        "full_ms": full_ms,
+        "full_bytes": len(content),
+        "range_ms": range_ms,
+        "range_bytes": int(metrics.graph_download_bytes.sum(mode='range') - received),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000, help='Filas de movimientos de los libros sintéticos')
+    parser.add_argument('--sheets', nargs='+', default=DEFAULT_SHEETS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        write_books(folder, args.rows)
+        files = {
+            'ventas': folder / data_loader.VENTAS_FILE.name,
+            'almacen': folder / data_loader.ALMACEN_FILE.name,
+        }
+        server, _ = start_fake_graph(files)
+        # El servidor falso no valida el token
+        graph_client.get_access_token = lambda: 'fake-token'
+        graph_client.GRAPH_BASE_URL = server.base_url
+        try:
+            books = {
+                sheet_name: next(ft for ft, specs in data_loader.SHEET_SPECS.items() if sheet_name in specs)
+                for sheet_name in args.sheets
+            }
+            # El servidor falso abre cada libro con openpyxl en su primera petición por rangos
+            for file_type in set(books.values()):
+                server.workbook(files[file_type])
+
+            print(f"{'Hoja':<26}{'descarga+parseo':>18}{'bytes':>12}{'rangos':>12}{'bytes':>12}")
+            for sheet_name, file_type in books.items():
+                r = bench_sheet(file_type, sheet_name)
+                print(f"{sheet_name:<26}{r['full_ms']:>15.1f} ms{r['full_bytes']:>12}"
+                      f"{r['range_ms']:>9.1f} ms{r['range_bytes']:>12}")
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark del lector de hojas: pd.ExcelFile.parse vs lector streaming
+Compara tiempos y verifica que ambos produzcan los mismos DataFrames
+
+Ejecutar:
+    python benchmarks/bench_reader.py                 # libros locales del repo
+    python benchmarks/bench_reader.py --rows 20000    # libro sintético de ventas
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import data_loader
+from data_loader import SHEET_SPECS, VENTAS_FILE, ALMACEN_FILE
+
+# Columnas que existen en el Excel pero no se usan (el lector streaming no las convierte)
+UNUSED_COLUMNS = 20
+
+
+def synthetic_ventas(path: Path, rows: int):
+    """Libro con las hojas de ventas registradas, encabezados en su fila y columnas de relleno"""
+    wb = Workbook(write_only=True)
+    start = datetime(2026, 1, 1)
+    for sheet_name, spec in SHEET_SPECS['ventas'].items():
+        ws = wb.create_sheet(sheet_name)
+        for _ in range(spec['header']):
+            ws.append(['CONTROL OVA 2026'])
+        columns = spec['usecols'] + [f'AUX {i}' for i in range(UNUSED_COLUMNS)]
+        ws.append(columns)
+        for i in range(rows):
+            values = []
+            for col in columns:
+                if col == 'ID':
+                    values.append(f'VC-{i}')
+                elif 'FECHA' in col:
+                    values.append(start + timedelta(days=i % 365))
+                elif col.startswith('AUX'):
+                    values.append(i * 0.5)
+                elif col in ('KG NETOS', 'PRECIO', 'PRECIO UNITARIO', 'TOTAL VENTA', 'IMPORTE',
+                             'MONTO PAGADO', 'SALDO', 'COBROS EFECTUADOS', 'CAJAS/BULTOS',
+                             'CAJAS O BULTOS'):
+                    values.append(round(10 + (i % 97) * 1.25, 2))
+                else:
+                    values.append(f'{col} {i % 40}')
+            ws.append(values)
+        # Filas plantilla después del último registro (solo fórmulas en cero)
+        for _ in range(rows // 10):
+            ws.append([None] * (len(columns) - 1) + [0])
+    wb.save(path)
+
+
+def timed(fn, repeat: int) -> tuple:
+    """(mediana en segundos, último resultado)"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def parse_with(reader: str, path: Path, specs: dict) -> dict:
+    data_loader.EXCEL_READER = reader
+    return data_loader._parse_workbook(path, specs)
+
+
+def check_same(expected: dict, actual: dict, specs: dict):
+    """Los DataFrames deben ser idénticos (con stop_at: idénticos hasta la última fila con ID)"""
+    for sheet_name, spec in specs.items():
+        exp = expected[sheet_name]
+        if spec.get('stop_at'):
+            exp = exp.iloc[:len(actual[sheet_name])]
+            trailing = expected[sheet_name].iloc[len(actual[sheet_name]):]
+            assert trailing[spec['stop_at']].isna().all(), f"{sheet_name}: se recortaron filas con ID"
+            pd.testing.assert_frame_equal(actual[sheet_name], exp, check_dtype=False)
+        else:
+            pd.testing.assert_frame_equal(actual[sheet_name], exp)
+
+
+def bench(label: str, path: Path, specs: dict, repeat: int):
+    pandas_time, expected = timed(lambda: parse_with('pandas', path, specs), repeat)
+    streaming_time, actual = timed(lambda: parse_with('streaming', path, specs), repeat)
+    check_same(expected, actual, specs)
+    rows = sum(len(df) for df in expected.values())
+    print(f"{label:<10} filas={rows:>8}  pandas={pandas_time:7.3f}s  "
+          f"streaming={streaming_time:7.3f}s  x{pandas_time / streaming_time:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, help='Usar un libro sintético de ventas con N filas por hoja')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por lector (se reporta la mediana)')
+    args = parser.parse_args()
+
+    if args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'ventas.xlsx'
+            synthetic_ventas(path, args.rows)
+            bench('ventas', path, SHEET_SPECS['ventas'], args.repeat)
+        return
+
+    for file_type, path in (('ventas', VENTAS_FILE), ('almacen', ALMACEN_FILE)):
+        if not path.exists():
+            print(f"[WARNING] No existe {path.name}; usar --rows para un libro sintético")
+            continue
+        bench(file_type, path, SHEET_SPECS[file_type], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark de serialización por panel: construir el JSON de cada endpoint y renderizarlo
+'panel' = función del panel (agregación + conversión a dict/list)
+'render' = dict -> bytes de la respuesta HTTP (como lo hace la API)
+
+Ejecutar:
+    python benchmarks/bench_serialization.py                   # libros locales del repo
+    python benchmarks/bench_serialization.py --books /ruta     # carpeta con otros libros
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+os.environ.setdefault('USE_ONEDRIVE', 'false')
+os.environ.setdefault('SHEET_CACHE_ENABLED', 'false')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import data_loader
+import panels
+from snapshot import get_snapshot
+from panels import FilteredView
+
+try:
+    from serialization import json_response as render
+except ImportError:
+    # Árbol sin capa de serialización: lo que hace FastAPI con un dict retornado
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    def render(content):
+        return JSONResponse(jsonable_encoder(content))
+
+
+def timed(fn, repeat: int):
+    """Mediana en ms de 'repeat' ejecuciones y el último resultado"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), result
+
+
+def bench(repeat: int):
+    snap = get_snapshot()
+    print(f"Snapshot {snap.version}: {len(snap.ventas)} ventas, {len(snap.credito)} créditos")
+    print(f"{'panel':<22}{'panel ms':>10}{'render ms':>11}{'bytes':>10}")
+
+    total_panel = total_render = 0.0
+    for name, panel in panels.PANELS.items():
+        # Vista nueva por ejecución: sin tablas ni consultas de cubo memorizadas
+        panel_ms, content = timed(lambda: panel(FilteredView(snap)), repeat)
+        render_ms, response = timed(lambda: render(content), repeat)
+        total_panel += panel_ms
+        total_render += render_ms
+        print(f"{name:<22}{panel_ms:>10.2f}{render_ms:>11.2f}{len(response.body):>10}")
+
+    print(f"{'TOTAL':<22}{total_panel:>10.2f}{total_render:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=Path, help="Carpeta con los libros de ventas y almacén")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.books:
+        data_loader.VENTAS_FILE = args.books / data_loader.VENTAS_FILE.name
+        data_loader.ALMACEN_FILE = args.books / data_loader.ALMACEN_FILE.name
+    bench(args.repeat)
@@ -0,0 +1,285 @@
+"""
+Generador de libros sintéticos con el mismo formato que los Excel de OVA
+Escribe 'CONTROL DE VENTAS OVA 2026 -.xlsx' y 'CONTROL DE ALMACÉN OVA 2026 -.xlsx'
+con cada hoja registrada en data_loader.SHEET_SPECS: títulos arriba del encabezado
+(VENTAS AL CONTADO header=7, COMPRAS (C) header=9, CAJAS header=4, PAGOS_GENERALES
+header=5, ...), columnas sin uso intercaladas y filas plantilla al final.
+
+Ejecutar:
+    python benchmarks/synthetic_books.py --rows 100000 --out /tmp/ova-100k
+"""
+
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from data_loader import SHEET_SPECS, VENTAS_FILE, ALMACEN_FILE
+
+START = datetime(2026, 1, 1)
+DAYS = 365
+OPERADORES = ['EMILIO', 'RICHARD', 'BODEGA 55', 'DIEGO']
+PRODUCTOS = {
+    'CEBOLLA': ['BLANCA', 'MORADA', 'CAMBRAY'],
+    'HUEVO_CENTRAL': ['HUEVO', 'HUEVO ROJO'],
+    'HUEVO': ['HUEVO', 'MEDIA CAJA'],
+    'COVA': ['COVA'],
+}
+# Columnas que existen en los libros reales pero el dashboard no usa
+UNUSED_COLUMNS = 3
+# Fracción del total de filas por hoja (CAJAS depende de los días, no de las filas)
+SHARES = {
+    'VENTAS AL CONTADO': 0.55, 'VENTAS A CRÉDITO': 0.15, 'PAGOS_GENERALES': 0.10,
+    'EGRESOS EN EFECTIVO': 0.08, 'COMPRAS (C)': 0.05, 'COMPRAS (H)': 0.03,
+    'CONTROL DE ALMACÉN (C)': 0.02, 'CONTROL DE ALMACÉN (H)': 0.02,
+}
+
+Columns = Dict[str, list]
+
+
+def _dates(rng: np.random.Generator, n: int) -> list:
+    """Fechas del año en orden (los libros se llenan día a día), algunas con hora"""
+    days = np.sort(rng.integers(0, DAYS, n))
+    hours = np.where(rng.random(n) < 0.05, rng.integers(8, 19, n), 0)
+    return [START + timedelta(days=int(d), hours=int(h)) for d, h in zip(days, hours)]
+
+
+def _money(values: np.ndarray) -> list:
+    return np.round(values, 2).tolist()
+
+
+def _clientes(n_clientes: int) -> List[str]:
+    return [f'CLIENTE {i:04d}' for i in range(n_clientes)]
+
+
+def _ventas(rng: np.random.Generator, n: int, prefix: str, clientes: List[str]) -> Columns:
+    """Columnas comunes de ventas al contado y a crédito"""
+    segmentos = rng.choice(list(PRODUCTOS), n, p=[0.5, 0.25, 0.2, 0.05])
+    productos = [PRODUCTOS[s][i % len(PRODUCTOS[s])] for s, i in zip(segmentos, rng.integers(0, 6, n))]
+    kg = rng.gamma(2.0, 40.0, n)
+    precio = rng.uniform(8, 35, n)
+    notas = np.where(rng.random(n) < 0.01, 'ANULADO', None)
+    return {
+        'ID': [f'{prefix}-{i + 1}' for i in range(n)],
+        'FECHA': _dates(rng, n),
+        'SEGMENTO DE NEGOCIO': segmentos.tolist(),
+        'TIPO DE VENTA': rng.choice(['MAYOREO', 'MENUDEO'], n).tolist(),
+        'TIPO/PRODUCTO': productos,
+        'CLIENTE ADMON': rng.choice(clientes, n).tolist(),
+        'KG NETOS': _money(kg),
+        'CAJAS': rng.integers(1, 40, n).tolist(),
+        'PRECIO': _money(precio),
+        'TOTAL VENTA': _money(kg * precio),
+        'OPERADOR': rng.choice(OPERADORES, n).tolist(),
+        'NOTA': notas.tolist(),
+    }
+
+
+def ventas_contado(rng, n, clientes) -> Columns:
+    cols = _ventas(rng, n, 'VC', clientes)
+    cols['CAJAS/BULTOS'] = cols.pop('CAJAS')
+    cols['FORMA DE PAGO'] = rng.choice(['EFECTIVO', 'TRANSFERENCIA'], n, p=[0.8, 0.2]).tolist()
+    return cols
+
+
+def ventas_credito(rng, n, clientes) -> Columns:
+    cols = _ventas(rng, n, 'VCR', clientes)
+    total = np.array(cols['TOTAL VENTA'])
+    # 30% de las notas con saldo: parte o todo pendiente
+    saldo = np.where(rng.random(n) < 0.3, total * rng.choice([0.25, 0.5, 1.0], n), 0.0)
+    cols.update({
+        'CAJAS O BULTOS': cols.pop('CAJAS'),
+        'PRECIO UNITARIO': cols.pop('PRECIO'),
+        'NOTA (SI APLICA)': cols.pop('NOTA'),
+        'SALDO': _money(saldo),
+        'COBROS EFECTUADOS': _money(total - saldo),
+    })
+    return cols
+
+
+def pagos_generales(rng, n, clientes) -> Columns:
+    nombres = rng.choice(clientes, n)
+    # La captura real mezcla mayúsculas y espacios: clean_pagos lo normaliza
+    nombres = [c.lower() + ' ' if i % 7 == 0 else c for i, c in enumerate(nombres)]
+    return {
+        'ID': [f'PG-{i + 1}' if i % 20 else None for i in range(n)],
+        'FECHA DE COBRO': _dates(rng, n),
+        'CLIENTE ADMON': nombres,
+        'MONTO PAGADO': _money(rng.gamma(2.0, 400.0, n)),
+        'TIPO DE MOVIMIENTO': rng.choice(['ABONO', 'LIQUIDACIÓN'], n, p=[0.85, 0.15]).tolist(),
+    }
+
+
+def egresos(rng, n, _clientes) -> Columns:
+    return {
+        'ID': [f'EG-{i + 1}' if i % 10 else None for i in range(n)],
+        'FECHA': _dates(rng, n),
+        'TIPO DE EGRESO': rng.choice(['GASOLINA', 'NÓMINA', 'MANTENIMIENTO', 'FLETES', 'OTROS'], n).tolist(),
+        'CENTRO DE COSTOS': rng.choice(['BODEGA', 'RUTA', 'OFICINA'], n).tolist(),
+        'CONCEPTO': [f'gasto {i % 300}' for i in range(n)],
+        'IMPORTE': _money(rng.gamma(2.0, 300.0, n)),
+        'OPERADOR': rng.choice(OPERADORES, n).tolist(),
+        'CLASIFICACIÓN COSTO/GASTO': rng.choice(['COSTO', 'GASTO'], n).tolist(),
+    }
+
+
+def cajas(rng, _n, _clientes) -> Columns:
+    """Un bloque de conceptos por día, cerrado con FIN DEL DÍA"""
+    conceptos = ['SALDO INICIAL', 'COBRANZA VENTAS AL CONTADO', 'COBRANZA VENTAS A CRÉDITO',
+                 'GASTOS EFECTUADOS', 'MOVIMIENTO ENTRE CAJAS', 'FIN DEL DÍA']
+    n = DAYS * len(conceptos)
+    cols = {
+        'SEMANA': [d // 7 + 1 for d in range(DAYS) for _ in conceptos],
+        'FECHA': [START + timedelta(days=d) for d in range(DAYS) for _ in conceptos],
+        'CONCEPTO': conceptos * DAYS,
+    }
+    for op in OPERADORES:
+        cols[op] = _money(rng.gamma(2.0, 2000.0, n))
+    cols['OTRAS ENTRADAS DE EFECTIVO (+)'] = [None] * n
+    cols['OTRAS SALIDAS DE EFECTIVO (-)'] = [None] * n
+    fin = np.array(cols['CONCEPTO']) == 'FIN DEL DÍA'
+    total = np.sum([cols[op] for op in OPERADORES], axis=0)
+    cols['SALDO FINAL DE EFECTIVO'] = [t if f else None for t, f in zip(_money(total), fin)]
+    cols['NOTA'] = [None] * n
+    return cols
+
+
+def _compras(rng, n, prefix: str, proveedor: str, cantidad: str, precio: str) -> Columns:
+    kg = rng.gamma(5.0, 300.0, n)
+    precio_kg = rng.uniform(6, 30, n)
+    return {
+        'FECHA': _dates(rng, n),
+        proveedor: rng.choice([f'PROVEEDOR {i}' for i in range(12)], n).tolist(),
+        cantidad: rng.integers(5, 200, n).tolist(),
+        'KG NETOS': _money(kg),
+        precio: _money(precio_kg),
+        'TOTAL': _money(kg * precio_kg),
+        'ESTATUS': rng.choice(['PAGADO', 'PENDIENTE'], n, p=[0.8, 0.2]).tolist(),
+        'ID': [f'{prefix}-{i + 1}' if i % 15 else None for i in range(n)],
+    }
+
+
+def compras_cebolla(rng, n, _clientes) -> Columns:
+    return _compras(rng, n, 'CMP', 'PROVEEDOR DE CEBOLLA', 'COSTALES', 'PRECIO X KG')
+
+
+def compras_huevo(rng, n, _clientes) -> Columns:
+    cols = _compras(rng, n, 'CMPH', 'PROVEEDOR DE HUEVO', 'CAJAS', 'PRECIO x KG')
+    cols['MARCA DE HUEVO'] = rng.choice(['BACHOCO', 'SAN JUAN', 'CRIOLLO'], n).tolist()
+    return cols
+
+
+def _almacen(rng, n, columns: List[str]) -> Columns:
+    cols = {'FECHA': _dates(rng, n), 'ENTRADAS': _money(rng.gamma(2.0, 200.0, n)),
+            'SALIDAS': _money(rng.gamma(2.0, 190.0, n))}
+    existencia = np.maximum(np.cumsum(np.array(cols['ENTRADAS']) - np.array(cols['SALIDAS'])), 0)
+    for col in columns:
+        cols[col] = _money(existencia if col == columns[0] else existencia * 12)
+    return cols
+
+
+def almacen_cebolla(rng, n, _clientes) -> Columns:
+    return _almacen(rng, n, ['EXISTENCIA'])
+
+
+def almacen_huevo(rng, n, _clientes) -> Columns:
+    # La primera columna EXISTENCIA son cajas; la segunda, kg
+    return _almacen(rng, n, ['EXISTENCIA', 'EXISTENCIA KG'])
+
+
+GENERATORS = {
+    'ventas': {
+        'VENTAS AL CONTADO': ventas_contado,
+        'VENTAS A CRÉDITO': ventas_credito,
+        'EGRESOS EN EFECTIVO': egresos,
+        'CAJAS': cajas,
+        'PAGOS_GENERALES': pagos_generales,
+    },
+    'almacen': {
+        'COMPRAS (C)': compras_cebolla,
+        'COMPRAS (H)': compras_huevo,
+        'CONTROL DE ALMACÉN (C)': almacen_cebolla,
+        'CONTROL DE ALMACÉN (H)': almacen_huevo,
+    },
+}
+
+
+def _layout(spec: dict, cols: Columns) -> List[str]:
+    """Columnas del archivo: las registradas en SHEET_SPECS con columnas sin uso intercaladas"""
+    names = list(spec.get('usecols') or cols)
+    missing = [name for name in names if name not in cols]
+    assert not missing, f"El generador no produce {missing}"
+    for i in range(UNUSED_COLUMNS):
+        names.insert(min(2 + i * 4, len(names)), f'AUX {i}')
+    return names
+
+
+def write_sheet(wb: Workbook, sheet_name: str, spec: dict, cols: Columns) -> int:
+    """Escribe una hoja: títulos, encabezado en la fila spec['header'], datos y filas plantilla"""
+    ws = wb.create_sheet(sheet_name)
+    ws.append([f'{sheet_name} - OVA 2026'])
+    for _ in range(spec['header'] - 1):
+        ws.append([])
+    names = _layout(spec, cols)
+    ws.append(names)
+
+    n = len(next(iter(cols.values())))
+    empty = [None] * n
+    for row in zip(*(cols.get(name, empty) for name in names)):
+        ws.append(row)
+    # Filas plantilla después del último registro: fórmulas en cero sin ID ni datos
+    template = [None] * len(names)
+    template[names.index('AUX 0')] = 0
+    for _ in range(min(n // 20, 500)):
+        ws.append(template)
+    return n
+
+
+def write_books(out: Path, rows: int, seed: int = 2026) -> Dict[str, Dict[str, int]]:
+    """
+    Escribe ambos libros en 'out' con ~rows filas de movimientos en total
+
+    Returns:
+        {libro: {hoja: filas de datos}}
+    """
+    rng = np.random.default_rng(seed)
+    out.mkdir(parents=True, exist_ok=True)
+    clientes = _clientes(max(20, min(rows // 50, 5000)))
+    paths = {'ventas': out / VENTAS_FILE.name, 'almacen': out / ALMACEN_FILE.name}
+
+    counts = {}
+    for file_type, generators in GENERATORS.items():
+        wb = Workbook(write_only=True)
+        counts[file_type] = {}
+        for sheet_name, generate in generators.items():
+            n = max(int(rows * SHARES.get(sheet_name, 0)), 2)
+            cols = generate(rng, n, clientes)
+            counts[file_type][sheet_name] = write_sheet(wb, sheet_name, SHEET_SPECS[file_type][sheet_name], cols)
+        wb.save(paths[file_type])
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000, help='Filas de movimientos en total (p.ej. 10000, 100000, 1000000)')
+    parser.add_argument('--out', type=Path, required=True, help='Carpeta donde escribir los dos libros')
+    parser.add_argument('--seed', type=int, default=2026)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = write_books(args.out, args.rows, args.seed)
+    for file_type, sheets in counts.items():
+        for sheet_name, n in sheets.items():
+            print(f"{file_type:<8}{sheet_name:<26}{n:>10}")
+    print(f"Libros escritos en {args.out} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
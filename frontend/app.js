@@ -186,28 +186,41 @@ function hideLoading() {
 }
 
 // ==================== CARGA DE DATOS ====================
+// Paneles de /api/dashboard y la función que pinta cada uno
+const PANEL_LOADERS = {
+    summary: loadSummary,
+    stock: loadStock,
+    ticket_promedio: loadTicketPromedio,
+    monthly_comparison: loadMonthlyComparison,
+    top_products: loadTopProducts,
+    sales_by_product: loadSalesByProduct,
+    ticket_distribution: loadTicketDistribution,
+    sales_trend: loadSalesTrend,
+    sales_by_weekday: loadSalesByWeekday,
+    purchases: loadPurchases,
+    expenses: loadExpenses,
+    top_clients: loadTopClients,
+    receivables: loadReceivables,
+    clients: loadClientLedger,
+    cash_status: loadCashStatus
+};
+
 async function loadAllData() {
     showLoading();
     
     try {
-        await Promise.all([
-            loadSummary(),
-            loadStock(),
-            loadTicketPromedio(),
-            loadTasaCobranza(),
-            loadMonthlyComparison(),
-            loadTopProducts(),
-            loadSalesByProduct(),
-            loadTicketDistribution(),
-            loadSalesTrend(),
-            loadSalesByWeekday(),
-            loadPurchases(),
-            loadExpenses(),
-            loadTopClients(),
-            loadReceivables(),
-            loadClientLedger(),
-            loadCashStatus()
-        ]);
+        // Una sola petición: el backend calcula todos los paneles sobre la misma vista
+        const panels = Object.keys(PANEL_LOADERS).join(',');
+        const data = await fetchAPI(`/api/dashboard?panels=${panels}`);
+        if (!data || !data.panels) return;
+
+        Object.entries(PANEL_LOADERS).forEach(([name, loader]) => {
+            try {
+                loader(data.panels[name]);
+            } catch (error) {
+                console.error(`Error rendering ${name}:`, error);
+            }
+        });
     } catch (error) {
         console.error('Error loading data:', error);
     } finally {
@@ -216,8 +229,7 @@ async function loadAllData() {
 }
 
 // ==================== CARGAR KPIs ====================
-async function loadSummary() {
-    const data = await fetchAPI('/api/summary');
+function loadSummary(data) {
     if (!data) return;
     
     document.getElementById('ventas-total').textContent = formatCurrency(data.ventas_total);
@@ -230,16 +242,14 @@ async function loadSummary() {
     document.getElementById('num-gastos').textContent = `${formatNumber(data.num_gastos || 0)} gastos`;
 }
 
-async function loadStock() {
-    const data = await fetchAPI('/api/stock', false);
+function loadStock(data) {
     if (!data) return;
 
     document.getElementById('stock-cebolla').textContent = formatKG(data.cebolla?.kg || 0);
     document.getElementById('stock-huevo').textContent = formatCajas(data.huevo?.cajas || 0);
 }
 
-async function loadCashStatus() {
-    const data = await fetchAPI('/api/cash-status', true);  // Respetar filtro de fechas
+function loadCashStatus(data) {
     if (!data || !data.operadores) return;
 
     // Actualizar saldos por operador
@@ -303,20 +313,14 @@ async function loadCashStatus() {
     }
 }
 
-async function loadTicketPromedio() {
-    const data = await fetchAPI('/api/metrics/ticket-promedio');
+function loadTicketPromedio(data) {
     if (!data) return;
     
     document.getElementById('ticket-promedio').textContent = formatCurrency(data.ticket_promedio);
     document.getElementById('num-tickets').textContent = `${formatNumber(data.num_transacciones)} transacciones`;
 }
 
-async function loadTasaCobranza() {
-    // Función eliminada - la card ya no existe
-}
-
-async function loadMonthlyComparison() {
-    const data = await fetchAPI('/api/metrics/monthly-comparison', false);
+function loadMonthlyComparison(data) {
     if (!data) return;
     
     const crecimiento = data.crecimiento_porcentaje;
@@ -337,8 +341,7 @@ async function loadMonthlyComparison() {
         `Anterior: ${formatCurrency(data.mes_anterior?.total || 0)}`;
 }
 
-async function loadReceivables() {
-    const data = await fetchAPI('/api/receivables', false);
+function loadReceivables(data) {
     if (!data) return;
     
     document.getElementById('por-cobrar').textContent = formatCurrency(data.total_pendiente);
@@ -370,6 +373,17 @@ async function loadReceivables() {
 let clientLedgerData = [];
 let clientLedgerInitialized = false;
 let selectedCliente = null;
+let selectedClientDetail = null;
+
+// La lista solo trae totales: los movimientos se piden por cliente al seleccionarlo
+async function selectClient(cliente) {
+    selectedCliente = cliente;
+    const detail = await fetchAPI(`/api/client-ledger/${encodeURIComponent(cliente)}`, false);
+    // Ignorar respuestas de una selección anterior
+    if (!detail || cliente !== selectedCliente) return;
+    selectedClientDetail = detail;
+    renderClientDetail(detail);
+}
 
 function renderClientOptions(filter = '') {
     const optionsList = document.getElementById('client-options-list');
@@ -404,14 +418,13 @@ function renderClientOptions(filter = '') {
             dropdown.classList.remove('open');
             searchInput.value = '';
             renderClientOptions();
-            renderClientDetail(c);
+            selectClient(c.cliente);
         });
         optionsList.appendChild(item);
     });
 }
 
-async function loadClientLedger() {
-    const data = await fetchAPI('/api/client-ledger', false);
+function loadClientLedger(data) {
     if (!data || !Array.isArray(data) || data.length === 0) return;
 
     clientLedgerData = data;
@@ -423,7 +436,7 @@ async function loadClientLedger() {
     const label = document.getElementById('client-select-label');
     label.textContent = selectedCliente;
     renderClientOptions();
-    renderClientDetail(data.find(c => c.cliente === selectedCliente));
+    selectClient(selectedCliente);
 
     // Los listeners solo se registran una vez
     if (clientLedgerInitialized) return;
@@ -488,8 +501,8 @@ document.addEventListener('DOMContentLoaded', () => {
 });
 
 function downloadClientPDF() {
-    const clientData = clientLedgerData.find(c => c.cliente === selectedCliente);
-    if (!clientData) return;
+    const clientData = selectedClientDetail;
+    if (!clientData || clientData.cliente !== selectedCliente) return;
 
     const { jsPDF } = window.jspdf;
     const doc = new jsPDF({ orientation: 'portrait', unit: 'mm', format: 'a4' });
@@ -643,8 +656,7 @@ const chartDefaults = {
     }
 };
 
-async function loadTopProducts() {
-    const data = await fetchAPI('/api/sales/top-products?limit=5');
+function loadTopProducts(data) {
     if (!data || !data.data) return;
     
     const tbody = document.querySelector('#table-top-products tbody');
@@ -668,8 +680,7 @@ async function loadTopProducts() {
     });
 }
 
-async function loadSalesByProduct() {
-    const data = await fetchAPI('/api/sales/by-product');
+function loadSalesByProduct(data) {
     if (!data || !data.data) return;
     
     const ctx = document.getElementById('chart-by-product');
@@ -712,8 +723,7 @@ async function loadSalesByProduct() {
     });
 }
 
-async function loadTicketDistribution() {
-    const data = await fetchAPI('/api/sales/ticket-distribution');
+function loadTicketDistribution(data) {
     if (!data || !data.data) return;
     
     // Usamos el ID nuevo
@@ -776,8 +786,7 @@ async function loadTicketDistribution() {
     });
 }
 
-async function loadSalesTrend() {
-    const data = await fetchAPI('/api/sales/trend');
+function loadSalesTrend(data) {
     if (!data) return;
     
     const ctx = document.getElementById('chart-trend');
@@ -840,8 +849,7 @@ async function loadSalesTrend() {
     });
 }
 
-async function loadSalesByWeekday() {
-    const data = await fetchAPI('/api/sales/by-weekday');
+function loadSalesByWeekday(data) {
     if (!data) return;
     
     const ctx = document.getElementById('chart-by-weekday');
@@ -884,8 +892,7 @@ async function loadSalesByWeekday() {
     });
 }
 
-async function loadPurchases() {
-    const data = await fetchAPI('/api/purchases');
+function loadPurchases(data) {
     if (!data || !data.data) return;
     
     const ctx = document.getElementById('chart-purchases');
@@ -926,8 +933,7 @@ async function loadPurchases() {
     });
 }
 
-async function loadExpenses() {
-    const data = await fetchAPI('/api/expenses');
+function loadExpenses(data) {
     if (!data || !data.por_tipo) return;
     
     const ctx = document.getElementById('chart-expenses');
@@ -977,10 +983,7 @@ async function loadExpenses() {
     });
 }
 
-async function loadTopClients() {
-    const response = await fetch(`${API_BASE}/api/sales/top-clients?limit=10${currentFilters.startDate ? '&start_date=' + currentFilters.startDate : ''}${currentFilters.endDate ? '&end_date=' + currentFilters.endDate : ''}`);
-    const data = await response.json();
-    
+function loadTopClients(data) {
     if (!data || !data.data) return;
     
     const tbody = document.querySelector('#table-clients tbody');